@@ -61,6 +61,8 @@ setup(
             "typeguard<3.0.0",
         ],
         "pytorch": ["torch>=1.5.0", "torchvision>=0.6.0"],
+        "async": ["sqlalchemy[asyncio]>=1.4.0, <2.0.0", "aiosqlite", "asyncmy"],
+        "zstd": ["zstandard>=0.15.0"],
     },
     classifiers=[
         "Intended Audience :: Developers",
@@ -20,6 +20,8 @@ from submarine.client.api.experiment_client import ExperimentClient
 log_param = submarine.tracking.fluent.log_param
 log_metric = submarine.tracking.fluent.log_metric
 save_model = submarine.tracking.fluent.save_model
+load_model = submarine.tracking.fluent.load_model
+wait_for_uploads = submarine.tracking.fluent.wait_for_uploads
 set_db_uri = utils.set_db_uri
 get_db_uri = utils.get_db_uri
 
@@ -27,6 +29,8 @@ __all__ = [
     "log_metric",
     "log_param",
     "save_model",
+    "load_model",
+    "wait_for_uploads",
     "set_db_uri",
     "get_db_uri",
     "ExperimentClient",
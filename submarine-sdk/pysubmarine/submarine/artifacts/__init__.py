@@ -13,8 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from submarine.artifacts.abstract_repository import AbstractRepository
+from submarine.artifacts.cache import ArtifactCache
+from submarine.artifacts.filesystem import FileSystemRepository
 from submarine.artifacts.repository import Repository
 
 __all__ = [
+    "AbstractRepository",
+    "ArtifactCache",
+    "FileSystemRepository",
     "Repository",
 ]
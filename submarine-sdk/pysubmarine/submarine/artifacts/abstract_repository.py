@@ -0,0 +1,110 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABCMeta, abstractmethod
+from typing import BinaryIO, List
+
+
+class AbstractRepository:
+    """
+    Abstract class for artifact repositories
+    This class defines the API interface for frontends to store artifacts in various types of
+    backends. Artifact paths are relative to the root of the repository and use "/" separators.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def log_artifact(self, dest_path: str, local_file: str) -> None:
+        """
+        Upload a local file into the folder dest_path.
+        :param dest_path: Destination folder.
+        :param local_file: Local file.
+        """
+        pass
+
+    @abstractmethod
+    def log_artifact_fileobj(self, dest_path: str, fileobj: BinaryIO) -> None:
+        """
+        Upload the content of a binary file-like object to dest_path.
+        :param dest_path: Destination path.
+        :param fileobj: Seekable binary file-like object, read from its beginning.
+        """
+        pass
+
+    @abstractmethod
+    def log_artifacts(self, dest_path: str, local_dir: str) -> str:
+        """
+        Upload every file under local_dir into the folder dest_path.
+        :param dest_path: Destination folder.
+        :param local_dir: Local directory.
+        :return: The URI of the destination folder.
+        """
+        pass
+
+    @abstractmethod
+    def list_artifact_subfolder(self, dest_path: str) -> List[dict]:
+        """
+        :param dest_path: Folder in the repository.
+        :return: The direct subfolders of dest_path as a list of {"Prefix": "<dest_path>/<name>/"}.
+        """
+        pass
+
+    @abstractmethod
+    def download_artifacts(self, src_path: str, local_dir: str) -> str:
+        """
+        Download every artifact under src_path into local_dir.
+        :param src_path: Source folder in the repository.
+        :param local_dir: Local destination directory.
+        :return: The local destination directory.
+        """
+        pass
+
+    @abstractmethod
+    def copy_folder(self, src_path: str, dest_path: str) -> str:
+        """
+        Copy every artifact under src_path to dest_path inside the repository.
+        :param src_path: Source folder.
+        :param dest_path: Destination folder.
+        :return: The URI of the destination folder.
+        """
+        pass
+
+    @abstractmethod
+    def delete_folder(self, dest_path: str) -> None:
+        """
+        Delete every artifact whose path starts with dest_path.
+        :param dest_path: Path prefix in the repository.
+        """
+        pass
+
+    @abstractmethod
+    def allocate_folder(self, dest_path: str) -> str:
+        """
+        Atomically allocate the next numbered folder dest_path/<n>, so concurrent callers never
+        get the same folder.
+        :param dest_path: Parent folder.
+        :return: The allocated folder.
+        """
+        pass
+
+    @abstractmethod
+    def release_folder(self, folder: str) -> None:
+        """
+        Delete the claim of a folder allocated by allocate_folder, after data has been written
+        to the folder.
+        :param folder: The allocated folder.
+        """
+        pass
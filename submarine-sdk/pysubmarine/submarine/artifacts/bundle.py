@@ -0,0 +1,111 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Artifact bundles: a directory packed into a single compressed tar stream, which is written and
+read sequentially so it never needs an intermediate archive file.
+"""
+
+import os
+import tarfile
+from typing import BinaryIO, List, Tuple
+
+from submarine.exceptions import SubmarineException
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+BUNDLE_FILES = {GZIP: "artifacts.tar.gz", ZSTD: "artifacts.tar.zst"}
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise SubmarineException(
+            "zstd compressed bundles require the zstandard package, install it with "
+            "`pip install apache-submarine[zstd]`."
+        )
+    return zstandard
+
+
+def get_bundle_file(compression: str) -> str:
+    """
+    :param compression: Bundle compression, "gzip" or "zstd".
+    :return: The object name of a bundle with the given compression.
+    """
+    if compression not in BUNDLE_FILES:
+        raise SubmarineException(
+            f"Unsupported bundle compression {compression}, expected one of {sorted(BUNDLE_FILES)}"
+        )
+    return BUNDLE_FILES[compression]
+
+
+def get_bundle_compression(file_name: str):
+    """
+    :return: The compression of the bundle object file_name, or None if it is not a bundle.
+    """
+    for compression, bundle_file in BUNDLE_FILES.items():
+        if file_name == bundle_file:
+            return compression
+    return None
+
+
+def _add_files(tar: tarfile.TarFile, files: List[Tuple[str, str]]) -> None:
+    for local_file, rel_path in files:
+        tar.add(local_file, arcname=rel_path, recursive=False)
+
+
+def pack(fileobj: BinaryIO, files: List[Tuple[str, str]], compression: str) -> None:
+    """
+    Write (local_file, rel_path) pairs as a compressed tar stream into a writable file-like
+    object. The stream is written sequentially, so fileobj may be a pipe.
+    """
+    get_bundle_file(compression)
+    if compression == GZIP:
+        with tarfile.open(fileobj=fileobj, mode="w|gz") as tar:
+            _add_files(tar, files)
+    else:
+        zstandard = _import_zstandard()
+        with zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False) as compressed:
+            with tarfile.open(fileobj=compressed, mode="w|") as tar:
+                _add_files(tar, files)
+
+
+def _extract_members(tar: tarfile.TarFile, local_dir: str) -> None:
+    local_dir = os.path.abspath(local_dir)
+    for member in tar:
+        path = os.path.normpath(os.path.join(local_dir, member.name))
+        if not (member.isfile() or member.isdir()) or not path.startswith(local_dir + os.sep):
+            raise SubmarineException(f"Invalid bundle member {member.name}")
+        if hasattr(tarfile, "data_filter"):
+            tar.extract(member, local_dir, filter="data")
+        else:
+            tar.extract(member, local_dir)
+
+
+def unpack(fileobj: BinaryIO, local_dir: str, compression: str) -> None:
+    """
+    Extract a compressed tar stream read sequentially from a file-like object, e.g. the body
+    of an S3 GET, into local_dir.
+    """
+    get_bundle_file(compression)
+    if compression == GZIP:
+        with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+            _extract_members(tar, local_dir)
+    else:
+        zstandard = _import_zstandard()
+        with zstandard.ZstdDecompressor().stream_reader(fileobj) as decompressed:
+            with tarfile.open(fileobj=decompressed, mode="r|") as tar:
+                _extract_members(tar, local_dir)
@@ -0,0 +1,192 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Size-bounded local disk cache of downloaded artifacts, shared by all processes on a node.
+"""
+
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import Callable, Iterator, Optional
+
+from submarine.exceptions import SubmarineException
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no advisory file locks
+    fcntl = None
+
+_logger = logging.getLogger(__name__)
+
+_CACHE_DIR_ENV_VAR = "SUBMARINE_ARTIFACT_CACHE_DIR"
+_CACHE_MAX_BYTES_ENV_VAR = "SUBMARINE_ARTIFACT_CACHE_MAX_BYTES"
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "submarine", "artifacts")
+DEFAULT_CACHE_MAX_BYTES = 10 * 1024 * 1024 * 1024
+
+_LOCK_DIR = ".locks"
+# temporary directories are named .tmp-<key>@<random>, so leftovers of crashed processes can be
+# told from directories in use by the lock of their key
+_TMP_PREFIX = ".tmp-"
+_TMP_KEY_SEPARATOR = "@"
+
+
+def _get_dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, f)) for root, _, filenames in os.walk(path) for f in filenames
+    )
+
+
+@contextlib.contextmanager
+def _file_lock(lock_file: str, blocking: bool = True, shared: bool = False) -> Iterator[bool]:
+    """
+    Hold an advisory lock on lock_file, exclusive unless shared is True. Yields False if
+    blocking is False and the lock is held by another process.
+    """
+    operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    with open(lock_file, "a") as f:
+        try:
+            fcntl.flock(f, operation if blocking else operation | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ArtifactCache:
+    """
+    Directory of cached artifacts keyed by an immutable id (e.g. the model id). Entries are
+    populated atomically under a per-key file lock, so concurrent processes asking for the same
+    key download it once, and the least recently used entries are evicted when the cache
+    exceeds its byte budget. Entries opened with open() hold a shared lock, which keeps them
+    from being evicted while they are in use.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        :param cache_dir: Cache directory. Defaults to $SUBMARINE_ARTIFACT_CACHE_DIR or
+                          ~/.cache/submarine/artifacts.
+        :param max_bytes: Byte budget of the cache. Defaults to
+                          $SUBMARINE_ARTIFACT_CACHE_MAX_BYTES or 10 GiB.
+        """
+        if fcntl is None:
+            raise SubmarineException("The artifact cache needs fcntl file locks, which this platform lacks")
+        self.cache_dir = cache_dir or os.environ.get(_CACHE_DIR_ENV_VAR, DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get(_CACHE_MAX_BYTES_ENV_VAR, DEFAULT_CACHE_MAX_BYTES))
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(self.cache_dir, _LOCK_DIR), exist_ok=True)
+
+    def _lock_file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, _LOCK_DIR, f"{key}.lock")
+
+    def _mkdtemp(self, key: str) -> str:
+        return tempfile.mkdtemp(prefix=f"{_TMP_PREFIX}{key}{_TMP_KEY_SEPARATOR}", dir=self.cache_dir)
+
+    def get(self, key: str, populate: Callable[[str], None]) -> str:
+        """
+        Return the cache directory of key, calling populate(tmp_dir) to fill it on a miss. The
+        entry is not locked once this returns, so it may be evicted by other processes; use
+        open() to read it safely.
+        :param key: Immutable id of the artifact.
+        :param populate: Function which writes the artifact into the given empty directory.
+        :return: The local directory of the cached artifact.
+        """
+        if not key or key.startswith(".") or os.sep in key:
+            raise ValueError(f"Invalid cache key {key}")
+        entry_dir = os.path.join(self.cache_dir, key)
+        with _file_lock(self._lock_file(key)):
+            if os.path.isdir(entry_dir):
+                _logger.debug("Artifact cache hit for %s", key)
+            else:
+                tmp_dir = self._mkdtemp(key)
+                try:
+                    populate(tmp_dir)
+                    # readers never observe a partially downloaded entry
+                    os.rename(tmp_dir, entry_dir)
+                except BaseException:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    raise
+            # the entry mtime records the last access for LRU eviction
+            os.utime(entry_dir)
+        self._evict(keep=key)
+        return entry_dir
+
+    @contextlib.contextmanager
+    def open(self, key: str, populate: Callable[[str], None]) -> Iterator[str]:
+        """
+        Like get(), but hold a shared lock on the entry until the context exits, so no process
+        evicts it while it is loaded.
+        :param key: Immutable id of the artifact.
+        :param populate: Function which writes the artifact into the given empty directory.
+        :return: The local directory of the cached artifact.
+        """
+        while True:
+            entry_dir = self.get(key, populate)
+            with _file_lock(self._lock_file(key), shared=True):
+                # the entry may have been evicted between get() and the shared lock
+                if os.path.isdir(entry_dir):
+                    yield entry_dir
+                    return
+
+    def _remove_stale_tmp_dirs(self, names) -> None:
+        for name in names:
+            if not name.startswith(_TMP_PREFIX) or _TMP_KEY_SEPARATOR not in name:
+                continue
+            key = name[len(_TMP_PREFIX) :].rpartition(_TMP_KEY_SEPARATOR)[0]
+            # the directory of a process which populates or evicts key is in use
+            with _file_lock(self._lock_file(key), blocking=False) as locked:
+                if locked:
+                    _logger.info("Removing %s left behind in the artifact cache", name)
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def _evict(self, keep: str) -> None:
+        names = os.listdir(self.cache_dir)
+        self._remove_stale_tmp_dirs(names)
+        entries = []
+        for key in names:
+            entry_dir = os.path.join(self.cache_dir, key)
+            if key.startswith(".") or not os.path.isdir(entry_dir):
+                continue
+            try:
+                entries.append((os.path.getmtime(entry_dir), key, _get_dir_size(entry_dir)))
+            except FileNotFoundError:
+                # evicted by another process meanwhile
+                continue
+        total_bytes = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            with _file_lock(self._lock_file(key), blocking=False) as locked:
+                # entries which another process is populating or has opened are kept
+                if not locked:
+                    continue
+                _logger.info("Evicting %s (%d bytes) from the artifact cache", key, size)
+                # move the entry out of the way first, so it is never seen half deleted
+                trash_dir = self._mkdtemp(key)
+                try:
+                    os.rename(os.path.join(self.cache_dir, key), os.path.join(trash_dir, key))
+                except FileNotFoundError:
+                    pass
+                shutil.rmtree(trash_dir, ignore_errors=True)
+            total_bytes -= size
@@ -0,0 +1,154 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import posixpath
+import shutil
+import uuid
+from typing import BinaryIO, List
+
+from pyarrow import fs
+
+from submarine.artifacts.abstract_repository import AbstractRepository
+from submarine.utils import fileio
+
+# Size of the buffers used to stream files from and to the filesystem.
+DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024
+# Claims of numbered folders allocated by allocate_folder are kept in this subfolder.
+CLAIMS_FOLDER = ".claims"
+
+
+class FileSystemRepository(AbstractRepository):
+    """
+    Artifact repository on a pyarrow filesystem, e.g. file:///data/submarine for a local disk or
+    hdfs://namenode:8020/submarine. Folders are copied file by file on pyarrow's I/O thread pool.
+    """
+
+    def __init__(self, artifact_uri: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        :param artifact_uri: URI of the root folder of the repository.
+        :param buffer_size: Size of the buffers used to stream files.
+        """
+        self.artifact_uri = artifact_uri.rstrip("/")
+        self.buffer_size = buffer_size
+        self.filesystem, root = fileio.get_filesystem(artifact_uri)
+        self.root = root.rstrip("/")
+        self.filesystem.create_dir(self.root, recursive=True)
+
+    def _path(self, path: str) -> str:
+        return posixpath.join(self.root, path.strip("/"))
+
+    def _copy_files(self, source: str, destination: str, source_filesystem, destination_filesystem) -> None:
+        # only subdirectories of a copied directory are created, not the destination itself
+        destination_filesystem.create_dir(destination, recursive=True)
+        fs.copy_files(
+            source,
+            destination,
+            source_filesystem=source_filesystem,
+            destination_filesystem=destination_filesystem,
+            chunk_size=self.buffer_size,
+            use_threads=True,
+        )
+
+    def log_artifact(self, dest_path: str, local_file: str) -> None:
+        with open(local_file, "rb") as f:
+            self.log_artifact_fileobj(posixpath.join(dest_path, os.path.basename(local_file)), f)
+
+    def log_artifact_fileobj(self, dest_path: str, fileobj: BinaryIO) -> None:
+        self.filesystem.create_dir(posixpath.dirname(self._path(dest_path)), recursive=True)
+        fileobj.seek(0)
+        with self.filesystem.open_output_stream(self._path(dest_path), buffer_size=self.buffer_size) as out:
+            shutil.copyfileobj(fileobj, out, self.buffer_size)
+
+    def log_artifacts(self, dest_path: str, local_dir: str) -> str:
+        self._copy_files(
+            os.path.abspath(local_dir), self._path(dest_path), fs.LocalFileSystem(), self.filesystem
+        )
+        return f"{self.artifact_uri}/{dest_path}"
+
+    def _list_dir(self, path: str) -> List[fs.FileInfo]:
+        return self.filesystem.get_file_info(fs.FileSelector(self._path(path), allow_not_found=True))
+
+    def list_artifact_subfolder(self, dest_path: str) -> List[dict]:
+        return [
+            {"Prefix": f"{dest_path}/{info.base_name}/"}
+            for info in sorted(self._list_dir(dest_path), key=lambda info: info.base_name)
+            if info.type == fs.FileType.Directory
+        ]
+
+    def download_artifacts(self, src_path: str, local_dir: str) -> str:
+        local_dir = os.path.abspath(local_dir)
+        self._copy_files(self._path(src_path), local_dir, self.filesystem, fs.LocalFileSystem())
+        return local_dir
+
+    def copy_folder(self, src_path: str, dest_path: str) -> str:
+        self._copy_files(self._path(src_path), self._path(dest_path), self.filesystem, self.filesystem)
+        return f"{self.artifact_uri}/{dest_path}"
+
+    def delete_folder(self, dest_path: str) -> None:
+        # same semantics as a key prefix on S3: "a/b" also deletes "a/bc", "a/b/" only "a/b/*"
+        parent, prefix = posixpath.split(dest_path)
+        for info in self._list_dir(parent):
+            if not info.base_name.startswith(prefix):
+                continue
+            if info.type == fs.FileType.Directory:
+                self.filesystem.delete_dir(info.path)
+            else:
+                self.filesystem.delete_file(info.path)
+
+    def _claim(self, claim_path: str, folder: str) -> bool:
+        # see Repository._claim, a filesystem listing is strongly consistent as well
+        self.filesystem.create_dir(self._path(claim_path), recursive=True)
+        claim_file = self._path(posixpath.join(claim_path, uuid.uuid4().hex))
+        with self.filesystem.open_output_stream(claim_file):
+            pass
+        claim_files = [info.path for info in self._list_dir(claim_path)]
+        if self._list_dir(folder):
+            # the folder can never be claimed again, so no marker of it is needed anymore
+            self._delete_claims(claim_path)
+            return False
+        if claim_files == [claim_file]:
+            return True
+        try:
+            self.filesystem.delete_file(claim_file)
+        except FileNotFoundError:
+            # deleted by the release of the winning claim
+            pass
+        return False
+
+    def _delete_claims(self, claim_path: str) -> None:
+        try:
+            self.filesystem.delete_dir(self._path(claim_path))
+        except FileNotFoundError:
+            pass
+
+    def allocate_folder(self, dest_path: str) -> str:
+        claims_path = posixpath.join(dest_path, CLAIMS_FOLDER)
+        used = [
+            int(info.base_name)
+            for path in (dest_path, claims_path)
+            for info in self._list_dir(path)
+            if info.base_name.isdigit()
+        ]
+        number = max(used, default=0) + 1
+        while not self._claim(
+            posixpath.join(claims_path, str(number)), posixpath.join(dest_path, str(number))
+        ):
+            number += 1
+        return posixpath.join(dest_path, str(number))
+
+    def release_folder(self, folder: str) -> None:
+        dest_path, number = posixpath.split(folder)
+        self._delete_claims(posixpath.join(dest_path, CLAIMS_FOLDER, number))
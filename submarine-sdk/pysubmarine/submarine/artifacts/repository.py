@@ -13,31 +13,277 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, List, Optional, Tuple
 
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
+from submarine.artifacts import bundle
+from submarine.artifacts.abstract_repository import AbstractRepository
+from submarine.exceptions import SubmarineException
 
-class Repository:
-    def __init__(self):
+_logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Number of files transferred concurrently by log_artifacts.
+DEFAULT_MAX_WORKERS = 8
+# Number of attempts for a single file before the transfer is considered failed.
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Content-addressed artifacts: file contents are stored once under BLOB_PREFIX/<sha256> and each
+# artifact path only holds a manifest which maps relative file paths to their blobs.
+BLOB_PREFIX = "blobs"
+MANIFEST_FILE = "artifact-manifest.json"
+HASH_CHUNK_SIZE = 8 * MB
+
+# Files which are uploaded next to a bundle instead of into it, so they stay readable without
+# downloading the whole bundle.
+BUNDLE_SIDECAR_FILES = ("description.json",)
+
+# Maximum number of keys of a single DeleteObjects request.
+DELETE_BATCH_SIZE = 1000
+# Claims of numbered folders allocated by allocate_folder are kept in this subfolder.
+CLAIMS_FOLDER = ".claims"
+
+
+def default_transfer_config() -> TransferConfig:
+    """
+    Multipart settings of a single file transfer: objects larger than 16 MiB are split into
+    16 MiB parts which are transferred by up to 8 threads.
+    """
+    return TransferConfig(multipart_threshold=16 * MB, multipart_chunksize=16 * MB, max_concurrency=8)
+
+
+def sha256_file(local_file: str) -> str:
+    """
+    Compute the sha256 hex digest of a file, reading it in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(local_file, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_not_found(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class Repository(AbstractRepository):
+    """
+    Artifact repository in an S3 bucket.
+    """
+
+    def __init__(
+        self,
+        transfer_config: Optional[TransferConfig] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        content_addressed: bool = False,
+        bundle_compression: Optional[str] = None,
+        bucket: str = "submarine",
+    ):
+        """
+        :param transfer_config: Multipart settings of a single file transfer.
+        :param max_workers: Number of files transferred concurrently.
+        :param max_attempts: Number of attempts for a single file before giving up.
+        :param content_addressed: If True, log_artifacts stores every file under blobs/<sha256>
+                                  and writes a manifest to the artifact path, so files shared by
+                                  several artifacts are only stored and uploaded once.
+        :param bundle_compression: If "gzip" or "zstd", log_artifacts packs all files into a
+                                   single compressed tar object while uploading, except for
+                                   description.json which is uploaded as a plain sidecar file.
+        :param bucket: Name of the S3 bucket.
+        """
+        if bundle_compression is not None:
+            bundle.get_bundle_file(bundle_compression)
+            if content_addressed:
+                raise SubmarineException("Bundles can not be combined with content-addressed artifacts")
+        self.transfer_config = transfer_config or default_transfer_config()
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.content_addressed = content_addressed
+        self.bundle_compression = bundle_compression
         self.client = boto3.client(
             "s3",
             aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
             endpoint_url=os.environ.get("MLFLOW_S3_ENDPOINT_URL"),
+            # every concurrent file transfer uses up to max_concurrency connections
+            config=Config(max_pool_connections=max(10, max_workers * self.transfer_config.max_concurrency)),
         )
-        self.bucket = "submarine"
+        self.bucket = bucket
+
+    def _retry(self, fn: Callable[[], None], description: str) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                fn()
+                return
+            except (S3UploadFailedError, BotoCoreError, ClientError) as e:
+                if attempt == self.max_attempts:
+                    raise
+                _logger.warning(
+                    "Failed to %s (attempt %d/%d): %s", description, attempt, self.max_attempts, e
+                )
+                time.sleep(min(2**attempt * 0.1, 5))
 
     def _upload_file(self, local_file: str, bucket: str, key: str) -> None:
-        self.client.upload_file(Filename=local_file, Bucket=bucket, Key=key)
+        self._retry(
+            lambda: self.client.upload_file(
+                Filename=local_file, Bucket=bucket, Key=key, Config=self.transfer_config
+            ),
+            f"upload {local_file} to s3://{bucket}/{key}",
+        )
 
-    def list_artifact_subfolder(self, dest_path):
-        response = self.client.list_objects(
-            Bucket=self.bucket,
-            Prefix=f"{dest_path}/",
-            Delimiter="/",
+    def _download_file(self, key: str, local_file: str) -> None:
+        os.makedirs(os.path.dirname(local_file), exist_ok=True)
+        # objects above the multipart threshold are fetched with concurrent ranged GETs
+        self._retry(
+            lambda: self.client.download_file(
+                Bucket=self.bucket, Key=key, Filename=local_file, Config=self.transfer_config
+            ),
+            f"download s3://{self.bucket}/{key} to {local_file}",
         )
-        return response.get("CommonPrefixes")
+
+    def _upload_files(self, uploads: List[Tuple[str, str]]) -> None:
+        """
+        Upload (local_file, key) pairs concurrently and log the aggregate throughput.
+        """
+        start = time.monotonic()
+        total_bytes = sum(os.path.getsize(local_file) for local_file, _ in uploads)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._upload_file, local_file=local_file, bucket=self.bucket, key=key)
+                for local_file, key in uploads
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.monotonic() - start
+        _logger.info(
+            "Uploaded %d files (%.2f MiB) to s3://%s in %.2fs (%.2f MiB/s)",
+            len(uploads),
+            total_bytes / MB,
+            self.bucket,
+            elapsed,
+            total_bytes / MB / elapsed if elapsed > 0 else 0.0,
+        )
+
+    def _download_files(self, downloads: List[Tuple[str, str]]) -> None:
+        """
+        Download (key, local_file) pairs concurrently.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._download_file, key, local_file) for key, local_file in downloads]
+            for future in futures:
+                future.result()
+
+    def _list_keys(self, prefix: str) -> List[str]:
+        return [
+            obj["Key"]
+            for page in self.client.get_paginator("list_objects_v2").paginate(
+                Bucket=self.bucket, Prefix=prefix
+            )
+            for obj in page.get("Contents", [])
+        ]
+
+    def _object_exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if _is_not_found(e):
+                return False
+            raise
+
+    def _get_manifest(self, dest_path: str) -> Optional[dict]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=os.path.join(dest_path, MANIFEST_FILE))
+        except ClientError as e:
+            if _is_not_found(e):
+                return None
+            raise
+        return json.loads(response["Body"].read())
+
+    def list_artifact_subfolder(self, dest_path) -> List[dict]:
+        """
+        :param dest_path: Folder in the bucket.
+        :return: The direct subfolders of dest_path as a list of {"Prefix": "<dest_path>/<name>/"}.
+        """
+        return [
+            prefix
+            for page in self.client.get_paginator("list_objects_v2").paginate(
+                Bucket=self.bucket, Prefix=f"{dest_path}/", Delimiter="/"
+            )
+            for prefix in page.get("CommonPrefixes", [])
+        ]
+
+    def _list_numbered_subfolders(self, dest_path: str) -> List[int]:
+        names = [
+            prefix["Prefix"].rstrip("/").rsplit("/", 1)[-1]
+            for prefix in self.list_artifact_subfolder(dest_path)
+        ]
+        return [int(name) for name in names if name.isdigit()]
+
+    def _claim(self, claim_path: str, folder: str) -> bool:
+        """
+        Claim folder by writing a unique marker under claim_path. A claim only succeeds if no
+        other marker is visible afterwards and the folder holds no data. S3 lists are strongly
+        consistent, so of two concurrent claimants at most one sees only its own marker; when
+        both see each other both fail. The marker of a failed claim is deleted, the marker of a
+        successful one by release_folder once the folder holds data.
+        """
+        claim_key = f"{claim_path}/{uuid.uuid4().hex}"
+        self.client.put_object(Bucket=self.bucket, Key=claim_key, Body=b"")
+        claim_keys = self._list_keys(f"{claim_path}/")
+        if self._folder_has_data(folder):
+            # the folder can never be claimed again, so no marker of it is needed anymore
+            self._delete_objects(claim_keys)
+            return False
+        if claim_keys == [claim_key]:
+            return True
+        self.client.delete_object(Bucket=self.bucket, Key=claim_key)
+        return False
+
+    def _folder_has_data(self, folder: str) -> bool:
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=f"{folder}/", MaxKeys=1)
+        return response.get("KeyCount", 0) > 0
+
+    def allocate_folder(self, dest_path: str) -> str:
+        """
+        Atomically allocate the next numbered folder dest_path/<n>, so concurrent callers never
+        get the same folder. Numbers are not reused, but may have gaps after contention.
+        :param dest_path: Parent folder in the bucket.
+        :return: The allocated folder.
+        """
+        claims_path = os.path.join(dest_path, CLAIMS_FOLDER)
+        used = self._list_numbered_subfolders(dest_path) + self._list_numbered_subfolders(claims_path)
+        number = max(used, default=0) + 1
+        while not self._claim(os.path.join(claims_path, str(number)), os.path.join(dest_path, str(number))):
+            number += 1
+        return os.path.join(dest_path, str(number))
+
+    def release_folder(self, folder: str) -> None:
+        """
+        Delete the claim of a folder allocated by allocate_folder. Once the folder holds data it
+        is never allocated again, so its claim marker is no longer needed.
+        :param folder: The allocated folder.
+        """
+        dest_path, number = os.path.split(folder)
+        keys = self._list_keys(f"{os.path.join(dest_path, CLAIMS_FOLDER, number)}/")
+        if keys:
+            self._delete_objects(keys)
 
     def log_artifact(self, dest_path: str, local_file: str) -> None:
         dest_path = os.path.join(dest_path, os.path.basename(local_file))
@@ -47,26 +293,213 @@ class Repository:
             key=dest_path,
         )
 
+    def log_artifact_fileobj(self, dest_path: str, fileobj: BinaryIO) -> None:
+        """
+        Upload the content of a binary file-like object, such as an in-memory or spooled buffer,
+        to dest_path without writing it to a local file. Large objects are streamed with
+        multipart uploads.
+        :param dest_path: Destination key in the bucket.
+        :param fileobj: Seekable binary file-like object, read from its beginning.
+        """
+
+        def upload():
+            fileobj.seek(0)
+            self.client.upload_fileobj(
+                Fileobj=fileobj, Bucket=self.bucket, Key=dest_path, Config=self.transfer_config
+            )
+
+        self._retry(upload, f"upload to s3://{self.bucket}/{dest_path}")
+
     def log_artifacts(self, dest_path: str, local_dir: str) -> str:
         local_dir = os.path.abspath(local_dir)
+        files = []
         for root, _, filenames in os.walk(local_dir):
-            upload_path = dest_path
-            if root != local_dir:
-                rel_path = os.path.relpath(root, local_dir)
-                upload_path = os.path.join(dest_path, rel_path)
             for f in filenames:
-                self._upload_file(
-                    local_file=os.path.join(root, f),
-                    bucket=self.bucket,
-                    key=os.path.join(upload_path, f),
+                local_file = os.path.join(root, f)
+                files.append((local_file, os.path.relpath(local_file, local_dir)))
+        if self.content_addressed:
+            self._log_artifacts_content_addressed(dest_path, files)
+        elif self.bundle_compression is not None:
+            self._log_artifacts_bundle(dest_path, files)
+        else:
+            self._upload_files(
+                [(local_file, os.path.join(dest_path, rel_path)) for local_file, rel_path in files]
+            )
+        return f"s3://{self.bucket}/{dest_path}"
+
+    def _log_artifacts_bundle(self, dest_path: str, files: List[Tuple[str, str]]) -> None:
+        sidecars = [
+            (local_file, rel_path) for local_file, rel_path in files if rel_path in BUNDLE_SIDECAR_FILES
+        ]
+        bundled = [
+            (local_file, rel_path) for local_file, rel_path in files if rel_path not in BUNDLE_SIDECAR_FILES
+        ]
+        key = os.path.join(dest_path, bundle.get_bundle_file(self.bundle_compression))
+        # every attempt packs the files again, as a stream can not be rewound
+        self._retry(lambda: self._upload_bundle(key, bundled), f"upload bundle to s3://{self.bucket}/{key}")
+        self._upload_files(
+            [(local_file, os.path.join(dest_path, rel_path)) for local_file, rel_path in sidecars]
+        )
+
+    def _upload_bundle(self, key: str, files: List[Tuple[str, str]]) -> None:
+        """
+        Pack files on a background thread into a pipe, which is uploaded while it is written.
+        """
+        read_fd, write_fd = os.pipe()
+        errors: List[BaseException] = []
+
+        def pack():
+            try:
+                with os.fdopen(write_fd, "wb") as writer:
+                    bundle.pack(writer, files, self.bundle_compression)
+            except BrokenPipeError:
+                # the upload failed and closed the read end
+                pass
+            except BaseException as e:
+                errors.append(e)
+
+        packer = threading.Thread(target=pack, name="artifact-bundle-packer", daemon=True)
+        with os.fdopen(read_fd, "rb") as reader:
+            packer.start()
+            try:
+                self.client.upload_fileobj(
+                    Fileobj=reader, Bucket=self.bucket, Key=key, Config=self.transfer_config
                 )
+            finally:
+                reader.close()
+                packer.join()
+        if errors:
+            # the upload has completed with a truncated stream
+            self.client.delete_object(Bucket=self.bucket, Key=key)
+            raise errors[0]
+
+    def _download_bundle(self, key: str, local_dir: str, compression: str) -> None:
+        body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        try:
+            bundle.unpack(body, local_dir, compression)
+        finally:
+            body.close()
+
+    def _log_artifacts_content_addressed(self, dest_path: str, files: List[Tuple[str, str]]) -> None:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            digests = list(executor.map(sha256_file, [local_file for local_file, _ in files]))
+            blobs = {digest: local_file for (local_file, _), digest in zip(files, digests)}
+            exists = list(executor.map(self._object_exists, [f"{BLOB_PREFIX}/{d}" for d in blobs]))
+        missing = [
+            (local_file, f"{BLOB_PREFIX}/{digest}")
+            for (digest, local_file), found in zip(blobs.items(), exists)
+            if not found
+        ]
+        _logger.info(
+            "%d of %d blobs already exist in s3://%s", len(blobs) - len(missing), len(blobs), self.bucket
+        )
+        self._upload_files(missing)
+
+        # the manifest is written last, so it never references a blob which does not exist yet
+        manifest = {
+            "files": {
+                rel_path: {"sha256": digest, "size": os.path.getsize(local_file)}
+                for (local_file, rel_path), digest in zip(files, digests)
+            }
+        }
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=os.path.join(dest_path, MANIFEST_FILE),
+            Body=json.dumps(manifest).encode("utf-8"),
+        )
+
+    def download_artifacts(self, src_path: str, local_dir: str) -> str:
+        """
+        Download every artifact under src_path into local_dir. Content-addressed artifacts are
+        resolved through their manifest and bundles are unpacked while they are downloaded.
+        :param src_path: Source folder in the bucket.
+        :param local_dir: Local destination directory.
+        :return: The local destination directory.
+        """
+        local_dir = os.path.abspath(local_dir)
+        manifest = self._get_manifest(src_path)
+        bundles = []
+        if manifest is not None:
+            downloads = [
+                (f"{BLOB_PREFIX}/{entry['sha256']}", rel_path)
+                for rel_path, entry in manifest["files"].items()
+            ]
+        else:
+            src_prefix = f"{src_path.rstrip('/')}/"
+            downloads = []
+            for key in self._list_keys(src_prefix):
+                rel_path = key[len(src_prefix) :]
+                compression = bundle.get_bundle_compression(rel_path)
+                if compression is not None:
+                    bundles.append((key, compression))
+                else:
+                    downloads.append((key, rel_path))
+
+        local_downloads = []
+        for key, rel_path in downloads:
+            local_file = os.path.normpath(os.path.join(local_dir, rel_path))
+            if not local_file.startswith(local_dir + os.sep):
+                raise SubmarineException(f"Invalid artifact path {rel_path} in s3://{self.bucket}/{src_path}")
+            local_downloads.append((key, local_file))
+        self._download_files(local_downloads)
+        for key, compression in bundles:
+            self._retry(
+                lambda: self._download_bundle(key, local_dir, compression),
+                f"download bundle s3://{self.bucket}/{key}",
+            )
+        return local_dir
+
+    def _copy_object(self, src_key: str, dest_key: str) -> None:
+        # managed copy: objects above the multipart threshold are copied part by part on the server
+        self.client.copy(
+            CopySource={"Bucket": self.bucket, "Key": src_key},
+            Bucket=self.bucket,
+            Key=dest_key,
+            Config=self.transfer_config,
+        )
+
+    def copy_folder(self, src_path: str, dest_path: str) -> str:
+        """
+        Copy every artifact under src_path to dest_path with server-side copies, so the data
+        is not downloaded and uploaded again.
+        :param src_path: Source folder in the bucket.
+        :param dest_path: Destination folder in the bucket.
+        :return: The URI of the destination folder.
+        """
+        src_prefix = f"{src_path.rstrip('/')}/"
+        src_keys = self._list_keys(src_prefix)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._copy_object, key, os.path.join(dest_path, key[len(src_prefix) :]))
+                for key in src_keys
+            ]
+            for future in futures:
+                future.result()
         return f"s3://{self.bucket}/{dest_path}"
 
+    def _delete_objects(self, keys: List[str]) -> None:
+        response = self.client.delete_objects(
+            Bucket=self.bucket, Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+        )
+        errors = response.get("Errors")
+        if errors:
+            raise SubmarineException(
+                f"Failed to delete {len(errors)} objects from s3://{self.bucket}, first error: {errors[0]}"
+            )
+
     def delete_folder(self, dest_path) -> None:
-        objects_to_delete = self.client.list_objects(Bucket=self.bucket, Prefix=dest_path)
-        if objects_to_delete.get("Contents") is not None:
-            delete_keys: dict = {"Objects": []}
-            delete_keys["Objects"] = [
-                {"Key": k} for k in [obj["Key"] for obj in objects_to_delete.get("Contents")]
-            ]
-            self.client.delete_objects(Bucket=self.bucket, Delete=delete_keys)
+        """
+        Delete every object whose key starts with dest_path. Each listed page is deleted with a
+        batched request while the next page is being listed.
+        :param dest_path: Key prefix in the bucket.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for page in self.client.get_paginator("list_objects_v2").paginate(
+                Bucket=self.bucket, Prefix=dest_path, PaginationConfig={"PageSize": DELETE_BATCH_SIZE}
+            ):
+                keys = [obj["Key"] for obj in page.get("Contents", [])]
+                if keys:
+                    futures.append(executor.submit(self._delete_objects, keys))
+            for future in futures:
+                future.result()
@@ -0,0 +1,243 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+LIBSVM data converted once into CSR arrays in memory-mappable .npy files, so that training
+reads binary samples instead of parsing text in every epoch.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from submarine.exceptions import SubmarineException
+from submarine.ml.pytorch.input.libsvm_dataset import (
+    LIBSVMDataset,
+    get_data_loader_kwargs,
+    get_dataset_key,
+    get_index_dir,
+)
+from submarine.ml.pytorch.input.sampler import DISTRIBUTED, get_sampler
+from submarine.utils.fileio import open_input_stream
+
+logger = logging.getLogger(__name__)
+
+# Size of the blocks of text which are parsed at once.
+CONVERT_BLOCK_SIZE = 64 * 1024 * 1024
+CSR_FILES = ("indptr", "indices", "values", "labels")
+_INDEX_MAX = np.iinfo(np.int32).max
+
+
+def _iter_line_blocks(data_uri: str) -> Iterator[bytes]:
+    """
+    Stream a file in blocks of whole lines of about CONVERT_BLOCK_SIZE bytes.
+    """
+    remainder = b""
+    with open_input_stream(data_uri) as infile:
+        while True:
+            chunk = infile.read(CONVERT_BLOCK_SIZE)
+            block = remainder + chunk
+            # the incomplete last line is parsed with the next block
+            end = len(block) if not chunk else block.rfind(b"\n") + 1
+            remainder = block[end:]
+            yield block[:end]
+            if not chunk:
+                return
+
+
+def _count_csr(data_uri: str) -> Tuple[int, int]:
+    """
+    :return: The number of samples and the total number of features of a LIBSVM file, counted
+             like parse_csr counts them, i.e. lines and colons.
+    """
+    num_samples, num_entries = 0, 0
+    for block in _iter_line_blocks(data_uri):
+        block = block.rstrip(b"\n")
+        if block:
+            num_samples += block.count(b"\n") + 1
+            num_entries += block.count(b":")
+    return num_samples, num_entries
+
+
+def convert_libsvm_to_csr(data_uri: str, csr_dir: str) -> None:
+    """
+    Convert a LIBSVM file into the CSR arrays indptr (int64), indices (int32), values (float32)
+    and labels (float32), saved as .npy files into csr_dir. The file is streamed twice in blocks
+    of whole lines: once to count the samples and features, and once to parse the blocks and
+    write them into the memory-mapped arrays, so only one block is held in memory.
+    :param data_uri: URI of the LIBSVM file.
+    :param csr_dir: Existing directory of the CSR arrays.
+    """
+    num_samples, num_entries = _count_csr(data_uri)
+    # int64, as a large dataset has more than 2**31 features in total
+    dtypes = {"indptr": np.int64, "indices": np.int32, "values": np.float32, "labels": np.float32}
+    shapes = {"indptr": num_samples + 1, "indices": num_entries, "values": num_entries, "labels": num_samples}
+    arrays = {
+        name: np.lib.format.open_memmap(
+            os.path.join(csr_dir, f"{name}.npy"), mode="w+", dtype=dtypes[name], shape=(shapes[name],)
+        )
+        for name in CSR_FILES
+    }
+    arrays["indptr"][0] = 0
+    sample, entry = 0, 0
+    for block in _iter_line_blocks(data_uri):
+        num_features, indices, values, labels = LIBSVMDataset.parse_csr(block)
+        if len(indices) and (indices.min() < 0 or indices.max() > _INDEX_MAX):
+            raise SubmarineException("LIBSVM feature indices must be in the range of int32")
+        next_sample, next_entry = sample + len(labels), entry + len(indices)
+        if next_sample > num_samples or next_entry > num_entries:
+            raise SubmarineException(f"{data_uri} changed while it was converted")
+        arrays["indptr"][sample + 1 : next_sample + 1] = entry + np.cumsum(num_features)
+        arrays["indices"][entry:next_entry] = indices
+        arrays["values"][entry:next_entry] = values
+        arrays["labels"][sample:next_sample] = labels
+        sample, entry = next_sample, next_entry
+    if (sample, entry) != (num_samples, num_entries):
+        raise SubmarineException(f"{data_uri} changed while it was converted")
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+
+class LIBSVMCSRDataset(Dataset):
+    """
+    Dataset of LIBSVM samples which have been converted by convert_libsvm_to_csr. The arrays are
+    memory mapped, so the samples of a batch are gathered without parsing or copying the file.
+    """
+
+    def __init__(self, csr_dir: str):
+        """
+        :param csr_dir: Directory of the CSR arrays.
+        """
+        super().__init__()
+        self.csr_dir = csr_dir
+        self._arrays: Optional[dict] = None
+        self._num_samples = len(self.arrays["labels"])
+
+    @property
+    def arrays(self) -> dict:
+        if self._arrays is None:
+            self._arrays = {
+                name: np.load(os.path.join(self.csr_dir, f"{name}.npy"), mmap_mode="r") for name in CSR_FILES
+            }
+        return self._arrays
+
+    def __getstate__(self):
+        # DataLoader workers map the arrays themselves instead of receiving a copy of them
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    def __len__(self) -> int:
+        return self._num_samples
+
+    def __getitem__(self, idx) -> Tuple[torch.Tensor, torch.Tensor, int]:
+        indptr = self.arrays["indptr"]
+        start, end = indptr[idx], indptr[idx + 1]
+        return (
+            torch.from_numpy(self.arrays["indices"][start:end].astype(np.int64)),
+            torch.from_numpy(np.array(self.arrays["values"][start:end])),
+            int(self.arrays["labels"][idx]),
+        )
+
+    def __getitems__(self, indices: List[int]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Gather the samples of a whole batch with vectorized indexing. Used by the DataLoader of
+        PyTorch 2.0 and later, which has to pass the batch through LIBSVMDataset.collate_batch.
+        """
+        indices = np.asarray(indices)
+        indptr = self.arrays["indptr"]
+        starts, ends = indptr[indices], indptr[indices + 1]
+        num_features = ends - starts
+        if len(indices) and num_features.min() != num_features.max():
+            raise SubmarineException("All samples of a LIBSVM batch must have the same number of features")
+        positions = starts[:, np.newaxis] + np.arange(num_features[0] if len(indices) else 0)
+        return (
+            torch.from_numpy(self.arrays["indices"][positions].astype(np.int64)),
+            torch.from_numpy(self.arrays["values"][positions]),
+            torch.from_numpy(self.arrays["labels"][indices].astype(np.int64)),
+        )
+
+    @classmethod
+    def prepare_dataset(cls, data_uri: str, cache_dir: Optional[str] = None):
+        """
+        Open the CSR cache of data_uri, converting the file first if it is new or has been
+        modified since it was converted.
+        :param data_uri: URI of the LIBSVM file.
+        :param cache_dir: Directory of the CSR caches. Defaults to $SUBMARINE_DATASET_INDEX_DIR
+                          or ~/.cache/submarine/datasets.
+        """
+        key = get_dataset_key(data_uri)
+        if key is None:
+            raise SubmarineException(f"Cannot cache {data_uri} as its modification time is unknown")
+        cache_dir = get_index_dir(cache_dir)
+        csr_dir = os.path.join(cache_dir, f"{key}.csr")
+        if os.path.isdir(csr_dir):
+            logger.info("Reading %s from its CSR cache %s", data_uri, csr_dir)
+            return LIBSVMCSRDataset(csr_dir)
+
+        logger.info("Converting %s into the CSR cache %s", data_uri, csr_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir)
+        try:
+            convert_libsvm_to_csr(data_uri, tmp_dir)
+            # concurrent processes never read a partially written cache
+            os.rename(tmp_dir, csr_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(csr_dir):
+                raise
+            # another process has converted the file meanwhile
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return LIBSVMCSRDataset(csr_dir)
+
+
+def libsvm_csr_input_fn(
+    filepath,
+    batch_size=256,
+    num_workers=0,
+    pin_memory=False,
+    prefetch_factor=None,
+    persistent_workers=False,
+    sampler=DISTRIBUTED,
+    seed=0,
+    shuffle=True,
+    ragged=False,
+    **kwargs,
+):
+    """
+    :param ragged: Not supported, the CSR arrays are read as padded batches.
+    """
+    if ragged:
+        raise ValueError("ragged batches are only supported by the libsvm input")
+
+    def _input_fn():
+        dataset = LIBSVMCSRDataset.prepare_dataset(data_uri=filepath)
+        return DataLoader(
+            dataset=dataset,
+            batch_size=batch_size,
+            sampler=get_sampler(sampler, dataset, seed=seed, shuffle=shuffle),
+            collate_fn=LIBSVMDataset.collate_batch,
+            **get_data_loader_kwargs(num_workers, pin_memory, prefetch_factor, persistent_workers),
+        )
+
+    return _input_fn
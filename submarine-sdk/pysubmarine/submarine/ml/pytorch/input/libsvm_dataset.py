@@ -13,35 +13,150 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import functools
-import itertools
-import multiprocessing as mp
+import hashlib
+import logging
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 
 import numpy as np
 import torch
+from pyarrow import fs
 from torch.utils.data import DataLoader, Dataset
-from torch.utils.data.distributed import DistributedSampler
+from torch.utils.data.dataloader import default_collate
 
-from submarine.utils.fileio import file_info, open_buffered_file_reader
+from submarine.exceptions import SubmarineException
+from submarine.ml.pytorch.input.sampler import DISTRIBUTED, get_sampler
+from submarine.utils.fileio import (
+    file_info,
+    get_filesystem,
+    open_input_file,
+    open_input_stream,
+    open_mapped,
+    read_file_ranges,
+)
+
+logger = logging.getLogger(__name__)
+
+_INDEX_DIR_ENV_VAR = "SUBMARINE_DATASET_INDEX_DIR"
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "submarine", "datasets")
+# Size of the chunks which are scanned for newlines at once.
+_INDEX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# maps the ":" and newline separators of LIBSVM lines to spaces
+_SEPARATORS = bytes.maketrans(b":\n", b"  ")
+_NEWLINE = ord("\n")
+
+
+def get_index_dir(index_dir: Optional[str] = None) -> str:
+    """
+    :return: index_dir, or else the directory of persisted dataset indices and caches.
+    """
+    return index_dir or os.environ.get(_INDEX_DIR_ENV_VAR, DEFAULT_INDEX_DIR)
+
+
+def get_dataset_key(data_uri: str) -> Optional[str]:
+    """
+    :return: A key of the current content of the file data_uri, which changes whenever the file
+             is modified, or None if its modification time is unknown.
+    """
+    finfo = file_info(data_uri)
+    if finfo.mtime_ns is None:
+        return None
+    filesystem, path = get_filesystem(data_uri)
+    return hashlib.sha256(
+        f"{filesystem.type_name}:{path}:{finfo.size}:{finfo.mtime_ns}".encode("utf-8")
+    ).hexdigest()
+
+
+def _find_line_ends(chunk: np.ndarray, chunk_start: int) -> np.ndarray:
+    # the offsets just behind every newline of the chunk
+    return np.flatnonzero(chunk == _NEWLINE) + (chunk_start + 1)
 
 
 class LIBSVMDataset(Dataset):
-    def __init__(self, data_uri: str, sample_offset: np.ndarray):
+    def __init__(self, data_uri: str, sample_offset: np.ndarray, ragged: bool = False):
+        """
+        :param data_uri: URI of the LIBSVM file.
+        :param sample_offset: Byte offsets of the samples in the file.
+        :param ragged: Whether batches are read by parse_ragged_batch, so samples may have
+                       different numbers of features.
+        """
         super().__init__()
         self.data_uri = data_uri
         self.sample_offset = sample_offset
+        self.ragged = ragged
+        # every sample ends where the next one starts, the last one at the end of the file
+        self.sample_end = np.append(sample_offset[1:], file_info(data_uri).size)
+        self._infile = None
+        self._infile_pid: Optional[int] = None
+
+    def __getstate__(self):
+        # DataLoader workers open their own file handle
+        state = self.__dict__.copy()
+        state["_infile"] = None
+        state["_infile_pid"] = None
+        return state
+
+    def _get_infile(self):
+        # a handle inherited through fork must not be shared with the parent process
+        if self._infile is None or self._infile_pid != os.getpid():
+            self._infile = open_input_file(self.data_uri)
+            self._infile_pid = os.getpid()
+        return self._infile
 
     def __len__(self) -> int:
         return len(self.sample_offset)
 
     def __getitem__(self, idx) -> Tuple[torch.Tensor, torch.Tensor, int]:
-        with open_buffered_file_reader(self.data_uri) as infile:
-            infile.seek(self.sample_offset[idx], os.SEEK_SET)
-            sample = infile.readline()
+        start, end = self.sample_offset[idx], self.sample_end[idx]
+        sample = self._get_infile().read_at(end - start, start)
         return LIBSVMDataset.parse_sample(sample)
 
+    def __getitems__(self, indices: List[int]) -> Tuple[torch.Tensor, ...]:
+        """
+        Read the samples of a whole batch at once: their byte ranges are sorted and coalesced
+        into few large reads, and the batch is parsed by parse_batch, or parse_ragged_batch if
+        the dataset is ragged. Used by the DataLoader of PyTorch 2.0 and later, which has to
+        pass the batch through collate_batch or collate_ragged.
+        """
+        starts, ends = self.sample_offset[indices], self.sample_end[indices]
+        samples = read_file_ranges(
+            self._get_infile(), list(zip(starts.tolist(), (ends - starts).tolist())), max_workers=1
+        )
+        parse = LIBSVMDataset.parse_ragged_batch if self.ragged else LIBSVMDataset.parse_batch
+        # the last line of the file may have no trailing newline
+        return parse(b"\n".join(bytes(sample).rstrip(b"\n") for sample in samples))
+
+    @staticmethod
+    def collate_batch(batch):
+        """
+        collate_fn of data loaders of a LIBSVMDataset, which passes batches already collated by
+        __getitems__ through and collates lists of samples from __getitem__ as usual.
+        """
+        if isinstance(batch, tuple):
+            return batch
+        return default_collate(batch)
+
+    @staticmethod
+    def collate_ragged(batch):
+        """
+        collate_fn of data loaders of a ragged LIBSVMDataset, which passes batches already
+        collated by __getitems__ through and concatenates lists of samples from __getitem__,
+        which may have different numbers of features, like parse_ragged_batch.
+        """
+        if isinstance(batch, tuple):
+            return batch
+        feature_idx, feature_value, label = zip(*batch)
+        lengths = torch.tensor([len(idx) for idx in feature_idx], dtype=torch.long)
+        return (
+            torch.cat(feature_idx),
+            torch.cat(feature_value),
+            torch.cumsum(lengths, dim=0) - lengths,
+            torch.tensor(label, dtype=torch.long),
+        )
+
     @classmethod
     def parse_sample(cls, sample: bytes) -> Tuple[torch.Tensor, torch.Tensor, int]:
         label, *entries = sample.rstrip(b"\n").split(b" ")
@@ -53,56 +168,235 @@ class LIBSVMDataset(Dataset):
         return feature_idx, feature_value, int(label)
 
     @classmethod
-    def prepare_dataset(cls, data_uri: str, n_jobs: Optional[int] = os.cpu_count()):
+    def parse_csr(cls, block: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Parse a block of LIBSVM lines with vectorized NumPy operations instead of a Python loop
+        per entry.
+        :param block: Contiguous newline separated samples.
+        :return: The number of features of every sample, the concatenated feature indices and
+                 values of all samples, and the labels, as float64 arrays except the first.
+        """
+        block = block.rstrip(b"\n")
+        if not block:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), np.zeros(0)
+        chars = np.frombuffer(block, dtype=np.uint8)
+        line_ends = np.append(np.flatnonzero(chars == _NEWLINE), len(chars))
+        colons = np.flatnonzero(chars == ord(":"))
+        num_features = np.diff(np.searchsorted(colons, line_ends), prepend=0)
+        # every line becomes "label idx value idx value ..." which is parsed as one flat array
+        values = np.fromstring(block.translate(_SEPARATORS), sep=" ")
+        line_sizes = 1 + 2 * num_features
+        if len(values) != line_sizes.sum():
+            raise SubmarineException("Malformed LIBSVM data")
+        label_pos = np.cumsum(line_sizes) - line_sizes
+        is_feature = np.ones(len(values), dtype=bool)
+        is_feature[label_pos] = False
+        features = values[is_feature]
+        return num_features, features[0::2], features[1::2], values[label_pos]
+
+    @classmethod
+    def parse_batch(cls, block: bytes) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Parse a block of LIBSVM lines, which all have the same number of features, with
+        parse_csr.
+        :param block: Contiguous newline separated samples.
+        :return: feature_idx and feature_value of shape (num_samples, num_features) and label of
+                 shape (num_samples,), the same tensors as the default collation of parse_sample.
+        """
+        num_features, feature_idx, feature_value, label = LIBSVMDataset.parse_csr(block)
+        if num_features.min() != num_features.max():
+            raise SubmarineException("All samples of a LIBSVM batch must have the same number of features")
+        shape = (len(num_features), int(num_features[0]))
+        return (
+            torch.from_numpy(feature_idx.astype(np.int64).reshape(shape)),
+            torch.from_numpy(feature_value.astype(np.float32).reshape(shape)),
+            torch.from_numpy(label.astype(np.int64)),
+        )
+
+    @classmethod
+    def parse_ragged_batch(
+        cls, block: bytes
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Parse a block of LIBSVM lines, which may have different numbers of features, with
+        parse_csr into the flat input of the nn.EmbeddingBag based layers.
+        :param block: Contiguous newline separated samples.
+        :return: feature_idx and feature_value of the concatenated features of all samples, the
+                 offsets of the features of every sample in them and label of shape
+                 (num_samples,).
+        """
+        num_features, feature_idx, feature_value, label = LIBSVMDataset.parse_csr(block)
+        return (
+            torch.from_numpy(feature_idx.astype(np.int64)),
+            torch.from_numpy(feature_value.astype(np.float32)),
+            torch.from_numpy(np.cumsum(num_features) - num_features),
+            torch.from_numpy(label.astype(np.int64)),
+        )
+
+    @classmethod
+    def prepare_dataset(
+        cls,
+        data_uri: str,
+        n_jobs: Optional[int] = os.cpu_count(),
+        index_dir: Optional[str] = None,
+        ragged: bool = False,
+    ):
+        """
+        :param data_uri: URI of the LIBSVM file.
+        :param n_jobs: Number of threads which scan a local file for sample offsets, 0 for one
+                       per CPU.
+        :param index_dir: Directory of persisted sample-offset indices. Defaults to
+                          $SUBMARINE_DATASET_INDEX_DIR or ~/.cache/submarine/datasets.
+        :param ragged: Whether samples may have different numbers of features.
+        """
         if n_jobs is None:
             raise Exception("No enough cpu!")
         else:
-            sample_offset = LIBSVMDataset._locate_sample_offsets(data_uri=data_uri, n_jobs=n_jobs)
-            return LIBSVMDataset(data_uri=data_uri, sample_offset=sample_offset)
+            sample_offset = LIBSVMDataset._load_sample_offsets(data_uri, n_jobs, index_dir)
+            return LIBSVMDataset(data_uri=data_uri, sample_offset=sample_offset, ragged=ragged)
+
+    @classmethod
+    def _load_sample_offsets(cls, data_uri: str, n_jobs: int, index_dir: Optional[str]) -> np.ndarray:
+        """
+        Load the sample offsets of data_uri from its persisted index, building and persisting
+        the index first if the file is new or has been modified since it was indexed.
+        """
+        key = get_dataset_key(data_uri)
+        if key is None:
+            return LIBSVMDataset._locate_sample_offsets(data_uri, n_jobs)
+        index_dir = get_index_dir(index_dir)
+        index_file = os.path.join(index_dir, f"{key}.offsets.npy")
+        try:
+            return np.load(index_file)
+        except FileNotFoundError:
+            pass
+
+        sample_offset = LIBSVMDataset._locate_sample_offsets(data_uri, n_jobs)
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            # concurrent processes indexing the same file never read a partially written index
+            with tempfile.NamedTemporaryFile(dir=index_dir, suffix=".npy", delete=False) as f:
+                np.save(f, sample_offset)
+            os.replace(f.name, index_file)
+        except OSError as e:
+            logger.warning("Failed to persist the sample-offset index of %s: %s", data_uri, e)
+        return sample_offset
 
     @classmethod
     def _locate_sample_offsets(cls, data_uri: str, n_jobs: int) -> np.ndarray:
-        finfo = file_info(data_uri)
-        chunk_size, _ = divmod(finfo.size, n_jobs)
-
-        chunk_starts = [0]
-        with open_buffered_file_reader(data_uri) as infile:
-            while infile.tell() < finfo.size:
-                infile.seek(chunk_size, os.SEEK_CUR)
-                infile.readline()
-                chunk_starts.append(min(infile.tell(), finfo.size))
-
-        with mp.Pool(processes=n_jobs, maxtasksperchild=1) as pool:
-            return np.asarray(
-                list(
-                    itertools.chain.from_iterable(
-                        pool.imap(
-                            functools.partial(LIBSVMDataset._locate_sample_offsets_job, data_uri),
-                            iterable=enumerate(zip(chunk_starts[:-1], chunk_starts[1:])),
-                        )
+        """
+        Find the start of every line with vectorized newline scans over chunks of the file.
+        Local files are memory mapped and their chunks are scanned by n_jobs threads, as NumPy
+        releases the GIL; remote files are scanned while they are streamed.
+        """
+        filesystem, _ = get_filesystem(data_uri)
+        if isinstance(filesystem, fs.LocalFileSystem):
+            data = open_mapped(data_uri)
+            size = len(data)
+            chunk_starts = range(0, size, _INDEX_CHUNK_SIZE)
+            with ThreadPoolExecutor(max_workers=n_jobs or None) as executor:
+                line_ends = list(
+                    executor.map(
+                        lambda start: _find_line_ends(data[start : start + _INDEX_CHUNK_SIZE], start),
+                        chunk_starts,
                     )
                 )
-            )
+        else:
+            size, line_ends = 0, []
+            with open_input_stream(data_uri) as infile:
+                while True:
+                    chunk = infile.read(_INDEX_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    line_ends.append(_find_line_ends(np.frombuffer(chunk, dtype=np.uint8), size))
+                    size += len(chunk)
+        sample_offset = np.concatenate([np.zeros(1, dtype=np.int64)] + line_ends)
+        # a trailing newline does not start another sample
+        return sample_offset[sample_offset < size]
+
+
+def get_data_loader_kwargs(
+    num_workers: int = 0,
+    pin_memory: bool = False,
+    prefetch_factor: Optional[int] = None,
+    persistent_workers: bool = False,
+) -> dict:
+    """
+    Keyword arguments of a DataLoader from the training parameters.
+    :param num_workers: Number of worker processes which load batches, 0 to load them in the
+                        training process.
+    :param pin_memory: Whether batches are copied into pinned memory for faster GPU transfers.
+    :param prefetch_factor: Number of batches loaded in advance by each worker.
+    :param persistent_workers: Whether workers are kept alive between epochs.
+    """
+    kwargs = {"num_workers": num_workers, "pin_memory": pin_memory}
+    # the DataLoader rejects these options without workers
+    if num_workers > 0:
+        if prefetch_factor is not None:
+            kwargs["prefetch_factor"] = prefetch_factor
+        kwargs["persistent_workers"] = persistent_workers
+    return kwargs
+
+
+def libsvm_input_fn(
+    filepath,
+    batch_size=256,
+    num_threads=1,
+    num_workers=0,
+    pin_memory=False,
+    prefetch_factor=None,
+    persistent_workers=False,
+    sampler=DISTRIBUTED,
+    streaming=False,
+    shuffle_buffer_size=0,
+    seed=0,
+    ragged=False,
+    shuffle=True,
+    **kwargs,
+):
+    """
+    :param filepath: URI of the LIBSVM file. In streaming mode also a list of URIs or glob
+                     patterns.
+    :param sampler: "distributed" to read samples in a uniformly random order, "block_shuffle"
+                    to shuffle blocks of consecutive samples with a BlockShuffleSampler.
+    :param streaming: Whether the files are streamed by LIBSVMStreamingDataset instead of read
+                      at random offsets, which avoids indexing huge or remote files.
+    :param shuffle_buffer_size: Number of samples which are shuffled in streaming mode.
+    :param seed: Seed of the block_shuffle sampler and of the shuffling in streaming mode.
+    :param ragged: Whether samples may have different numbers of features. Batches are then
+                   (feature_idx, feature_value, offsets, label) of the concatenated features of
+                   their samples, the input of models built on FeatureBagLinear and
+                   FeatureBagEmbedding, instead of padded (batch_size, num_fields) tensors.
+    :param shuffle: Whether the samples are shuffled, or read in file order, e.g. for
+                    evaluation and prediction.
+    """
 
-    @classmethod
-    def _locate_sample_offsets_job(cls, data_uri: str, task: Tuple[int, Tuple[int, int]]) -> List[int]:
-        _, (start, end) = task
-        offsets = [start]
-        with open_buffered_file_reader(data_uri) as infile:
-            infile.seek(start, os.SEEK_SET)
-            while infile.tell() < end:
-                infile.readline()
-                offsets.append(infile.tell())
-            assert offsets.pop() == end
-        return offsets
-
-
-def libsvm_input_fn(filepath, batch_size=256, num_threads=1, **kwargs):
     def _input_fn():
-        dataset = LIBSVMDataset.prepare_dataset(data_uri=filepath, n_jobs=num_threads)
-        sampler = DistributedSampler(dataset)
+        loader_kwargs = get_data_loader_kwargs(num_workers, pin_memory, prefetch_factor, persistent_workers)
+        if streaming:
+            # imported here as the streaming dataset builds on LIBSVMDataset
+            from submarine.ml.pytorch.input.streaming_dataset import (
+                LIBSVMStreamingDataset,
+            )
+
+            dataset = LIBSVMStreamingDataset(
+                filepath,
+                batch_size=batch_size,
+                shuffle_buffer_size=shuffle_buffer_size if shuffle else 0,
+                seed=seed,
+                ragged=ragged,
+            )
+            # the dataset yields whole batches
+            return DataLoader(dataset=dataset, batch_size=None, **loader_kwargs)
+        dataset = LIBSVMDataset.prepare_dataset(data_uri=filepath, n_jobs=num_threads, ragged=ragged)
         return DataLoader(
-            dataset=dataset, batch_size=batch_size, sampler=sampler, num_workers=0
-        )  # should be 0 (pytorch bug)
+            dataset=dataset,
+            batch_size=batch_size,
+            sampler=get_sampler(
+                sampler, dataset, sample_offset=dataset.sample_offset, seed=seed, shuffle=shuffle
+            ),
+            collate_fn=LIBSVMDataset.collate_ragged if ragged else LIBSVMDataset.collate_batch,
+            **loader_kwargs,
+        )
 
     return _input_fn
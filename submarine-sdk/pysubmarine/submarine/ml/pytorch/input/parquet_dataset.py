@@ -0,0 +1,149 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import warnings
+from typing import Iterator, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import torch
+from torch.utils.data import DataLoader, IterableDataset
+
+from submarine.ml.pytorch.input.libsvm_dataset import get_data_loader_kwargs
+from submarine.ml.pytorch.input.streaming_dataset import get_reader
+from submarine.utils.parquet_utils import (
+    list_row_groups,
+    list_to_numpy,
+    read_row_groups,
+)
+
+
+def _from_numpy(array: np.ndarray, dtype: np.dtype) -> torch.Tensor:
+    if array.dtype != dtype:
+        array = array.astype(dtype)
+    with warnings.catch_warnings():
+        # arrays on Arrow buffers are read-only, the tensors must not be modified in place
+        warnings.simplefilter("ignore", UserWarning)
+        return torch.from_numpy(array)
+
+
+class ParquetDataset(IterableDataset):
+    """
+    Iterable dataset of batches of Parquet files, which have a list column of feature indices,
+    a list column of feature values and a label column. The row groups are distributed
+    round-robin over all readers, i.e. the DataLoader workers of every rank, and only the three
+    columns are read. Feature indices stored as int64 and values stored as float32 become
+    tensors on the Arrow buffers without a copy.
+    """
+
+    def __init__(
+        self,
+        data_uris: Union[str, Sequence[str]],
+        batch_size: int,
+        feat_ids_column: str = "feat_ids",
+        feat_vals_column: str = "feat_vals",
+        label_column: str = "label",
+        shuffle: bool = False,
+        seed: int = 0,
+    ):
+        """
+        :param data_uris: URIs or glob patterns of the Parquet files.
+        :param batch_size: Maximum number of samples of a batch.
+        :param feat_ids_column: Name of the list column of feature indices.
+        :param feat_vals_column: Name of the list column of feature values.
+        :param label_column: Name of the label column.
+        :param shuffle: Whether the order of the row groups is shuffled in every epoch.
+        :param seed: Seed of the shuffling.
+        """
+        super().__init__()
+        self.row_groups = list_row_groups(data_uris)
+        self.batch_size = batch_size
+        self.columns = [feat_ids_column, feat_vals_column, label_column]
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Set the epoch which seeds the next iteration. Without calling it, every iteration of a
+        DataLoader worker moves on to the next epoch.
+        """
+        self.epoch = epoch
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]:
+        epoch = self.epoch
+        # workers which persist over epochs have no set_epoch calls forwarded to them
+        self.epoch += 1
+        row_groups = list(self.row_groups)
+        if self.shuffle:
+            # every reader draws the same permutation
+            random.Random(f"{self.seed}-{epoch}").shuffle(row_groups)
+        reader, num_readers = get_reader()
+        for batch in read_row_groups(row_groups[reader::num_readers], self.columns, self.batch_size):
+            feat_ids, feat_vals, label = batch.columns
+            yield (
+                _from_numpy(list_to_numpy(feat_ids), np.int64),
+                _from_numpy(list_to_numpy(feat_vals), np.float32),
+                _from_numpy(label.to_numpy(zero_copy_only=False), _label_dtype(label.type)),
+            )
+
+
+def _label_dtype(arrow_type: pa.DataType) -> np.dtype:
+    # integral labels are long like the labels of the LIBSVM inputs
+    return np.int64 if pa.types.is_integer(arrow_type) else np.float32
+
+
+def parquet_input_fn(
+    filepath,
+    batch_size=256,
+    num_workers=0,
+    pin_memory=False,
+    prefetch_factor=None,
+    persistent_workers=False,
+    seed=0,
+    feat_ids_column="feat_ids",
+    feat_vals_column="feat_vals",
+    label_column="label",
+    shuffle=True,
+    ragged=False,
+    **kwargs,
+):
+    """
+    :param filepath: URI, glob pattern or list of them of the Parquet files.
+    :param shuffle: Whether the order of the row groups is shuffled in every epoch.
+    :param ragged: Not supported, the list columns must have the same length in every row.
+    """
+    if ragged:
+        raise ValueError("ragged batches are only supported by the libsvm input")
+
+    def _input_fn():
+        dataset = ParquetDataset(
+            filepath,
+            batch_size=batch_size,
+            feat_ids_column=feat_ids_column,
+            feat_vals_column=feat_vals_column,
+            label_column=label_column,
+            shuffle=shuffle,
+            seed=seed,
+        )
+        # the dataset yields whole batches
+        return DataLoader(
+            dataset=dataset,
+            batch_size=None,
+            **get_data_loader_kwargs(num_workers, pin_memory, prefetch_factor, persistent_workers),
+        )
+
+    return _input_fn
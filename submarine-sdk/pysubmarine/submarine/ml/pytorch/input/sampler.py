@@ -0,0 +1,143 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from typing import Iterator, Optional
+
+import numpy as np
+from torch import distributed
+from torch.utils.data import Dataset, Sampler
+from torch.utils.data.distributed import DistributedSampler
+
+from submarine.exceptions import SubmarineException
+
+# Size in bytes of the blocks of consecutive samples which are shuffled as a whole.
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+# Number of samples of a block when the byte offsets of the samples are unknown.
+DEFAULT_BLOCK_SAMPLES = 16384
+# Number of consecutive blocks of the permutation whose samples are shuffled together.
+DEFAULT_WINDOW_SIZE = 4
+
+DISTRIBUTED = "distributed"
+BLOCK_SHUFFLE = "block_shuffle"
+
+
+class BlockShuffleSampler(Sampler):
+    """
+    Distributed sampler which keeps reads local. The dataset is cut into blocks of consecutive
+    samples, the blocks are shuffled, the samples are shuffled within windows of a few
+    consecutive blocks of this permutation, and every rank takes a contiguous part of it. Every
+    epoch is still a permutation of the dataset, padded like DistributedSampler so all ranks get
+    the same number of samples, but the samples of a batch come from a few megabytes of the
+    file instead of all of it.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        sample_offset: Optional[np.ndarray] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        block_samples: int = DEFAULT_BLOCK_SAMPLES,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+        shuffle: bool = True,
+        seed: int = 0,
+        drop_last: bool = False,
+    ):
+        """
+        :param dataset: Map-style dataset.
+        :param sample_offset: Byte offsets of the samples in their file, which cut the blocks
+                              into block_size bytes. Without them blocks have block_samples
+                              samples.
+        :param block_size: Size of a block in bytes.
+        :param block_samples: Number of samples of a block without sample_offset.
+        :param window_size: Number of blocks whose samples are shuffled together.
+        :param num_replicas: Number of ranks, by default the world size of the process group.
+        :param rank: Rank of this process, by default its rank in the process group.
+        :param shuffle: Whether blocks and samples are shuffled at all.
+        :param seed: Seed of the shuffling, which is combined with the epoch.
+        :param drop_last: Whether samples are dropped instead of padded to divide evenly.
+        """
+        if num_replicas is None:
+            num_replicas = distributed.get_world_size()
+        if rank is None:
+            rank = distributed.get_rank()
+        num_total = len(dataset)
+        if sample_offset is not None:
+            # a block starts with the first sample of every block_size bytes of the file
+            block_ids = np.asarray(sample_offset) // block_size
+            self.block_starts = np.flatnonzero(np.diff(block_ids, prepend=-1))
+        else:
+            self.block_starts = np.arange(0, num_total, block_samples)
+        self.block_ends = np.append(self.block_starts[1:], num_total)
+        self.window_size = window_size
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+        if drop_last:
+            self.num_samples = num_total // num_replicas
+        else:
+            self.num_samples = math.ceil(num_total / num_replicas)
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+    def __iter__(self) -> Iterator[int]:
+        rng = np.random.default_rng([self.seed, self.epoch])
+        blocks = np.arange(len(self.block_starts))
+        if self.shuffle:
+            rng.shuffle(blocks)
+        # the samples of the permuted blocks, each block in file order
+        lengths = self.block_ends[blocks] - self.block_starts[blocks]
+        ends = np.cumsum(lengths)
+        indices = np.repeat(self.block_starts[blocks] - (ends - lengths), lengths) + np.arange(lengths.sum())
+        window_ends = ends[self.window_size - 1 :: self.window_size]
+        if self.shuffle:
+            for start, end in zip(np.append(0, window_ends), np.append(window_ends, len(indices))):
+                rng.shuffle(indices[start:end])
+        # pad or drop samples like DistributedSampler, then every rank takes a contiguous part
+        total_size = self.num_samples * self.num_replicas
+        if len(indices) < total_size:
+            indices = np.resize(indices, total_size)
+        indices = indices[self.rank * self.num_samples : (self.rank + 1) * self.num_samples]
+        return iter(indices.tolist())
+
+
+def get_sampler(
+    name: str,
+    dataset: Dataset,
+    sample_offset: Optional[np.ndarray] = None,
+    seed: int = 0,
+    shuffle: bool = True,
+) -> Sampler:
+    """
+    :param name: "distributed" for a DistributedSampler, "block_shuffle" for a
+                 BlockShuffleSampler.
+    :param dataset: Map-style dataset.
+    :param sample_offset: Byte offsets of the samples of the dataset, if known.
+    :param seed: Seed of the shuffling.
+    :param shuffle: Whether the samples are shuffled, or read in file order.
+    """
+    if name == DISTRIBUTED:
+        return DistributedSampler(dataset, shuffle=shuffle)
+    if name == BLOCK_SHUFFLE:
+        return BlockShuffleSampler(dataset, sample_offset=sample_offset, shuffle=shuffle, seed=seed)
+    raise SubmarineException(f"Unsupported sampler {name}, expected one of {[DISTRIBUTED, BLOCK_SHUFFLE]}")
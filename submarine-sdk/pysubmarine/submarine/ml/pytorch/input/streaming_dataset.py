@@ -0,0 +1,138 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Streaming LIBSVM input for files which are too large, or too remote, to be indexed and read
+at random offsets.
+"""
+
+import itertools
+import os
+import random
+from typing import Iterator, List, Sequence, Tuple, Union
+
+import torch
+from torch import distributed
+from torch.utils.data import IterableDataset, get_worker_info
+
+from submarine.ml.pytorch.input.libsvm_dataset import LIBSVMDataset
+from submarine.utils.fileio import list_splits, read_line_blocks
+
+# Size of the byte ranges of the files which are distributed over the readers.
+DEFAULT_SPLIT_SIZE = 256 * 1024 * 1024
+# Size of the sequential reads of a byte range.
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def get_reader() -> Tuple[int, int]:
+    """
+    :return: The index of this reader, i.e. the current DataLoader worker of this rank, among
+             the readers of all ranks, and the number of readers.
+    """
+    if distributed.is_available() and distributed.is_initialized():
+        rank, world_size = distributed.get_rank(), distributed.get_world_size()
+    else:
+        rank, world_size = int(os.environ.get("RANK", 0)), int(os.environ.get("WORLD", 1))
+    worker_info = get_worker_info()
+    if worker_info is None:
+        return rank, world_size
+    return rank * worker_info.num_workers + worker_info.id, world_size * worker_info.num_workers
+
+
+def _read_lines(uri: str, start: int, end: int, block_size: int) -> Iterator[bytes]:
+    for block in read_line_blocks(uri, start, end, block_size):
+        yield from (line for line in block.split(b"\n") if line)
+
+
+class LIBSVMStreamingDataset(IterableDataset):
+    """
+    Iterable dataset of LIBSVM batches. The files are cut into byte ranges which are distributed
+    round-robin over all readers, i.e. the DataLoader workers of every rank, and each reader
+    reads its ranges sequentially in large blocks. Samples are shuffled approximately through a
+    buffer, with a seed derived from the seed, the epoch and the reader. Ranks may get different
+    numbers of batches, the training loop keeps them in step with iter_in_lockstep.
+    """
+
+    def __init__(
+        self,
+        data_uris: Union[str, Sequence[str]],
+        batch_size: int,
+        shuffle_buffer_size: int = 0,
+        seed: int = 0,
+        split_size: int = DEFAULT_SPLIT_SIZE,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        ragged: bool = False,
+    ):
+        """
+        :param data_uris: URIs or glob patterns of the LIBSVM files.
+        :param batch_size: Number of samples of a batch.
+        :param shuffle_buffer_size: Number of samples which are shuffled, 0 to read them in order.
+        :param seed: Seed of the shuffling.
+        :param split_size: Size of the byte ranges which are distributed over the readers.
+        :param block_size: Size of the sequential reads.
+        :param ragged: Whether batches are parsed by LIBSVMDataset.parse_ragged_batch, so
+                       samples may have different numbers of features.
+        """
+        super().__init__()
+        self.splits = list_splits(data_uris, split_size)
+        self.batch_size = batch_size
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.seed = seed
+        self.block_size = block_size
+        self.ragged = ragged
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Set the epoch which seeds the next iteration. Without calling it, every iteration of a
+        DataLoader worker moves on to the next epoch.
+        """
+        self.epoch = epoch
+
+    def _iter_samples(self, rng: random.Random) -> Iterator[bytes]:
+        reader, num_readers = get_reader()
+        splits = self.splits[reader::num_readers]
+        if self.shuffle_buffer_size > 0:
+            rng.shuffle(splits)
+        samples = itertools.chain.from_iterable(
+            _read_lines(uri, start, end, self.block_size) for uri, start, end in splits
+        )
+        if self.shuffle_buffer_size <= 0:
+            yield from samples
+            return
+
+        buffer: List[bytes] = []
+        for sample in samples:
+            if len(buffer) < self.shuffle_buffer_size:
+                buffer.append(sample)
+                continue
+            i = rng.randrange(len(buffer))
+            yield buffer[i]
+            buffer[i] = sample
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, ...]]:
+        epoch = self.epoch
+        # workers which persist over epochs have no set_epoch calls forwarded to them
+        self.epoch += 1
+        reader, _ = get_reader()
+        rng = random.Random(f"{self.seed}-{epoch}-{reader}")
+        samples = self._iter_samples(rng)
+        parse = LIBSVMDataset.parse_ragged_batch if self.ragged else LIBSVMDataset.parse_batch
+        while True:
+            batch = list(itertools.islice(samples, self.batch_size))
+            if not batch:
+                return
+            yield parse(b"\n".join(batch))
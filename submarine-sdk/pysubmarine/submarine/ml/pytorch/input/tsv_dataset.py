@@ -0,0 +1,164 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+from typing import Iterator, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, IterableDataset
+
+from submarine.ml.pytorch.input.libsvm_dataset import get_data_loader_kwargs
+from submarine.ml.pytorch.input.streaming_dataset import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_SPLIT_SIZE,
+    get_reader,
+)
+from submarine.utils.fileio import list_splits, read_line_blocks
+from submarine.utils.tsv_utils import LOG, FeatureHasher
+
+
+class TSVDataset(IterableDataset):
+    """
+    Iterable dataset of batches of raw Criteo-style TSV files, which are hashed into feature
+    indices and values by a FeatureHasher. Byte ranges of the files are distributed round-robin
+    over all readers, i.e. the DataLoader workers of every rank, like LIBSVMStreamingDataset,
+    and every block read from them is parsed and hashed as a whole. Shuffling permutes the
+    ranges of a reader and the samples of each block.
+    """
+
+    def __init__(
+        self,
+        data_uris: Union[str, Sequence[str]],
+        batch_size: int,
+        num_features: int,
+        num_dense: int = 13,
+        num_categorical: int = 26,
+        dense_transform: str = LOG,
+        shuffle: bool = False,
+        seed: int = 0,
+        split_size: int = DEFAULT_SPLIT_SIZE,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """
+        :param data_uris: URIs or glob patterns of the TSV files.
+        :param batch_size: Number of samples of a batch.
+        :param num_features: Number of feature indices the samples are hashed into.
+        :param num_dense: Number of dense integer columns.
+        :param num_categorical: Number of categorical columns.
+        :param dense_transform: "log" or "bucket", see FeatureHasher.
+        :param shuffle: Whether the ranges and the samples of each block are shuffled.
+        :param seed: Seed of the shuffling.
+        :param split_size: Size of the byte ranges which are distributed over the readers.
+        :param block_size: Size of the sequential reads, which are parsed at once.
+        """
+        super().__init__()
+        self.splits = list_splits(data_uris, split_size)
+        self.batch_size = batch_size
+        self.hasher = FeatureHasher(
+            num_features,
+            num_dense=num_dense,
+            num_categorical=num_categorical,
+            dense_transform=dense_transform,
+        )
+        self.shuffle = shuffle
+        self.seed = seed
+        self.block_size = block_size
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Set the epoch which seeds the next iteration. Without calling it, every iteration of a
+        DataLoader worker moves on to the next epoch.
+        """
+        self.epoch = epoch
+
+    def _iter_blocks(self, rng: random.Random) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        reader, num_readers = get_reader()
+        splits = self.splits[reader::num_readers]
+        if self.shuffle:
+            rng.shuffle(splits)
+        for uri, start, end in splits:
+            for block in read_line_blocks(uri, start, end, self.block_size):
+                arrays = self.hasher.parse(block)
+                if self.shuffle:
+                    permutation = np.random.default_rng(rng.getrandbits(64)).permutation(len(arrays[2]))
+                    arrays = tuple(array[permutation] for array in arrays)
+                yield arrays
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]:
+        epoch = self.epoch
+        # workers which persist over epochs have no set_epoch calls forwarded to them
+        self.epoch += 1
+        reader, _ = get_reader()
+        rng = random.Random(f"{self.seed}-{epoch}-{reader}")
+        # samples of the previous blocks which did not fill a batch
+        pending = None
+        for arrays in self._iter_blocks(rng):
+            if pending is not None:
+                arrays = tuple(np.concatenate(pair) for pair in zip(pending, arrays))
+            num_samples = len(arrays[2])
+            num_full = num_samples - num_samples % self.batch_size
+            for start in range(0, num_full, self.batch_size):
+                yield tuple(torch.from_numpy(array[start : start + self.batch_size]) for array in arrays)
+            pending = tuple(array[num_full:] for array in arrays)
+        if pending is not None and len(pending[2]):
+            yield tuple(torch.from_numpy(array) for array in pending)
+
+
+def tsv_input_fn(
+    filepath,
+    batch_size=256,
+    num_workers=0,
+    pin_memory=False,
+    prefetch_factor=None,
+    persistent_workers=False,
+    seed=0,
+    num_features=None,
+    num_dense=13,
+    num_categorical=26,
+    dense_transform=LOG,
+    shuffle=True,
+    ragged=False,
+    **kwargs,
+):
+    """
+    :param filepath: URI, glob pattern or list of them of the TSV files.
+    :param num_features: Number of feature indices, the num_features of the model.
+    :param shuffle: Whether the ranges and the samples of each block are shuffled.
+    :param ragged: Not supported, every line has one feature per column.
+    """
+    if ragged:
+        raise ValueError("ragged batches are only supported by the libsvm input")
+
+    def _input_fn():
+        dataset = TSVDataset(
+            filepath,
+            batch_size=batch_size,
+            num_features=num_features,
+            num_dense=num_dense,
+            num_categorical=num_categorical,
+            dense_transform=dense_transform,
+            shuffle=shuffle,
+            seed=seed,
+        )
+        # the dataset yields whole batches
+        return DataLoader(
+            dataset=dataset,
+            batch_size=None,
+            **get_data_loader_kwargs(num_workers, pin_memory, prefetch_factor, persistent_workers),
+        )
+
+    return _input_fn
@@ -19,13 +19,14 @@ from torch import nn
 
 # pylint: disable=W0223
 class FeatureLinear(nn.Module):
-    def __init__(self, num_features: int, out_features: int):
+    def __init__(self, num_features: int, out_features: int, sparse: bool = False):
         """
         :param num_features: number of total features.
         :param out_features: The number of output features.
+        :param sparse: Whether the gradient of the weight is sparse, see create_optimizer.
         """
         super().__init__()
-        self.weight = nn.Embedding(num_embeddings=num_features, embedding_dim=out_features)
+        self.weight = nn.Embedding(num_embeddings=num_features, embedding_dim=out_features, sparse=sparse)
         self.bias = nn.Parameter(torch.zeros((out_features,)))
 
     def forward(self, feature_idx: torch.LongTensor, feature_value: torch.LongTensor):
@@ -37,9 +38,13 @@ class FeatureLinear(nn.Module):
 
 
 class FeatureEmbedding(nn.Module):
-    def __init__(self, num_features: int, embedding_dim):
+    def __init__(self, num_features: int, embedding_dim, sparse: bool = False):
+        """
+        :param sparse: Whether the gradient of the weight is sparse, so optimizer steps only
+                       touch the rows of the features of a batch.
+        """
         super().__init__()
-        self.weight = nn.Embedding(num_embeddings=num_features, embedding_dim=embedding_dim)
+        self.weight = nn.Embedding(num_embeddings=num_features, embedding_dim=embedding_dim, sparse=sparse)
 
     def forward(self, feature_idx: torch.LongTensor, feature_value: torch.LongTensor):
         """
@@ -49,6 +54,101 @@ class FeatureEmbedding(nn.Module):
         return self.weight(feature_idx) * feature_value.unsqueeze(dim=-1)
 
 
+class FusedFeatureEmbedding(nn.Module):
+    def __init__(
+        self,
+        num_features: int,
+        embedding_dim: int,
+        out_features: int,
+        sparse: bool = False,
+        dedup: bool = False,
+    ):
+        """
+        FeatureLinear and FeatureEmbedding of the same features in one table, whose rows are the
+        embedding followed by the linear weight, so both are read by a single gather.
+        :param num_features: number of total features.
+        :param embedding_dim: The dimension of the embeddings.
+        :param out_features: The number of output features of the linear part.
+        :param sparse: Whether the gradient of the weight is sparse.
+        :param dedup: Whether every distinct feature of a batch is gathered once, which saves
+                      reads and gradient rows if the batches repeat hot features.
+        """
+        super().__init__()
+        self.embedding_dim = embedding_dim
+        self.out_features = out_features
+        self.dedup = dedup
+        self.weight = nn.Embedding(
+            num_embeddings=num_features, embedding_dim=embedding_dim + out_features, sparse=sparse
+        )
+        self.bias = nn.Parameter(torch.zeros((out_features,)))
+
+    def forward(self, feature_idx: torch.LongTensor, feature_value: torch.LongTensor):
+        """
+        :param feature_idx: torch.LongTensor (batch_size, num_fields)
+        :param feature_value: torch.LongTensor (batch_size, num_fields)
+        :return: The output of FeatureLinear (batch_size, out_features) and of FeatureEmbedding
+                 (batch_size, num_fields, embedding_dim).
+        """
+        if self.dedup:
+            unique_idx, inverse = torch.unique(feature_idx, return_inverse=True)
+            rows = self.weight(unique_idx)[inverse]
+        else:
+            rows = self.weight(feature_idx)
+        rows = rows * feature_value.unsqueeze(dim=-1)
+        emb, linear = torch.split(rows, [self.embedding_dim, self.out_features], dim=-1)
+        return torch.sum(linear, dim=1) + self.bias, emb
+
+
+class FeatureBagLinear(nn.Module):
+    def __init__(self, num_features: int, out_features: int, sparse: bool = False):
+        """
+        FeatureLinear for samples with different numbers of features, on an nn.EmbeddingBag
+        which sums the weighted rows of every sample without padding them.
+        :param num_features: number of total features.
+        :param out_features: The number of output features.
+        :param sparse: Whether the gradient of the weight is sparse.
+        """
+        super().__init__()
+        self.weight = nn.EmbeddingBag(
+            num_embeddings=num_features, embedding_dim=out_features, mode="sum", sparse=sparse
+        )
+        self.bias = nn.Parameter(torch.zeros((out_features,)))
+
+    def forward(
+        self, feature_idx: torch.LongTensor, feature_value: torch.FloatTensor, offsets: torch.LongTensor
+    ):
+        """
+        :param feature_idx: torch.LongTensor (num_entries,) the features of all samples
+        :param feature_value: torch.FloatTensor (num_entries,)
+        :param offsets: torch.LongTensor (batch_size,) the start of every sample in feature_idx
+        """
+        return self.weight(feature_idx, offsets, per_sample_weights=feature_value) + self.bias
+
+
+class FeatureBagEmbedding(nn.Module):
+    def __init__(self, num_features: int, embedding_dim: int, sparse: bool = False):
+        """
+        Sum of the weighted embeddings of every sample, for samples with different numbers of
+        features, on an nn.EmbeddingBag. It is torch.sum(FeatureEmbedding(...), dim=1) without
+        padding the samples or materializing their (num_fields, embedding_dim) embeddings.
+        :param sparse: Whether the gradient of the weight is sparse.
+        """
+        super().__init__()
+        self.weight = nn.EmbeddingBag(
+            num_embeddings=num_features, embedding_dim=embedding_dim, mode="sum", sparse=sparse
+        )
+
+    def forward(
+        self, feature_idx: torch.LongTensor, feature_value: torch.FloatTensor, offsets: torch.LongTensor
+    ):
+        """
+        :param feature_idx: torch.LongTensor (num_entries,) the features of all samples
+        :param feature_value: torch.FloatTensor (num_entries,)
+        :param offsets: torch.LongTensor (batch_size,) the start of every sample in feature_idx
+        """
+        return self.weight(feature_idx, offsets, per_sample_weights=feature_value)
+
+
 class PairwiseInteraction(nn.Module):
     def forward(self, x: torch.Tensor):
         """
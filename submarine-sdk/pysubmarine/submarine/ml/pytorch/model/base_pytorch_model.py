@@ -26,18 +26,21 @@ from torch.nn.parallel import DistributedDataParallel
 from submarine.ml.abstract_model import AbstractModel
 from submarine.ml.pytorch.loss import get_loss_fn
 from submarine.ml.pytorch.metric import get_metric_fn
-from submarine.ml.pytorch.optimizer import get_optimizer
+from submarine.ml.pytorch.optimizer import create_optimizer
 from submarine.ml.pytorch.parameters import default_parameters
 from submarine.ml.pytorch.registries import input_fn_registry
 from submarine.utils.env import get_from_dicts, get_from_json, get_from_registry
 from submarine.utils.fileio import write_file
-from submarine.utils.pytorch_utils import get_device
+from submarine.utils.pytorch_utils import get_device, iter_in_lockstep
 
 logger = logging.getLogger(__name__)
 
 
 # pylint: disable=W0221
 class BasePyTorchModel(AbstractModel, ABC):
+    # whether forward takes the offsets of ragged batches after feature_value
+    supports_ragged = False
+
     def __init__(self, params=None, json_path=None):
         super().__init__()
         self.params = get_from_dicts(params, default_parameters)
@@ -51,9 +54,7 @@ class BasePyTorchModel(AbstractModel, ABC):
 
         self.init_process_group()
         self.model = DistributedDataParallel(self.model_fn(self.params).to(get_device(self.params)))
-        self.optimizer = get_optimizer(key=self.params["optimizer"]["name"])(
-            params=self.model.parameters(), **self.params["optimizer"]["kwargs"]
-        )
+        self.optimizer = create_optimizer(self.model, self.params["optimizer"])
         self.loss = get_loss_fn(key=self.params["loss"]["name"])(**self.params["loss"]["kwargs"])
         self.metric = get_metric_fn(key=self.params["output"]["metric"])
 
@@ -66,14 +67,34 @@ class BasePyTorchModel(AbstractModel, ABC):
         )
 
     def __del__(self):
-        distributed.destroy_process_group()
+        # the process group is not initialized yet if the sanity check failed
+        if distributed.is_initialized():
+            distributed.destroy_process_group()
+
+    def input_fn(self, filepath, shuffle=True):
+        """
+        :param filepath: URI of the data, one of the train, valid and test data of the input.
+        :param shuffle: Whether the input shuffles the data, unless the training parameters turn
+                        it off. Evaluation and prediction read the data in file order.
+        :return: The input function of the input type for the data.
+        """
+        # inputs which hash raw features need the number of feature indices of the model
+        num_features = self.params["model"]["kwargs"].get("num_features")
+        params = dict(
+            self.params["training"], shuffle=shuffle and self.params["training"].get("shuffle", True)
+        )
+        return get_from_registry(self.input_type, input_fn_registry)(
+            filepath=filepath, num_features=num_features, **params
+        )
 
     def train(self, train_loader):
         self.model.train()
         with torch.enable_grad():
-            for _, batch in enumerate(train_loader):
-                feature_idx, feature_value, label = batch
-                output = self.model(feature_idx, feature_value).squeeze()
+            # the inputs may have different numbers of batches on the ranks
+            for batch in iter_in_lockstep(train_loader):
+                # ragged batches have the offsets of their samples after feature_value
+                *features, label = batch
+                output = self.model(*features).squeeze()
                 loss = self.loss(output, label.float())
                 self.optimizer.zero_grad()
                 loss.backward()
@@ -83,14 +104,14 @@ class BasePyTorchModel(AbstractModel, ABC):
         outputs = []
         labels = []
 
-        valid_loader = get_from_registry(self.input_type, input_fn_registry)(
-            filepath=self.params["input"]["valid_data"], **self.params["training"]
-        )()
+        valid_loader = self.input_fn(self.params["input"]["valid_data"], shuffle=False)()
         self.model.eval()
         with torch.no_grad():
             for _, batch in enumerate(valid_loader):
-                feature_idx, feature_value, label = batch
-                output = self.model(feature_idx, feature_value).squeeze()
+                *features, label = batch
+                # the module itself, as DistributedDataParallel would sync the buffers of ranks
+                # which may have different numbers of batches
+                output = self.model.module(*features).squeeze()
 
                 outputs.append(output)
                 labels.append(label)
@@ -100,14 +121,12 @@ class BasePyTorchModel(AbstractModel, ABC):
     def predict(self):
         outputs = []
 
-        test_loader = get_from_registry(self.input_type, input_fn_registry)(
-            filepath=self.params["input"]["test_data"], **self.params["training"]
-        )()
+        test_loader = self.input_fn(self.params["input"]["test_data"], shuffle=False)()
         self.model.eval()
         with torch.no_grad():
             for _, batch in enumerate(test_loader):
-                feature_idx, feature_value, _ = batch
-                output = self.model(feature_idx, feature_value).squeeze()
+                *features, _ = batch
+                output = self.model.module(*features).squeeze()
                 outputs.append(torch.sigmoid(output))
 
         return torch.cat(outputs, dim=0).cpu().numpy()
@@ -120,12 +139,14 @@ class BasePyTorchModel(AbstractModel, ABC):
         # The line "if eval_score > best_eval_score:"
         # should be replaced by a indicator function.
         best_eval_score = 0.0
-        train_loader = get_from_registry(self.input_type, input_fn_registry)(
-            filepath=self.params["input"]["train_data"], **self.params["training"]
-        )()
+        train_loader = self.input_fn(self.params["input"]["train_data"])()
 
         for epoch in range(self.params["training"]["num_epochs"]):
-            train_loader.sampler.set_epoch(epoch)
+            # streaming datasets are shuffled by the dataset instead of a sampler
+            if hasattr(train_loader.sampler, "set_epoch"):
+                train_loader.sampler.set_epoch(epoch)
+            elif hasattr(train_loader.dataset, "set_epoch"):
+                train_loader.dataset.set_epoch(epoch)
             self.train(train_loader)
             eval_score = self.evaluate()
 
@@ -150,3 +171,6 @@ class BasePyTorchModel(AbstractModel, ABC):
         assert "input" in self.params, "Does not define any input parameters"
         assert "type" in self.params["input"], "Does not define any input type"
         assert "output" in self.params, "Does not define any output parameters"
+        assert self.supports_ragged or not self.params["training"].get(
+            "ragged", False
+        ), f"{type(self).__name__} does not support ragged batches"
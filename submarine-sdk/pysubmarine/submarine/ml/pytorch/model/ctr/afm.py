@@ -16,7 +16,11 @@
 import torch
 from torch import nn
 
-from submarine.ml.pytorch.layers.core import FeatureEmbedding, FeatureLinear
+from submarine.ml.pytorch.layers.core import (
+    FeatureEmbedding,
+    FeatureLinear,
+    FusedFeatureEmbedding,
+)
 from submarine.ml.pytorch.model.base_pytorch_model import BasePyTorchModel
 
 
@@ -35,11 +39,33 @@ class _AFM(nn.Module):
         attention_dim: int,
         out_features: int,
         dropout_rate: float,
+        sparse: bool = False,
+        fused_embedding: bool = False,
+        dedup_features: bool = False,
         **kwargs,
     ):
+        """
+        :param fused_embedding: Whether the linear weights and the embeddings of the features
+                                are gathered from one FusedFeatureEmbedding.
+        :param dedup_features: Whether the FusedFeatureEmbedding gathers the distinct features
+                               of a batch once.
+        """
         super().__init__()
-        self.feature_linear = FeatureLinear(num_features=num_features, out_features=out_features)
-        self.feature_embedding = FeatureEmbedding(num_features=num_features, embedding_dim=embedding_dim)
+        if fused_embedding:
+            self.fused_embedding = FusedFeatureEmbedding(
+                num_features=num_features,
+                embedding_dim=embedding_dim,
+                out_features=out_features,
+                sparse=sparse,
+                dedup=dedup_features,
+            )
+        else:
+            self.feature_linear = FeatureLinear(
+                num_features=num_features, out_features=out_features, sparse=sparse
+            )
+            self.feature_embedding = FeatureEmbedding(
+                num_features=num_features, embedding_dim=embedding_dim, sparse=sparse
+            )
         self.attentional_interaction = AttentionalInteratction(
             embedding_dim=embedding_dim,
             attention_dim=attention_dim,
@@ -52,6 +78,9 @@ class _AFM(nn.Module):
         :param feature_idx: torch.LongTensor (batch_size, num_fields)
         :param feature_value: torch.LongTensor (batch_size, num_fields)
         """
+        if hasattr(self, "fused_embedding"):
+            linear_logit, emb = self.fused_embedding(feature_idx, feature_value)
+            return linear_logit + self.attentional_interaction(emb)
         return self.feature_linear(feature_idx, feature_value) + self.attentional_interaction(
             self.feature_embedding(feature_idx, feature_value)
         )
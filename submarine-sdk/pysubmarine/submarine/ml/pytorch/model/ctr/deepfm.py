@@ -20,6 +20,7 @@ from submarine.ml.pytorch.layers.core import (
     DNN,
     FeatureEmbedding,
     FeatureLinear,
+    FusedFeatureEmbedding,
     PairwiseInteraction,
 )
 from submarine.ml.pytorch.model.base_pytorch_model import BasePyTorchModel
@@ -41,11 +42,33 @@ class _DeepFM(nn.Module):
         out_features,
         hidden_units,
         dropout_rates,
+        sparse=False,
+        fused_embedding=False,
+        dedup_features=False,
         **kwargs,
     ):
+        """
+        :param fused_embedding: Whether the linear weights and the embeddings of the features
+                                are gathered from one FusedFeatureEmbedding.
+        :param dedup_features: Whether the FusedFeatureEmbedding gathers the distinct features
+                               of a batch once.
+        """
         super().__init__()
-        self.feature_linear = FeatureLinear(num_features=num_features, out_features=out_features)
-        self.feature_embedding = FeatureEmbedding(num_features=num_features, embedding_dim=embedding_dim)
+        if fused_embedding:
+            self.fused_embedding = FusedFeatureEmbedding(
+                num_features=num_features,
+                embedding_dim=embedding_dim,
+                out_features=out_features,
+                sparse=sparse,
+                dedup=dedup_features,
+            )
+        else:
+            self.feature_linear = FeatureLinear(
+                num_features=num_features, out_features=out_features, sparse=sparse
+            )
+            self.feature_embedding = FeatureEmbedding(
+                num_features=num_features, embedding_dim=embedding_dim, sparse=sparse
+            )
         self.pairwise_interaction = PairwiseInteraction()
         self.dnn = DNN(
             in_features=num_fields * embedding_dim,
@@ -59,8 +82,13 @@ class _DeepFM(nn.Module):
         :param feature_idx: torch.LongTensor (batch_size, num_fields)
         :param feature_value: torch.LongTensor (batch_size, num_fields)
         """
-        emb = self.feature_embedding(feature_idx, feature_value)  # (batch_size, num_fields, embedding_dim)
-        linear_logit = self.feature_linear(feature_idx, feature_value)
+        if hasattr(self, "fused_embedding"):
+            linear_logit, emb = self.fused_embedding(feature_idx, feature_value)
+        else:
+            emb = self.feature_embedding(
+                feature_idx, feature_value
+            )  # (batch_size, num_fields, embedding_dim)
+            linear_logit = self.feature_linear(feature_idx, feature_value)
         fm_logit = self.pairwise_interaction(emb)
         deep_logit = self.dnn(torch.flatten(emb, start_dim=1))
 
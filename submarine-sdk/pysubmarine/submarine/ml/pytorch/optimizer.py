@@ -13,13 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from torch import optim
+from typing import Dict, List, Tuple
+
+import torch
+from torch import nn, optim
 
 
 class OptimizerKey:
     ADAM = "adam"
     ADAGRAD = "adagrad"
     SGD = "sgd"
+    SPARSE_ADAM = "sparse_adam"
+    ROWWISE_ADAGRAD = "rowwise_adagrad"
 
 
 def get_optimizer(key):
@@ -30,4 +35,106 @@ def get_optimizer(key):
         return optim.Adagrad
     if key == OptimizerKey.SGD:
         return optim.SGD
+    if key == OptimizerKey.SPARSE_ADAM:
+        return optim.SparseAdam
+    if key == OptimizerKey.ROWWISE_ADAGRAD:
+        return RowWiseAdagrad
     raise ValueError("Invalid optimizer_key:", key)
+
+
+class RowWiseAdagrad(optim.Optimizer):
+    """
+    Adagrad for embedding tables with sparse gradients, which keeps one sum of squared
+    gradients per row instead of per element, the mean of the row. Only the rows a step touches
+    are read and written.
+    """
+
+    def __init__(self, params, lr: float = 1e-2, eps: float = 1e-10):
+        super().__init__(params, {"lr": lr, "eps": eps})
+
+    @torch.no_grad()
+    def step(self, closure=None):
+        loss = None
+        if closure is not None:
+            with torch.enable_grad():
+                loss = closure()
+        for group in self.param_groups:
+            for param in group["params"]:
+                if param.grad is None:
+                    continue
+                grad = param.grad
+                if not grad.is_sparse:
+                    raise ValueError("RowWiseAdagrad expects sparse gradients, use sparse=True embeddings")
+                state = self.state[param]
+                if not state:
+                    state["sum"] = torch.zeros(param.size(0), dtype=param.dtype, device=param.device)
+                grad = grad.coalesce()
+                rows, values = grad.indices()[0], grad.values()
+                row_sum = state["sum"].index_add_(0, rows, values.square().mean(dim=1))
+                std = row_sum[rows].sqrt_().add_(group["eps"]).unsqueeze(dim=1)
+                param.index_add_(0, rows, values / std, alpha=-group["lr"])
+        return loss
+
+
+def split_parameters(module: nn.Module) -> Tuple[List[nn.Parameter], List[nn.Parameter]]:
+    """
+    :return: The parameters of the module with dense gradients, and those with sparse
+             gradients, the weights of nn.Embedding and nn.EmbeddingBag with sparse=True.
+    """
+    sparse = [
+        m.weight for m in module.modules() if isinstance(m, (nn.Embedding, nn.EmbeddingBag)) and m.sparse
+    ]
+    sparse_ids = {id(p) for p in sparse}
+    return [p for p in module.parameters() if id(p) not in sparse_ids], sparse
+
+
+class SplitOptimizer:
+    """
+    Optimizers of disjoint parameters which are stepped together, e.g. SparseAdam for sparse
+    embedding tables and Adam for the dense layers. It has the methods of an optimizer which
+    the training loop and checkpoints use.
+    """
+
+    def __init__(self, optimizers: List[optim.Optimizer]):
+        self.optimizers = optimizers
+
+    @property
+    def param_groups(self) -> List[Dict]:
+        return [group for optimizer in self.optimizers for group in optimizer.param_groups]
+
+    def zero_grad(self, set_to_none: bool = True) -> None:
+        for optimizer in self.optimizers:
+            optimizer.zero_grad(set_to_none=set_to_none)
+
+    def step(self, closure=None):
+        loss = closure() if closure is not None else None
+        for optimizer in self.optimizers:
+            optimizer.step()
+        return loss
+
+    def state_dict(self) -> Dict:
+        return {"optimizers": [optimizer.state_dict() for optimizer in self.optimizers]}
+
+    def load_state_dict(self, state_dict: Dict) -> None:
+        for optimizer, state in zip(self.optimizers, state_dict["optimizers"]):
+            optimizer.load_state_dict(state)
+
+
+def create_optimizer(module: nn.Module, params: Dict):
+    """
+    :param module: The model, whose parameters are optimized.
+    :param params: The optimizer parameters, {"name": ..., "kwargs": {...}}. With an additional
+                   "sparse": {"name": ..., "kwargs": {...}} the weights of sparse embeddings are
+                   optimized by this optimizer, e.g. "sparse_adam" or "rowwise_adagrad", and
+                   all other parameters by the first one. Otherwise one optimizer optimizes all
+                   parameters, which must then support sparse gradients if there are any.
+    """
+    if "sparse" not in params:
+        return get_optimizer(key=params["name"])(params=module.parameters(), **params["kwargs"])
+    dense, sparse = split_parameters(module)
+    optimizers = [
+        get_optimizer(key=group["name"])(params=group_params, **group.get("kwargs", {}))
+        for group, group_params in ((params, dense), (params["sparse"], sparse))
+        if group_params
+    ]
+    return SplitOptimizer(optimizers)
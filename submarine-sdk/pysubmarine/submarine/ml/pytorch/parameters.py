@@ -20,6 +20,14 @@ default_parameters = {
         "num_epochs": 1,
         "log_steps": 10,
         "num_threads": 0,
+        "num_workers": 0,
+        "pin_memory": False,
+        "prefetch_factor": None,
+        "persistent_workers": False,
+        "sampler": "distributed",
+        "streaming": False,
+        "shuffle_buffer_size": 10000,
+        "ragged": False,
         "num_gpus": 0,
         "seed": 42,
         "mode": "distributed",
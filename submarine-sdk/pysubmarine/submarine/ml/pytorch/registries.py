@@ -13,8 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from .input.csr_dataset import libsvm_csr_input_fn
 from .input.libsvm_dataset import libsvm_input_fn
+from .input.parquet_dataset import parquet_input_fn
+from .input.tsv_dataset import tsv_input_fn
 
 LIBSVM = "libsvm"
+LIBSVM_CSR = "libsvm_csr"
+PARQUET = "parquet"
+TSV = "tsv"
 
-input_fn_registry = {LIBSVM: libsvm_input_fn}
+input_fn_registry = {
+    LIBSVM: libsvm_input_fn,
+    LIBSVM_CSR: libsvm_csr_input_fn,
+    PARQUET: parquet_input_fn,
+    TSV: tsv_input_fn,
+}
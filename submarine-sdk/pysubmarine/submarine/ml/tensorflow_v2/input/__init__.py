@@ -13,6 +13,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .input import libsvm_input_fn
+from .input import libsvm_input_fn, parquet_input_fn, tsv_input_fn
 
-__all__ = ["libsvm_input_fn"]
+__all__ = ["libsvm_input_fn", "parquet_input_fn", "tsv_input_fn"]
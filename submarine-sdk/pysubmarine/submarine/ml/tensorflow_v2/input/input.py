@@ -13,10 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
+import os
 
 import tensorflow as tf
 
+from submarine.utils.fileio import list_splits, read_line_blocks
+from submarine.utils.parquet_utils import (
+    list_row_groups,
+    list_to_numpy,
+    read_row_groups,
+)
+from submarine.utils.tsv_utils import LOG, FeatureHasher
+
 logger = logging.getLogger(__name__)
 
 AUTOTUNE = tf.data.experimental.AUTOTUNE
@@ -56,3 +66,125 @@ def libsvm_input_fn(
         return dataset
 
     return _input_fn
+
+
+def _get_shard():
+    """
+    :return: The index of this task among the tasks which train on distinct shards of the data,
+             the chief (or master) and the workers in TF_CONFIG, and the number of these tasks.
+             Evaluators and local runs read all the data.
+    """
+    tf_config = json.loads(os.environ.get("TF_CONFIG", "{}"))
+    cluster, task = tf_config.get("cluster", {}), tf_config.get("task", {})
+    chiefs = len(cluster.get("chief", [])) + len(cluster.get("master", []))
+    num_shards = chiefs + len(cluster.get("worker", []))
+    if task.get("type") in ("chief", "master"):
+        return 0, num_shards
+    if task.get("type") == "worker":
+        return chiefs + task["index"], num_shards
+    return 0, 1
+
+
+def parquet_input_fn(
+    filepath,
+    batch_size=256,
+    num_epochs=3,
+    perform_shuffle=False,
+    feat_ids_column="feat_ids",
+    feat_vals_column="feat_vals",
+    label_column="label",
+    **kwargs,
+):
+    """
+    Read Parquet files with a list column of feature ids, a list column of feature values and
+    a label column. Only these columns are read, and the row groups are sharded over the tasks
+    of a distributed training.
+    :param filepath: URI, glob pattern or list of them of the Parquet files.
+    """
+
+    def _input_fn():
+        shard, num_shards = _get_shard()
+        row_groups = list_row_groups(filepath)[shard::num_shards]
+        columns = [feat_ids_column, feat_vals_column, label_column]
+
+        def _generate_batches():
+            for batch in read_row_groups(row_groups, columns, batch_size):
+                feat_ids, feat_vals, labels = batch.columns
+                yield {
+                    "feat_ids": list_to_numpy(feat_ids).astype("int32", copy=False),
+                    "feat_vals": list_to_numpy(feat_vals).astype("float32", copy=False),
+                }, labels.to_numpy(zero_copy_only=False).astype("float32", copy=False)
+
+        dataset = tf.data.Dataset.from_generator(
+            _generate_batches,
+            output_signature=(
+                {
+                    "feat_ids": tf.TensorSpec(shape=(None, None), dtype=tf.int32),
+                    "feat_vals": tf.TensorSpec(shape=(None, None), dtype=tf.float32),
+                },
+                tf.TensorSpec(shape=(None,), dtype=tf.float32),
+            ),
+        )
+        if perform_shuffle:
+            # the generator yields whole batches, so batches are shuffled
+            dataset = dataset.shuffle(buffer_size=16)
+        return dataset.repeat(num_epochs).prefetch(AUTOTUNE)
+
+    return _input_fn
+
+
+def tsv_input_fn(
+    filepath,
+    batch_size=256,
+    num_epochs=3,
+    perform_shuffle=False,
+    feature_size=None,
+    num_dense=13,
+    num_categorical=26,
+    dense_transform=LOG,
+    split_size=256 * 1024 * 1024,
+    block_size=8 * 1024 * 1024,
+    **kwargs,
+):
+    """
+    Read raw Criteo-style TSV files of a label, dense integer columns and categorical columns,
+    which are hashed into feature_size feature ids by a FeatureHasher. Byte ranges of the files
+    are sharded over the tasks of a distributed training.
+    :param filepath: URI, glob pattern or list of them of the TSV files.
+    :param feature_size: Number of feature ids, the feature_size of the model.
+    """
+
+    def _input_fn():
+        shard, num_shards = _get_shard()
+        hasher = FeatureHasher(
+            feature_size,
+            num_dense=num_dense,
+            num_categorical=num_categorical,
+            dense_transform=dense_transform,
+        )
+        splits = list_splits(filepath, split_size)[shard::num_shards]
+
+        def _generate_blocks():
+            for uri, start, end in splits:
+                for block in read_line_blocks(uri, start, end, block_size):
+                    feat_ids, feat_vals, labels = hasher.parse(block)
+                    yield {
+                        "feat_ids": feat_ids.astype("int32"),
+                        "feat_vals": feat_vals,
+                    }, labels.astype("float32")
+
+        dataset = tf.data.Dataset.from_generator(
+            _generate_blocks,
+            output_signature=(
+                {
+                    "feat_ids": tf.TensorSpec(shape=(None, hasher.num_fields), dtype=tf.int32),
+                    "feat_vals": tf.TensorSpec(shape=(None, hasher.num_fields), dtype=tf.float32),
+                },
+                tf.TensorSpec(shape=(None,), dtype=tf.float32),
+            ),
+        ).unbatch()
+        if perform_shuffle:
+            dataset = dataset.shuffle(buffer_size=batch_size)
+        return dataset.repeat(num_epochs).batch(batch_size).prefetch(AUTOTUNE)
+
+    return _input_fn
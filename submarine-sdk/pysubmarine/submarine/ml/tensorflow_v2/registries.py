@@ -13,8 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from submarine.ml.tensorflow_v2.input import libsvm_input_fn
+from submarine.ml.tensorflow_v2.input import (
+    libsvm_input_fn,
+    parquet_input_fn,
+    tsv_input_fn,
+)
 
 LIBSVM = "libsvm"
+PARQUET = "parquet"
+TSV = "tsv"
 
-input_fn_registry = {LIBSVM: libsvm_input_fn}
+input_fn_registry = {LIBSVM: libsvm_input_fn, PARQUET: parquet_input_fn, TSV: tsv_input_fn}
@@ -14,11 +14,28 @@
 # limitations under the License.
 
 import os
+from typing import BinaryIO
 
 import torch
 
+MODEL_FILE = "model.pt"
 
-def save_model(model, artifact_path: str, input_dim: list) -> None:
+
+def _trace_model(model, input_dim: list):
     example_forward_example = torch.rand(input_dim)
-    scripted_model = torch.jit.trace(model, example_forward_example)
-    scripted_model.save(os.path.join(artifact_path, "model.pt"))
+    return torch.jit.trace(model, example_forward_example)
+
+
+def save_model(model, artifact_path: str, input_dim: list) -> None:
+    _trace_model(model, input_dim).save(os.path.join(artifact_path, MODEL_FILE))
+
+
+def save_model_to_fileobj(model, fileobj: BinaryIO, input_dim: list) -> None:
+    """
+    Serialize the traced model into a file-like object instead of a directory.
+    """
+    torch.jit.save(_trace_model(model, input_dim), fileobj)
+
+
+def load_model(artifact_path: str):
+    return torch.jit.load(os.path.join(artifact_path, MODEL_FILE))
@@ -13,6 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import tensorflow as tf
+
 
 def save_model(model, artifact_path: str):
     model.save(artifact_path)
+
+
+def load_model(artifact_path: str):
+    return tf.keras.models.load_model(artifact_path)
@@ -0,0 +1,104 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Creation of SQLAlchemy engines for the Submarine stores, with per-dialect connection settings.
+"""
+
+from typing import Any, Dict
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+
+from submarine.store.database.db_types import SQLITE
+from submarine.utils import extract_db_type_from_uri
+
+# PRAGMAs applied to every new SQLite connection. WAL lets readers proceed while a writer
+# commits, and synchronous=NORMAL only fsyncs the WAL on checkpoints, which keeps it durable
+# across application crashes while avoiding one fsync per transaction.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "busy_timeout": 30000,
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+}
+
+
+def _is_sqlite_memory_db(db_uri: str) -> bool:
+    database = make_url(db_uri).database
+    return database in (None, "", ":memory:")
+
+
+def _get_sqlite_engine_kwargs(db_uri: str) -> Dict[str, Any]:
+    # Sessions may be used from other threads than the one that created the connection.
+    kwargs: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    if _is_sqlite_memory_db(db_uri):
+        # Every connection to ``:memory:`` opens a new empty database, so share a single one.
+        kwargs["poolclass"] = StaticPool
+    return kwargs
+
+
+def _set_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, Any]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _register_sqlite_pragmas(sync_engine, db_uri: str) -> None:
+    pragmas = dict(SQLITE_PRAGMAS)
+    if _is_sqlite_memory_db(db_uri):
+        # WAL and memory mapping do not apply to in-memory databases.
+        del pragmas["journal_mode"], pragmas["mmap_size"]
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        _set_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def create_engine(db_uri: str, **kwargs: Any):
+    """
+    Create a SQLAlchemy engine for the given DB URI. SQLite engines are tuned for in-process use:
+    WAL journaling, relaxed fsync, enforced foreign keys and a shared connection for in-memory
+    databases.
+    :param db_uri: The SQLAlchemy database URI string to connect to the database.
+    :param kwargs: Extra keyword arguments of ``sqlalchemy.create_engine``.
+    """
+    if extract_db_type_from_uri(db_uri) != SQLITE:
+        return sqlalchemy.create_engine(db_uri, pool_pre_ping=True, **kwargs)
+    engine = sqlalchemy.create_engine(db_uri, **{**_get_sqlite_engine_kwargs(db_uri), **kwargs})
+    _register_sqlite_pragmas(engine, db_uri)
+    return engine
+
+
+def create_async_engine(db_uri: str, **kwargs: Any):
+    """
+    asyncio counterpart of :py:func:`create_engine`.
+    :param db_uri: The SQLAlchemy database URI string using an asyncio driver.
+    :param kwargs: Extra keyword arguments of ``sqlalchemy.ext.asyncio.create_async_engine``.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine as _create_async_engine
+
+    if extract_db_type_from_uri(db_uri) != SQLITE:
+        return _create_async_engine(db_uri, pool_pre_ping=True, **kwargs)
+    engine = _create_async_engine(db_uri, **{**_get_sqlite_engine_kwargs(db_uri), **kwargs})
+    _register_sqlite_pragmas(engine.sync_engine, db_uri)
+    return engine
@@ -45,6 +45,10 @@ from submarine.entities.model_registry.model_stages import STAGE_NONE
 # Base class in sqlalchemy is a dynamic type
 Base = declarative_base()
 
+# Datetime with millisecond precision on MySQL and the native datetime type on other dialects
+# (e.g. SQLite), so that the same schema can be created on every supported database engine.
+DATETIME_FSP3 = sa.types.DateTime().with_variant(DATETIME(fsp=3), "mysql")
+
 # +----------+-------------------------+-------------------------+-------------+
 # | name     | creation_time           | last_updated_time       | description |
 # +----------+-------------------------+-------------------------+-------------+
@@ -61,12 +65,12 @@ class SqlRegisteredModel(Base):
     Name of registered model: Part of *Primary Key* for ``registered_model`` table.
     """
 
-    creation_time = Column(DATETIME(fsp=3), default=datetime.now())
+    creation_time = Column(DATETIME_FSP3, default=datetime.now())
     """
     Creation time of registered model: default current time in milliseconds.
     """
 
-    last_updated_time = Column(DATETIME(fsp=3), nullable=True)
+    last_updated_time = Column(DATETIME_FSP3, nullable=True)
     """
     Last updated time of registered model.
     """
@@ -205,12 +209,12 @@ class SqlModelVersion(Base):
                                             `Production` and `Achieved`
     """
 
-    creation_time = Column(DATETIME(fsp=3), default=datetime.now())
+    creation_time = Column(DATETIME_FSP3, default=datetime.now())
     """
     Creation time of this version of model: default current time in milliseconds
     """
 
-    last_updated_time = Column(DATETIME(fsp=3), nullable=True)
+    last_updated_time = Column(DATETIME_FSP3, nullable=True)
     """
     Last updated time of this version of model.
     """
@@ -348,7 +352,7 @@ class SqlExperiment(Base):
     """
     This experiment is created by whom.
     """
-    create_time = Column(DATETIME(fsp=3), default=datetime.now())
+    create_time = Column(DATETIME_FSP3, default=datetime.now())
     """
     Datetime of this experiment be created
     """
@@ -356,7 +360,7 @@ class SqlExperiment(Base):
     """
     This experiment is created by whom.
     """
-    update_time = Column(DATETIME(fsp=3))
+    update_time = Column(DATETIME_FSP3)
     """
     Datetime of this experiment be updated
     """
@@ -414,7 +418,7 @@ class SqlMetric(Base):
     Metric worker_index: `String` (limit 32 characters). Part of *Primary Key* for
     ``metric`` table.
     """
-    timestamp = Column(DATETIME(fsp=3), default=datetime.now())
+    timestamp = Column(DATETIME_FSP3, default=datetime.now())
     """
     Timestamp recorded for this metric entry: `DATETIME`. Part of *Primary Key* for
     ``metric`` table.
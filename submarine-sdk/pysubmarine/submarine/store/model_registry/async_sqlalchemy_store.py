@@ -0,0 +1,604 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, List, Optional, Union
+
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, sessionmaker
+
+from submarine.entities.model_registry import ModelVersion, RegisteredModel
+from submarine.entities.model_registry.model_stages import (
+    STAGE_DELETED_INTERNAL,
+    get_canonical_stage,
+)
+from submarine.exceptions import SubmarineException
+from submarine.store.database.engine import create_async_engine
+from submarine.store.database.models import (
+    Base,
+    SqlModelVersion,
+    SqlModelVersionTag,
+    SqlRegisteredModel,
+    SqlRegisteredModelTag,
+)
+from submarine.utils import extract_db_type_from_uri, get_async_db_uri
+from submarine.utils.validation import (
+    validate_description,
+    validate_model_name,
+    validate_model_version,
+    validate_tag,
+    validate_tags,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncSqlAlchemyStore:
+    """
+    asyncio counterpart of :py:class:`submarine.store.model_registry.sqlalchemy_store.SqlAlchemyStore`.
+    Every public method is a coroutine and shares the database schemas and entity conversion
+    of the synchronous store, so that a single event loop can serve many concurrent registry
+    requests without blocking on database I/O.
+    """
+
+    def __init__(self, db_uri: str, **engine_kwargs: Any) -> None:
+        """
+        Create a database backed store.
+        :param db_uri: The SQLAlchemy database URI string to connect to the database. Synchronous
+                       drivers are replaced by their asyncio counterparts, e.g. ``mysql+pymysql``
+                       is served by ``mysql+asyncmy`` and ``sqlite`` by ``sqlite+aiosqlite``.
+        :param engine_kwargs: Extra keyword arguments of ``create_async_engine``, e.g. ``pool_size``
+                              and ``max_overflow`` to size the connection pool for the expected
+                              number of concurrent requests.
+        """
+        self.db_uri = db_uri
+        self.db_type = extract_db_type_from_uri(db_uri)
+        self.engine: AsyncEngine = create_async_engine(get_async_db_uri(db_uri), **engine_kwargs)
+        self._tables_initialized = False
+        self._tables_lock: Optional[asyncio.Lock] = None
+        SessionMaker = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.ManagedSessionMaker = self._get_managed_session_maker(SessionMaker, self._verify_tables)
+
+    async def _verify_tables(self) -> None:
+        """
+        Verify that all model registry tables exist, creating them on first use.
+        """
+        if self._tables_initialized:
+            return
+        if self._tables_lock is None:
+            self._tables_lock = asyncio.Lock()
+        async with self._tables_lock:
+            if self._tables_initialized:
+                return
+            expected_tables = {
+                SqlRegisteredModel.__tablename__,
+                SqlRegisteredModelTag.__tablename__,
+                SqlModelVersion.__tablename__,
+                SqlModelVersionTag.__tablename__,
+            }
+            async with self.engine.connect() as conn:
+                table_names = await conn.run_sync(
+                    lambda sync_conn: sqlalchemy.inspect(sync_conn).get_table_names()
+                )
+            if len(expected_tables & set(table_names)) == 0:
+                await AsyncSqlAlchemyStore._initialize_tables(self.engine)
+            self._tables_initialized = True
+
+    @staticmethod
+    async def _initialize_tables(engine: AsyncEngine) -> None:
+        _logger.info("Creating initial Submarine database tables...")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    @staticmethod
+    def _get_managed_session_maker(SessionMaker: sessionmaker, prepare: Callable[[], Awaitable[None]]):
+        """
+        Creates a factory for producing exception-safe SQLAlchemy asyncio sessions that are made
+        available using an asynchronous context manager. Any session produced by this factory is
+        automatically committed if no exceptions are encountered within its associated context.
+        If an exception is encountered, the session is rolled back. Finally, any session produced
+        by this factory is automatically closed when the session's associated context is exited.
+        """
+
+        @asynccontextmanager
+        async def make_managed_session():
+            """Provide a transactional scope around a series of operations."""
+            await prepare()
+            session: AsyncSession = SessionMaker()
+            try:
+                yield session
+                await session.commit()
+            except SubmarineException:
+                await session.rollback()
+                raise
+            except Exception as e:
+                await session.rollback()
+                raise SubmarineException(e)
+            finally:
+                await session.close()
+
+        return make_managed_session
+
+    async def close(self) -> None:
+        """
+        Dispose the connection pool of this store.
+        """
+        await self.engine.dispose()
+
+    @staticmethod
+    def _get_eager_registered_model_query_options(with_model_versions: bool = False) -> list:
+        """
+        :return A list of SQLAlchemy query options that eagerly load ``registered_model_tag``
+                and, if requested, ``model_version``. Lazy loading is not available on
+                asyncio sessions, so every attribute read later must be loaded here.
+        """
+        options = [selectinload(SqlRegisteredModel.tags)]
+        if with_model_versions:
+            options.append(selectinload(SqlRegisteredModel.model_versions))
+        return options
+
+    @staticmethod
+    def _get_eager_model_version_query_options() -> list:
+        """
+        :return: A list of SQLAlchemy query options that eagerly load ``model_version_tag``
+                 and the registered model the version belongs to.
+        """
+        return [selectinload(SqlModelVersion.tags), joinedload(SqlModelVersion.registered_model)]
+
+    def _save_to_db(self, session: AsyncSession, objs: Union[list, object]) -> None:
+        """
+        Store in db
+        """
+        if type(objs) is list:
+            session.add_all(objs)
+        else:
+            # single object
+            session.add(objs)
+
+    async def create_registered_model(
+        self, name: str, description: Optional[str] = None, tags: Optional[List[str]] = None
+    ) -> RegisteredModel:
+        """
+        Create a new registered model in backend store.
+        :param name: Name of the new registered model.
+                     This is expected to be unique in the backend store.
+        :param description: Description of the registered model.
+        :param tags: A list of tags associated with this registered model.
+        :return: A single object of :py:class:`submarine.entities.model_registry.RegisteredModel`
+                 created in the backend.
+        """
+        validate_model_name(name)
+        validate_tags(tags)
+        validate_description(description)
+        async with self.ManagedSessionMaker() as session:
+            try:
+                creation_time = datetime.now()
+                registered_model = SqlRegisteredModel(
+                    name=name,
+                    creation_time=creation_time,
+                    last_updated_time=creation_time,
+                    description=description,
+                    tags=[SqlRegisteredModelTag(tag=tag) for tag in tags or []],
+                )
+                self._save_to_db(session, registered_model)
+                await session.flush()
+                return registered_model.to_submarine_entity()
+            except sqlalchemy.exc.IntegrityError as e:
+                raise SubmarineException(f"Registered model (name={name}) already exists.\nError: {str(e)}")
+
+    @classmethod
+    async def _get_sql_registered_model(
+        cls, session: AsyncSession, name: str, with_model_versions: bool = False
+    ) -> SqlRegisteredModel:
+        """
+        :param with_model_versions: If ``True``, also eagerly loads the versions of the
+                                    registered model.
+        """
+        validate_model_name(name)
+        result = await session.execute(
+            select(SqlRegisteredModel)
+            .options(*cls._get_eager_registered_model_query_options(with_model_versions))
+            .filter(SqlRegisteredModel.name == name)
+        )
+        models: List[SqlRegisteredModel] = result.scalars().all()
+
+        if len(models) == 0:
+            raise SubmarineException(f"Registered model with name={name} not found")
+        elif len(models) > 1:
+            raise SubmarineException(
+                f"Expected only 1 registered model with name={name}.\nFound {len(models)}"
+            )
+        else:
+            return models[0]
+
+    async def update_registered_model_description(self, name: str, description: str) -> RegisteredModel:
+        """
+        Update description of the registered model.
+        :param name: Registered model name.
+        :param description: New description.
+        :return: A single updated :py:class:`submarine.entities.model_registry.RegisteredModel`
+                 object.
+        """
+        validate_description(description)
+        async with self.ManagedSessionMaker() as session:
+            sql_registered_model = await self._get_sql_registered_model(session, name)
+            sql_registered_model.description = description
+            sql_registered_model.last_updated_time = datetime.now()
+            self._save_to_db(session, sql_registered_model)
+            await session.flush()
+            return sql_registered_model.to_submarine_entity()
+
+    async def rename_registered_model(self, name: str, new_name: str) -> RegisteredModel:
+        """
+        Rename the registered model.
+        :param name: Registered model name.
+        :param new_name: New proposed name.
+        :return: A single updated :py:class:`submarine.entities.model_registry.RegisteredModel`
+                 object.
+        """
+        validate_model_name(new_name)
+        async with self.ManagedSessionMaker() as session:
+            sql_registered_model = await self._get_sql_registered_model(
+                session, name, with_model_versions=True
+            )
+            try:
+                update_time = datetime.now()
+                sql_registered_model.name = new_name
+                sql_registered_model.last_updated_time = update_time
+                for sql_model_version in sql_registered_model.model_versions:
+                    sql_model_version.name = new_name
+                    sql_model_version.last_updated_time = update_time
+                self._save_to_db(session, [sql_registered_model] + sql_registered_model.model_versions)
+                await session.flush()
+                return sql_registered_model.to_submarine_entity()
+            except sqlalchemy.exc.IntegrityError as e:
+                raise SubmarineException(f"Registered Model (name={name}) already exists. Error: {str(e)}")
+
+    async def delete_registered_model(self, name: str) -> None:
+        """
+        Delete the registered model.
+        :param name: Registered model name.
+        :return: None.
+        """
+        async with self.ManagedSessionMaker() as session:
+            sql_registered_model = await self._get_sql_registered_model(
+                session, name, with_model_versions=True
+            )
+            await session.delete(sql_registered_model)
+
+    async def list_registered_model(
+        self, filter_str: Optional[str] = None, filter_tags: Optional[List[str]] = None
+    ) -> List[RegisteredModel]:
+        """
+        List of all models.
+        :param filter_string: Filter query string, defaults to searching all registered models.
+        :param filter_tags: Filter tags, defaults not to filter any tags.
+        :return: A List of :py:class:`submarine.entities.model_registry.RegisteredModel` objects
+                that satisfy the search expressions.
+        """
+        conditions = []
+        if filter_tags is not None:
+            conditions += [
+                SqlRegisteredModel.tags.any(SqlRegisteredModelTag.tag.contains(tag)) for tag in filter_tags
+            ]
+        if filter_str is not None:
+            conditions.append(SqlRegisteredModel.name.startswith(filter_str))
+        async with self.ManagedSessionMaker() as session:
+            result = await session.execute(
+                select(SqlRegisteredModel)
+                .options(*self._get_eager_registered_model_query_options())
+                .filter(*conditions)
+            )
+            return [sql_registered_model.to_submarine_entity() for sql_registered_model in result.scalars()]
+
+    async def get_registered_model(self, name: str) -> RegisteredModel:
+        """
+        Get registered model instance by name.
+        :param name: Registered model name.
+        :return: A single :py:class:`submarine.entities.model_registry.RegisteredModel` object.
+        """
+        async with self.ManagedSessionMaker() as session:
+            return (await self._get_sql_registered_model(session, name)).to_submarine_entity()
+
+    @classmethod
+    async def _get_registered_model_tag(
+        cls, session: AsyncSession, name: str, tag: str
+    ) -> SqlRegisteredModelTag:
+        result = await session.execute(
+            select(SqlRegisteredModelTag).filter(
+                SqlRegisteredModelTag.name == name, SqlRegisteredModelTag.tag == tag
+            )
+        )
+        tags = result.scalars().all()
+        if len(tags) == 0:
+            raise SubmarineException(f"Registered model tag with name={name}, tag={tag} not found")
+        elif len(tags) > 1:
+            raise SubmarineException(
+                f"Expected only 1 registered model version tag with name={name}, tag={tag}. Found"
+                f" {len(tags)}."
+            )
+        else:
+            return tags[0]
+
+    async def add_registered_model_tag(self, name: str, tag: str) -> None:
+        """
+        Add a tag for the registered model.
+        :param name: registered model name.
+        :param tag: String of tag value.
+        :return: None.
+        """
+        validate_model_name(name)
+        validate_tag(tag)
+        async with self.ManagedSessionMaker() as session:
+            # check if registered model exists
+            await self._get_sql_registered_model(session, name)
+            await session.merge(SqlRegisteredModelTag(name=name, tag=tag))
+
+    async def delete_registered_model_tag(self, name: str, tag: str) -> None:
+        """
+        Delete a tag associated with the registered model.
+        :param name: Model name.
+        :param tag: String of tag value.
+        :return: None.
+        """
+        validate_model_name(name)
+        validate_tag(tag)
+        async with self.ManagedSessionMaker() as session:
+            # check if registered model exists
+            await self._get_sql_registered_model(session, name)
+            existing_tag = await self._get_registered_model_tag(session, name, tag)
+            await session.delete(existing_tag)
+
+    async def create_model_version(
+        self,
+        name: str,
+        id: str,
+        user_id: str,
+        experiment_id: str,
+        model_type: str,
+        dataset: Optional[str] = None,
+        description: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> ModelVersion:
+        """
+        Create a new version of the registered model
+        :param name: Registered model name.
+        :param id: Model ID generated when model is created and stored in the description.json
+        :param user_id: User ID from server that created this model
+        :param experiment_id: Experiment ID which this model is created.
+        :param dataset: Dataset which this version of model is used.
+        :param description: Description of this version.
+        :param tags: A list of string associated with this version of model.
+        :return: A single object of :py:class:`submarine.entities.model_registry.ModelVersion`
+                 created in the backend.
+        """
+
+        def next_version(sql_registered_model: SqlRegisteredModel) -> int:
+            if sql_registered_model.model_versions:
+                return (
+                    max(0 if m.version is None else m.version for m in sql_registered_model.model_versions)
+                    + 1
+                )
+            else:
+                return 1
+
+        validate_model_name(name)
+        validate_description(description)
+        validate_tags(tags)
+        async with self.ManagedSessionMaker() as session:
+            try:
+                creation_time = datetime.now()
+                sql_registered_model = await self._get_sql_registered_model(
+                    session, name, with_model_versions=True
+                )
+                sql_registered_model.last_updated_time = creation_time
+                model_version = SqlModelVersion(
+                    name=name,
+                    version=next_version(sql_registered_model),
+                    id=id,
+                    user_id=user_id,
+                    experiment_id=experiment_id,
+                    model_type=model_type,
+                    creation_time=creation_time,
+                    last_updated_time=creation_time,
+                    dataset=dataset,
+                    description=description,
+                    tags=[SqlModelVersionTag(tag=tag) for tag in tags or []],
+                )
+                self._save_to_db(session, [sql_registered_model, model_version])
+                await session.flush()
+                return model_version.to_submarine_entity()
+            except sqlalchemy.exc.IntegrityError:
+                raise SubmarineException(f"Model create error (name={name}).")
+
+    @classmethod
+    async def _get_sql_model_version(cls, session: AsyncSession, name: str, version: int) -> SqlModelVersion:
+        validate_model_name(name)
+        validate_model_version(version)
+        conditions = [
+            SqlModelVersion.name == name,
+            SqlModelVersion.version == version,
+            SqlModelVersion.current_stage != STAGE_DELETED_INTERNAL,
+        ]
+
+        result = await session.execute(
+            select(SqlModelVersion).options(*cls._get_eager_model_version_query_options()).filter(*conditions)
+        )
+        models: List[SqlModelVersion] = result.scalars().all()
+        if len(models) == 0:
+            raise SubmarineException(f"Model Version (name={name}, version={version}) not found.")
+        elif len(models) > 1:
+            raise SubmarineException(
+                f"Expected only 1 model version with (name={name}, version={version}). Found {len(models)}."
+            )
+        else:
+            return models[0]
+
+    async def update_model_version_description(
+        self, name: str, version: int, description: str
+    ) -> ModelVersion:
+        """
+        Update description associated with the version of model in backend.
+        :param name: Registered model name.
+        :param version: Version of the registered model.
+        :param description: New model description.
+        :return: A single :py:class:`submarine.entities.model_registry.ModelVersion` object.
+        """
+        validate_description(description)
+        async with self.ManagedSessionMaker() as session:
+            update_time = datetime.now()
+            sql_model = await self._get_sql_model_version(session, name, version)
+            sql_model.description = description
+            sql_model.last_updated_time = update_time
+            self._save_to_db(session, sql_model)
+            return sql_model.to_submarine_entity()
+
+    async def transition_model_version_stage(self, name: str, version: int, stage: str) -> ModelVersion:
+        """
+        Update this version's stage.
+        :param name: Registered model name.
+        :param version: Version of the registered model.
+        :param stage: New desired stage for this version of registered model.
+        :return: A single :py:class:`submarine.entities.model_registry.ModelVersion` object.
+        """
+        async with self.ManagedSessionMaker() as session:
+            last_updated_time = datetime.now()
+
+            sql_model_version = await self._get_sql_model_version(session, name, version)
+            sql_model_version.current_stage = get_canonical_stage(stage)
+            sql_model_version.last_updated_time = last_updated_time
+            sql_registered_model = sql_model_version.registered_model
+            sql_registered_model.last_updated_time = last_updated_time
+            self._save_to_db(session, [sql_model_version, sql_registered_model])
+            return sql_model_version.to_submarine_entity()
+
+    async def delete_model_version(self, name: str, version: int) -> None:
+        """
+        Delete model version in backend.
+        :param name: Registered model name.
+        :param version: Version of the registered model.
+        :return: None
+        """
+        async with self.ManagedSessionMaker() as session:
+            updated_time = datetime.now()
+            sql_model_version = await self._get_sql_model_version(session, name, version)
+            sql_registered_model = sql_model_version.registered_model
+            sql_registered_model.last_updated_time = updated_time
+            await session.delete(sql_model_version)
+            self._save_to_db(session, sql_registered_model)
+            await session.flush()
+
+    async def get_model_version(self, name: str, version: int) -> ModelVersion:
+        """
+        Get the model by name and version.
+        :param name: Registered model name.
+        :param version: Version of registered model.
+        :return: A single :py:class:`submarine.entities.model_registry.ModelVersion` object.
+        """
+        async with self.ManagedSessionMaker() as session:
+            sql_model_version = await self._get_sql_model_version(session, name, version)
+            return sql_model_version.to_submarine_entity()
+
+    async def list_model_versions(self, name: str, filter_tags: Optional[list] = None) -> List[ModelVersion]:
+        """
+        List of all models that satisfy the filter criteria.
+        :param name: Registered model name.
+        :param filter_tags: Filter tags, defaults not to filter any tags.
+        :return: A List of :py:class:`submarine.entities.model_registry.ModelVersion` objects
+                that satisfy the search expressions.
+        """
+        conditions = [SqlModelVersion.name == name]
+        if filter_tags is not None:
+            conditions += [
+                SqlModelVersion.tags.any(SqlModelVersionTag.tag.contains(tag)) for tag in filter_tags
+            ]
+        async with self.ManagedSessionMaker() as session:
+            result = await session.execute(
+                select(SqlModelVersion).options(selectinload(SqlModelVersion.tags)).filter(*conditions)
+            )
+            return [sql_model.to_submarine_entity() for sql_model in result.scalars()]
+
+    async def get_model_version_uri(self, name: str, version: int) -> str:
+        """
+        Get the location in Model registry for this version.
+        :param name: Registered model name.
+        :param version: Version of registered model.
+        :return: A single URI location.
+        """
+        async with self.ManagedSessionMaker() as session:
+            mv = await self._get_sql_model_version(session, name, version)
+            return f"s3://submarine/registry/{mv.id}/{mv.name}/{mv.version}"
+
+    @classmethod
+    async def _get_sql_model_version_tag(
+        cls, session: AsyncSession, name: str, version: int, tag: str
+    ) -> SqlModelVersionTag:
+        result = await session.execute(
+            select(SqlModelVersionTag).filter(
+                SqlModelVersionTag.name == name,
+                SqlModelVersionTag.version == version,
+                SqlModelVersionTag.tag == tag,
+            )
+        )
+        tags = result.scalars().all()
+        if len(tags) == 0:
+            raise SubmarineException(
+                f"Model version tag with name={name}, version={version}, tag={tag} not found"
+            )
+        elif len(tags) > 1:
+            raise SubmarineException(
+                f"Expected only 1 model version tag with name={name}, version={version}, tag={tag}."
+                f" Found {len(tags)}."
+            )
+        else:
+            return tags[0]
+
+    async def add_model_version_tag(self, name: str, version: int, tag: str) -> None:
+        """
+        Add a tag for this version of model.
+        :param name: Registered model name.
+        :param version: Version of registered model.
+        :param tag: String of tag value.
+        :return: None.
+        """
+        validate_model_name(name)
+        validate_model_version(version)
+        validate_tag(tag)
+        async with self.ManagedSessionMaker() as session:
+            # check if model version exists
+            await self._get_sql_model_version(session, name, version)
+            await session.merge(SqlModelVersionTag(name=name, version=version, tag=tag))
+
+    async def delete_model_version_tag(self, name: str, version: int, tag: str) -> None:
+        """
+        Delete a tag associated with this version of model.
+        :param name: Registered model name.
+        :param version: Version of registered model.
+        :param tag: String of tag value.
+        :return: None.
+        """
+        validate_model_name(name)
+        validate_model_version(version)
+        validate_tag(tag)
+        async with self.ManagedSessionMaker() as session:
+            # check if model version exists
+            await self._get_sql_model_version(session, name, version)
+            existing_tag = await self._get_sql_model_version_tag(session, name, version, tag)
+            await session.delete(existing_tag)
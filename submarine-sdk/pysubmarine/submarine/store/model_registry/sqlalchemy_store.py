@@ -29,6 +29,7 @@ from submarine.entities.model_registry.model_stages import (
     get_canonical_stage,
 )
 from submarine.exceptions import SubmarineException
+from submarine.store.database.engine import create_engine
 from submarine.store.database.models import (
     Base,
     SqlModelVersion,
@@ -56,13 +57,13 @@ class SqlAlchemyStore(AbstractStore):
         :param db_uri: The SQLAlchemy database URI string to connect to the database. See
                        the `SQLAlchemy docs
                        <https://docs.sqlalchemy.org/en/latest/core/engines.html#database-urls>`_
-                       for format specifications. Submarine supports the dialects ``mysql``.
+                       for format specifications. Submarine supports the dialects ``mysql`` and ``sqlite``.
         """
         super().__init__()
 
         self.db_uri = db_uri
         self.db_type = extract_db_type_from_uri(db_uri)
-        self.engine = sqlalchemy.create_engine(db_uri, pool_pre_ping=True)
+        self.engine = create_engine(db_uri)
         insp = sqlalchemy.inspect(self.engine)
 
         # Verify that all model registry tables exist.
@@ -0,0 +1,154 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import math
+from typing import Any, Optional
+
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from submarine.entities import Metric, Param
+from submarine.store.database.engine import create_async_engine
+from submarine.store.database.models import SqlMetric, SqlParam
+from submarine.store.model_registry.async_sqlalchemy_store import (
+    AsyncSqlAlchemyStore as AsyncModelRegistryStore,
+)
+from submarine.utils import extract_db_type_from_uri, get_async_db_uri
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncSqlAlchemyStore:
+    """
+    asyncio counterpart of :py:class:`submarine.store.tracking.sqlalchemy_store.SqlAlchemyStore`.
+    Metrics and params are written through SQLAlchemy's asyncio engine, so logging from
+    coroutines does not block the event loop.
+    """
+
+    def __init__(self, db_uri: str, **engine_kwargs: Any) -> None:
+        """
+        Create a database backed store.
+        :param db_uri: The SQLAlchemy database URI string to connect to the database. Synchronous
+                       drivers are replaced by their asyncio counterparts, e.g. ``mysql+pymysql``
+                       is served by ``mysql+asyncmy`` and ``sqlite`` by ``sqlite+aiosqlite``.
+        :param engine_kwargs: Extra keyword arguments of ``create_async_engine``.
+        """
+        self.db_uri = db_uri
+        self.db_type = extract_db_type_from_uri(db_uri)
+        self.engine: AsyncEngine = create_async_engine(get_async_db_uri(db_uri), **engine_kwargs)
+        self._tables_initialized = False
+        self._tables_lock: Optional[asyncio.Lock] = None
+        SessionMaker = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.ManagedSessionMaker = AsyncModelRegistryStore._get_managed_session_maker(
+            SessionMaker, self._verify_tables
+        )
+
+    async def _verify_tables(self) -> None:
+        """
+        Verify that the tracking tables exist, creating them on first use.
+        """
+        if self._tables_initialized:
+            return
+        if self._tables_lock is None:
+            self._tables_lock = asyncio.Lock()
+        async with self._tables_lock:
+            if self._tables_initialized:
+                return
+            expected_tables = {
+                SqlMetric.__tablename__,
+                SqlParam.__tablename__,
+            }
+            async with self.engine.connect() as conn:
+                table_names = await conn.run_sync(
+                    lambda sync_conn: sqlalchemy.inspect(sync_conn).get_table_names()
+                )
+            if len(expected_tables & set(table_names)) == 0:
+                await AsyncModelRegistryStore._initialize_tables(self.engine)
+            self._tables_initialized = True
+
+    async def close(self) -> None:
+        """
+        Dispose the connection pool of this store.
+        """
+        await self.engine.dispose()
+
+    @staticmethod
+    def _save_to_db(session: AsyncSession, objs: object):
+        """
+        Store in db
+        """
+        if type(objs) is list:
+            session.add_all(objs)
+        else:
+            # single object
+            session.add(objs)
+
+    async def _get_or_create(self, session: AsyncSession, model, **kwargs):
+        instance = (await session.execute(select(model).filter_by(**kwargs))).scalars().first()
+        created = False
+
+        if instance:
+            return instance, created
+        else:
+            instance = model(**kwargs)
+            self._save_to_db(objs=instance, session=session)
+            created = True
+
+        return instance, created
+
+    async def log_metric(self, job_id: str, metric: Metric) -> None:
+        is_nan = math.isnan(metric.value)
+        if is_nan:
+            value = 0
+        elif math.isinf(metric.value):
+            #  NB: Sql can not represent Infs = > We replace +/- Inf with max/min 64b float value
+            value = 1.7976931348623157e308 if metric.value > 0 else -1.7976931348623157e308
+        else:
+            # some driver doesn't knows float64, so we need convert it to a regular float
+            value = float(metric.value)
+        async with self.ManagedSessionMaker() as session:
+            try:
+                await self._get_or_create(
+                    model=SqlMetric,
+                    id=job_id,
+                    key=metric.key,
+                    value=value,
+                    worker_index=metric.worker_index,
+                    timestamp=metric.timestamp,
+                    step=metric.step,
+                    session=session,
+                    is_nan=is_nan,
+                )
+            except sqlalchemy.exc.IntegrityError:
+                await session.rollback()
+
+    async def log_param(self, job_id: str, param: Param) -> None:
+        async with self.ManagedSessionMaker() as session:
+            try:
+                await self._get_or_create(
+                    model=SqlParam,
+                    id=job_id,
+                    session=session,
+                    key=param.key,
+                    value=param.value,
+                    worker_index=param.worker_index,
+                )
+                await session.commit()
+            except sqlalchemy.exc.IntegrityError:
+                await session.rollback()
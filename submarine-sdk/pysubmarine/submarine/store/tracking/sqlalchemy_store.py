@@ -21,6 +21,7 @@ import sqlalchemy
 
 from submarine.entities import Param
 from submarine.exceptions import SubmarineException
+from submarine.store.database.engine import create_engine
 from submarine.store.database.models import Base, SqlMetric, SqlParam
 from submarine.store.tracking.abstract_store import AbstractStore
 from submarine.utils import extract_db_type_from_uri
@@ -31,7 +32,7 @@ _logger = logging.getLogger(__name__)
 class SqlAlchemyStore(AbstractStore):
     """
     SQLAlchemy compliant backend store for tracking meta data for Submarine entities. Submarine
-    supports the database dialects ``mysql``.
+    supports the database dialects ``mysql`` and ``sqlite``.
     As specified in the
     `SQLAlchemy docs <https://docs.sqlalchemy.org/en/latest/core/engines.html#database-urls>`_ ,
     the database URI is expected in the format
@@ -49,12 +50,12 @@ class SqlAlchemyStore(AbstractStore):
         :param db_uri: The SQLAlchemy database URI string to connect to the database. See
                        the `SQLAlchemy docs
                        <https://docs.sqlalchemy.org/en/latest/core/engines.html#database-urls>`_
-                       for format specifications. Submarine supports the dialects ``mysql``.
+                       for format specifications. Submarine supports the dialects ``mysql`` and ``sqlite``.
         """
         super().__init__()
         self.db_uri = db_uri
         self.db_type = extract_db_type_from_uri(db_uri)
-        self.engine = sqlalchemy.create_engine(db_uri, pool_pre_ping=True)
+        self.engine = create_engine(db_uri)
         insp = sqlalchemy.inspect(self.engine)
 
         expected_tables = {
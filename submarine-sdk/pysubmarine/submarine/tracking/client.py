@@ -12,24 +12,83 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import atexit
+import contextlib
+import io
 import json
+import logging
 import os
 import re
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Set
 
 import submarine
-from submarine.artifacts.repository import Repository
 from submarine.client.api.serve_client import ServeClient
 from submarine.client.utils.api_utils import generate_host
 from submarine.entities import Metric, Param
+from submarine.entities.model_registry import ModelVersion
 from submarine.exceptions import SubmarineException
 from submarine.tracking import utils
 from submarine.utils.validation import validate_metric, validate_param
 
 from .constant import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, S3_ENDPOINT_URL
 
+if TYPE_CHECKING:
+    from submarine.artifacts.cache import ArtifactCache
+
+_logger = logging.getLogger(__name__)
+
+# Serialized models larger than this are spooled to a temporary file instead of memory.
+SPOOL_MAX_SIZE = 256 * 1024 * 1024
+
+# Background uploads of save_model(async_upload=True). A single worker registers the model
+# versions in the order in which they were saved.
+_upload_executor: Optional[ThreadPoolExecutor] = None
+_upload_futures: Set[Future] = set()
+_upload_lock = threading.Lock()
+
+
+def _submit_upload(fn: Callable[[], Any]) -> Future:
+    global _upload_executor
+    with _upload_lock:
+        if _upload_executor is None:
+            _upload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="submarine-upload")
+            atexit.register(wait_for_uploads)
+        future = _upload_executor.submit(fn)
+        _upload_futures.add(future)
+    future.add_done_callback(_discard_upload)
+    return future
+
+
+def _discard_upload(future: Future) -> None:
+    # failed uploads are kept until wait_for_uploads reports them
+    if future.exception() is None:
+        with _upload_lock:
+            _upload_futures.discard(future)
+
+
+def wait_for_uploads(timeout: Optional[float] = None) -> None:
+    """
+    Block until the background uploads of save_model(async_upload=True) have finished. It is
+    also run at interpreter exit.
+    :param timeout: Maximum number of seconds to wait, or None to wait without limit.
+    """
+    with _upload_lock:
+        futures = list(_upload_futures)
+    done, not_done = wait(futures, timeout=timeout)
+    failed = [future for future in done if future.exception() is not None]
+    for future in failed:
+        _logger.error("Background model upload failed", exc_info=future.exception())
+    with _upload_lock:
+        _upload_futures.difference_update(failed)
+    if failed or not_done:
+        raise SubmarineException(
+            f"{len(failed)} background model uploads failed and {len(not_done)} are still running"
+        )
+
 
 class SubmarineClient:
     """
@@ -43,12 +102,16 @@ class SubmarineClient:
         aws_access_key_id: Optional[str] = None,
         aws_secret_access_key: Optional[str] = None,
         host: str = generate_host(),
+        artifact_uri: Optional[str] = None,
     ) -> None:
         """
         :param db_uri: Address of local or remote tracking server. If not provided, defaults
                              to the service set by ``submarine.tracking.set_db_uri``. See
                              `Where Runs Get Recorded <../tracking.html#where-runs-get-recorded>`_
                              for more info.
+        :param artifact_uri: URI of the artifact repository, e.g. s3://submarine or
+                             file:///data/submarine. If not provided, defaults to
+                             $SUBMARINE_ARTIFACT_URI or s3://submarine.
         """
         # s3 endpoint url
         if s3_registry_uri is not None:
@@ -65,7 +128,8 @@ class SubmarineClient:
             os.environ["AWS_SECRET_ACCESS_KEY"] = aws_secret_access_key
         elif "AWS_SECRET_ACCESS_KEY" not in os.environ:
             os.environ["AWS_SECRET_ACCESS_KEY"] = AWS_SECRET_ACCESS_KEY
-        self.artifact_repo = Repository()
+        self.artifact_repo = utils.get_artifact_repository(artifact_uri)
+        self._artifact_cache: Optional["ArtifactCache"] = None
         self.db_uri = db_uri or submarine.get_db_uri()
         self.store = utils.get_tracking_sqlalchemy_store(self.db_uri)
         self.model_registry = utils.get_model_registry_sqlalchemy_store(self.db_uri)
@@ -115,7 +179,8 @@ class SubmarineClient:
         registered_model_name: Optional[str] = None,
         input_dim: Optional[list] = None,
         output_dim: Optional[list] = None,
-    ) -> None:
+        async_upload: bool = False,
+    ):
         """
         Save a model into the minio pod or even register a model.
         :param model: Model.
@@ -124,6 +189,10 @@ class SubmarineClient:
                                       this name. If None, the model only be saved in minio pod.
         :param input_dim: Save the input dimension of the given model to the description file.
         :param output_dim: Save the output dimension of the given model to the description file.
+        :param async_upload: If True, only serialize the model into a local spool before
+                             returning, and upload and register it on a background thread.
+        :return: The registered model version, or None if registered_model_name is None. If
+                 async_upload is True, a future of it.
         """
         pattern = r"[0-9A-Za-z][0-9A-Za-z-_]*[0-9A-Za-z]|[0-9A-Za-z]"
         if registered_model_name and not re.fullmatch(pattern, registered_model_name):
@@ -135,39 +204,152 @@ class SubmarineClient:
 
         model_id = utils.generate_model_id()
 
+        # the spool is cleaned up by the stack once the model has been uploaded
+        stack = contextlib.ExitStack()
+        try:
+            upload_model = self._snapshot_model(model, model_type, input_dim, output_dim, stack)
+        except BaseException:
+            stack.close()
+            raise
+
+        def upload_and_register():
+            with stack:
+                return self._upload_and_register_model(
+                    upload_model, model_type, model_id, registered_model_name, input_dim, output_dim
+                )
+
+        if async_upload:
+            return _submit_upload(upload_and_register)
+        return upload_and_register()
+
+    def _upload_and_register_model(
+        self,
+        upload_model: Callable[[str], None],
+        model_type: str,
+        model_id: str,
+        registered_model_name: Optional[str] = None,
+        input_dim: Optional[list] = None,
+        output_dim: Optional[list] = None,
+    ) -> Optional[ModelVersion]:
         dest_path = self._generate_experiment_artifact_path(f"experiment/{self.experiment_id}")
 
         # log artifact under the experiment directory
-        self._log_artifact(model, dest_path, model_type, model_id, input_dim, output_dim)
+        self._log_artifact(upload_model, dest_path, model_type, model_id, input_dim, output_dim)
+        # the folder holds data now, which keeps it from being allocated again
+        self.artifact_repo.release_folder(dest_path)
 
         # Register model
-        if registered_model_name is not None:
-            try:
-                self.model_registry.get_registered_model(registered_model_name)
-            except SubmarineException:
-                self.model_registry.create_registered_model(name=registered_model_name)
-
-            mv = self.model_registry.create_model_version(
-                name=registered_model_name,
-                id=model_id,
-                user_id="",  # TODO(jeff-901): the user id is needed to be specified.
-                experiment_id=self.experiment_id,
-                model_type=model_type,
-            )
+        if registered_model_name is None:
+            return None
+        try:
+            self.model_registry.get_registered_model(registered_model_name)
+        except SubmarineException:
+            self.model_registry.create_registered_model(name=registered_model_name)
+
+        mv = self.model_registry.create_model_version(
+            name=registered_model_name,
+            id=model_id,
+            user_id="",  # TODO(jeff-901): the user id is needed to be specified.
+            experiment_id=self.experiment_id,
+            model_type=model_type,
+        )
+
+        # copy the artifact logged under the experiment directory to the registry directory
+        self.artifact_repo.copy_folder(
+            dest_path, f"registry/{mv.name}-{mv.version}-{model_id}/{mv.name}/{mv.version}"
+        )
+        return mv
+
+    @property
+    def artifact_cache(self) -> "ArtifactCache":
+        if self._artifact_cache is None:
+            # imported here as the cache needs fcntl, which is not available on Windows
+            from submarine.artifacts.cache import ArtifactCache
+
+            self._artifact_cache = ArtifactCache()
+        return self._artifact_cache
 
-            # log artifact under the registry directory
-            self._log_artifact(
-                model,
-                f"registry/{mv.name}-{mv.version}-{model_id}/{mv.name}/{mv.version}",
-                model_type,
-                model_id,
-                input_dim,
-                output_dim,
+    def download_model(self, name: str, version: int) -> str:
+        """
+        Download a registered model version into the local artifact cache. The cache is keyed by
+        the model id and shared by all processes of the node, so the model is only fetched once.
+        :param name: Name of a registered model
+        :param version: Version of a registered model
+        :return: The local directory of the model.
+        """
+        return self._download_model_version(self.model_registry.get_model_version(name, version))
+
+    def _download_model_version(self, mv) -> str:
+        return self.artifact_cache.get(mv.id, self._model_version_populator(mv))
+
+    def _model_version_populator(self, mv) -> Callable[[str], None]:
+        src_path = f"registry/{mv.name}-{mv.version}-{mv.id}/{mv.name}/{mv.version}"
+        return lambda local_dir: self.artifact_repo.download_artifacts(src_path, local_dir)
+
+    def load_model(self, name: str, version: int):
+        """
+        Load a registered model version, downloading it into the local artifact cache if needed.
+        :param name: Name of a registered model
+        :param version: Version of a registered model
+        :return: The loaded model.
+        """
+        mv = self.model_registry.get_model_version(name, version)
+        # the cached model must not be evicted while it is loaded
+        with self.artifact_cache.open(mv.id, self._model_version_populator(mv)) as model_dir:
+            if mv.model_type == "pytorch":
+                import submarine.models.pytorch
+
+                return submarine.models.pytorch.load_model(model_dir)
+            elif mv.model_type == "tensorflow":
+                import submarine.models.tensorflow
+
+                return submarine.models.tensorflow.load_model(model_dir)
+            else:
+                raise Exception(f"No valid type of model has been matched to {mv.model_type}")
+
+    def _snapshot_model(
+        self,
+        model,
+        model_type: str,
+        input_dim: Optional[list],
+        output_dim: Optional[list],
+        stack: contextlib.ExitStack,
+    ) -> Callable[[str], None]:
+        """
+        Serialize a model into a local spool, which is cleaned up when the stack is closed.
+        :param model: Model.
+        :param model_type: The type of the model.
+        :param input_dim: The input dimension of the given model.
+        :param output_dim: The output dimension of the given model.
+        :param stack: Owner of the spool.
+        :return: A function which uploads the spool to a destination path.
+        """
+        if model_type == "pytorch":
+            import submarine.models.pytorch
+
+            if input_dim is None or output_dim is None:
+                raise Exception(
+                    "Saving pytorch model needs to provide input and output dimension for serving."
+                )
+            # the model is serialized in memory and only spills to disk above SPOOL_MAX_SIZE
+            f = stack.enter_context(tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE))
+            submarine.models.pytorch.save_model_to_fileobj(model, f, input_dim)
+            return lambda dest_path: self.artifact_repo.log_artifact_fileobj(
+                os.path.join(dest_path, submarine.models.pytorch.MODEL_FILE), f
             )
+        elif model_type == "tensorflow":
+            import submarine.models.tensorflow
+
+            # a SavedModel is a directory tree, which has to be written to local files first
+            tempdir = stack.enter_context(tempfile.TemporaryDirectory())
+            submarine.models.tensorflow.save_model(model, tempdir)
+            return lambda dest_path: self.artifact_repo.log_artifacts(dest_path, tempdir)
+        else:
+            raise Exception(f"No valid type of model has been matched to {model_type}")
 
     def _log_artifact(
         self,
-        model,
+        upload_model: Callable[[str], None],
         dest_path: str,
         model_type: str,
         model_id: str,
@@ -176,64 +358,40 @@ class SubmarineClient:
     ):
         """
         Save a model into the minio pod.
-        :param model: Model.
+        :param upload_model: Function uploading the model snapshot to a destination path.
         :param dest_path: Destination path of the submarine bucket in the minio pod.
         :param model_type: The type of the model.
         :param model_id: ID of the model.
         :param input_dim: Save the input dimension of the given model to the description file.
         :param output_dim: Save the output dimension of the given model to the description file.
         """
-        with tempfile.TemporaryDirectory() as tempdir:
-            description: Dict[str, Any] = dict()
-            model_save_dir = tempdir
-            if not os.path.exists(model_save_dir):
-                os.mkdir(model_save_dir)
-            if model_type == "pytorch":
-                import submarine.models.pytorch
-
-                if input_dim is None or output_dim is None:
-                    raise Exception(
-                        "Saving pytorch model needs to provide input and output dimension for serving."
-                    )
-                submarine.models.pytorch.save_model(model, model_save_dir, input_dim)
-            elif model_type == "tensorflow":
-                import submarine.models.tensorflow
+        upload_model(dest_path)
 
-                submarine.models.tensorflow.save_model(model, model_save_dir)
-            else:
-                raise Exception(f"No valid type of model has been matched to {model_type}")
-
-            # Write description file
-            description["id"] = model_id
-            if input_dim is not None:
-                description["input"] = [
-                    {
-                        "dims": input_dim,
-                    }
-                ]
-            if output_dim is not None:
-                description["output"] = [
-                    {
-                        "dims": output_dim,
-                    }
-                ]
-            description["model_type"] = model_type
-            with open(os.path.join(model_save_dir, "description.json"), "w") as f:
-                json.dump(description, f)
-
-            # Log all files into minio
-            self.artifact_repo.log_artifacts(dest_path, model_save_dir)
+        description: Dict[str, Any] = dict()
+        # Write description file
+        description["id"] = model_id
+        if input_dim is not None:
+            description["input"] = [
+                {
+                    "dims": input_dim,
+                }
+            ]
+        if output_dim is not None:
+            description["output"] = [
+                {
+                    "dims": output_dim,
+                }
+            ]
+        description["model_type"] = model_type
+        self.artifact_repo.log_artifact_fileobj(
+            os.path.join(dest_path, "description.json"), io.BytesIO(json.dumps(description).encode("utf-8"))
+        )
 
     def _generate_experiment_artifact_path(self, dest_path: str) -> str:
         """
         :param dest_path: destination of current experiment directory
         """
-        list_of_subfolder = self.artifact_repo.list_artifact_subfolder(dest_path)
-        return (
-            os.path.join(dest_path, str(len(list_of_subfolder) + 1))
-            if list_of_subfolder
-            else os.path.join(dest_path, "1")
-        )
+        return self.artifact_repo.allocate_folder(dest_path)
 
     def create_serve(self, model_name: str, model_version: int, async_req: bool = True):
         """
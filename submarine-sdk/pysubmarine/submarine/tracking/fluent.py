@@ -21,6 +21,7 @@ import logging
 from datetime import datetime
 from typing import Optional
 
+from submarine.tracking import client
 from submarine.tracking.client import SubmarineClient
 from submarine.tracking.utils import get_job_id, get_worker_index
 
@@ -60,6 +61,7 @@ def save_model(
     registered_model_name: Optional[str] = None,
     input_dim: Optional[list] = None,
     output_dim: Optional[list] = None,
+    async_upload: bool = False,
 ):
     """
     Save a model into the minio pod.
@@ -67,8 +69,29 @@ def save_model(
     :param model: Model.
     :param registered_model_name: If none None, register model into the model registry with
                                   this name. If None, the model only be saved in minio pod.
+    :param async_upload: If True, upload and register the model in the background and return
+                         a future of the registered model version.
     """
-    SubmarineClient().save_model(model, model_type, registered_model_name, input_dim, output_dim)
+    return SubmarineClient().save_model(
+        model, model_type, registered_model_name, input_dim, output_dim, async_upload
+    )
+
+
+def wait_for_uploads(timeout: Optional[float] = None):
+    """
+    Block until the background uploads of save_model(async_upload=True) have finished.
+    :param timeout: Maximum number of seconds to wait, or None to wait without limit.
+    """
+    client.wait_for_uploads(timeout)
+
+
+def load_model(model_name: str, model_version: int):
+    """
+    Load a registered model, downloading it into the local artifact cache if needed.
+    :param model_name: Name of a registered model
+    :param model_version: Version of a registered model
+    """
+    return SubmarineClient().load_model(model_name, model_version)
 
 
 def create_serve(model_name: str, model_version: int):
@@ -17,10 +17,15 @@
 import json
 import os
 import uuid
+from typing import Optional
+from urllib.parse import urlparse
 
+from submarine.exceptions import SubmarineException
 from submarine.utils import env
 
 _TRACKING_URI_ENV_VAR = "SUBMARINE_TRACKING_URI"
+_ARTIFACT_URI_ENV_VAR = "SUBMARINE_ARTIFACT_URI"
+DEFAULT_ARTIFACT_URI = "s3://submarine"
 # https://github.com/linkedin/TonY/pull/431
 _JOB_ID_ENV_VAR = "JOB_ID"
 
@@ -98,5 +103,40 @@ def get_model_registry_sqlalchemy_store(store_uri: str):
     return SqlAlchemyStore(store_uri)
 
 
+def get_async_tracking_sqlalchemy_store(store_uri: str, **engine_kwargs):
+    from submarine.store.tracking.async_sqlalchemy_store import AsyncSqlAlchemyStore
+
+    return AsyncSqlAlchemyStore(store_uri, **engine_kwargs)
+
+
+def get_async_model_registry_sqlalchemy_store(store_uri: str, **engine_kwargs):
+    from submarine.store.model_registry.async_sqlalchemy_store import (
+        AsyncSqlAlchemyStore,
+    )
+
+    return AsyncSqlAlchemyStore(store_uri, **engine_kwargs)
+
+
+def get_artifact_repository(artifact_uri: Optional[str] = None):
+    """
+    Create the artifact repository of a URI. s3://<bucket> is served by the boto3 S3 client, any
+    other filesystem supported by pyarrow (file://, hdfs://, ...) by a pyarrow filesystem.
+    :param artifact_uri: URI of the artifact repository. Defaults to $SUBMARINE_ARTIFACT_URI or
+                         s3://submarine.
+    """
+    artifact_uri = artifact_uri or env.get_env(_ARTIFACT_URI_ENV_VAR) or DEFAULT_ARTIFACT_URI
+    parsed = urlparse(artifact_uri)
+    if parsed.scheme == "s3":
+        if parsed.path.strip("/"):
+            raise SubmarineException(f"S3 artifact URI {artifact_uri} must only contain a bucket")
+        from submarine.artifacts.repository import Repository
+
+        return Repository(bucket=parsed.netloc)
+
+    from submarine.artifacts.filesystem import FileSystemRepository
+
+    return FileSystemRepository(artifact_uri)
+
+
 def generate_model_id() -> str:
     return uuid.uuid4().hex
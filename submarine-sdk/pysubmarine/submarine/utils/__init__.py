@@ -38,6 +38,30 @@ def extract_db_type_from_uri(db_uri: str):
     return db_type
 
 
+# Async SQLAlchemy drivers used by the asyncio stores for each supported dialect.
+_ASYNC_DB_DRIVERS = {
+    "mysql": "asyncmy",
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+_ASYNC_DB_DRIVER_NAMES = {"asyncmy", "aiomysql", "aiosqlite", "asyncpg"}
+
+
+def get_async_db_uri(db_uri: str) -> str:
+    """
+    Rewrite the specified DB URI so that it uses the asyncio driver of its dialect,
+    e.g. ``mysql+pymysql://...`` becomes ``mysql+asyncmy://...``. URIs which already
+    specify an asyncio driver are returned unchanged.
+    """
+    db_type = extract_db_type_from_uri(db_uri)
+    if db_type not in _ASYNC_DB_DRIVERS:
+        raise SubmarineException(f"Invalid database URI: '{db_uri}'. No asyncio driver for {db_type}.")
+    scheme, rest = db_uri.split(":", 1)
+    if "+" in scheme and scheme.split("+")[1] in _ASYNC_DB_DRIVER_NAMES:
+        return db_uri
+    return f"{db_type}+{_ASYNC_DB_DRIVERS[db_type]}:{rest}"
+
+
 __all__ = [
     "get_db_uri",
     "set_db_uri",
@@ -13,13 +13,45 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
+import fnmatch
 import io
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
-from urllib.parse import urlparse
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+from urllib.parse import unquote, urlparse
 
+import numpy as np
+import pyarrow as pa
 from pyarrow import fs
 
+# Read-ahead of sequential input streams.
+DEFAULT_READ_AHEAD_SIZE = 1024 * 1024
+# Ranges passed to read_ranges are merged when the gap between them is at most
+# DEFAULT_HOLE_SIZE_LIMIT, as long as the merged range stays below DEFAULT_RANGE_SIZE_LIMIT.
+DEFAULT_HOLE_SIZE_LIMIT = 8 * 1024
+DEFAULT_RANGE_SIZE_LIMIT = 32 * 1024 * 1024
+
+# Filesystems by (scheme, authority, query) of their URIs, together with a flag telling whether
+# the authority is part of the path on the filesystem (e.g. the bucket of s3://bucket/key).
+_filesystem_cache: Dict[Tuple[str, str, str], Tuple[fs.FileSystem, bool]] = {}
+_filesystem_cache_lock = threading.Lock()
+
+
+def _clear_filesystem_cache() -> None:
+    global _filesystem_cache_lock
+    _filesystem_cache.clear()
+    _filesystem_cache_lock = threading.Lock()
+
+
+# connections of a cached filesystem must not be shared with a forked child, e.g. a DataLoader
+# worker
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_filesystem_cache)
+
 
 def open_buffered_file_reader(uri: str, buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> io.BufferedReader:
     try:
@@ -49,6 +81,139 @@ def open_input_file(uri: str):
     return filesystem.open_input_file(path)
 
 
+def open_input_stream(uri: str, buffer_size: int = DEFAULT_READ_AHEAD_SIZE):
+    """
+    Open a sequential input stream which reads ahead buffer_size bytes per request, so a scan
+    of a remote file makes few large requests.
+    """
+    filesystem, path = _parse_uri(uri)
+    return filesystem.open_input_stream(path, buffer_size=buffer_size)
+
+
+def open_mapped(uri: str) -> np.ndarray:
+    """
+    View the whole content of a file as a read-only uint8 array. Local files are memory mapped,
+    so slicing records out of the array copies nothing and makes no system calls; the mapping is
+    released with the last view of it. Remote files are read into memory through a read-ahead
+    stream of the cached filesystem.
+    :param uri: URI or local path of the file.
+    """
+    filesystem, path = _parse_uri(uri)
+    if isinstance(filesystem, fs.LocalFileSystem):
+        with pa.memory_map(path, "r") as mapped:
+            buffer = mapped.read_buffer()
+    else:
+        with filesystem.open_input_stream(path, buffer_size=DEFAULT_READ_AHEAD_SIZE) as f:
+            buffer = f.read_buffer()
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+
+def _coalesce_ranges(
+    ranges: List[Tuple[int, int]], hole_size_limit: int, range_size_limit: int
+) -> List[Tuple[int, int]]:
+    coalesced: List[Tuple[int, int]] = []
+    for offset, length in sorted(ranges):
+        if coalesced:
+            start, end = coalesced[-1]
+            if offset - end <= hole_size_limit and max(end, offset + length) - start <= range_size_limit:
+                coalesced[-1] = (start, max(end, offset + length))
+                continue
+        coalesced.append((offset, offset + length))
+    return coalesced
+
+
+def read_ranges(
+    uri: str,
+    ranges: List[Tuple[int, int]],
+    hole_size_limit: int = DEFAULT_HOLE_SIZE_LIMIT,
+    range_size_limit: int = DEFAULT_RANGE_SIZE_LIMIT,
+    max_workers: int = 8,
+) -> List[memoryview]:
+    """
+    Read many (offset, length) ranges of a file. Nearby ranges are coalesced into large reads,
+    which are issued concurrently, and every range is returned as a zero-copy view of them.
+    :param uri: URI or local path of the file.
+    :param ranges: (offset, length) pairs, in any order.
+    :param hole_size_limit: Maximum gap between two ranges which are read together.
+    :param range_size_limit: Maximum size of a coalesced read.
+    :param max_workers: Number of concurrent reads.
+    :return: The content of each range, in the order of ranges.
+    """
+    with open_input_file(uri) as f:
+        return read_file_ranges(f, ranges, hole_size_limit, range_size_limit, max_workers)
+
+
+def read_file_ranges(
+    f,
+    ranges: List[Tuple[int, int]],
+    hole_size_limit: int = DEFAULT_HOLE_SIZE_LIMIT,
+    range_size_limit: int = DEFAULT_RANGE_SIZE_LIMIT,
+    max_workers: int = 8,
+) -> List[memoryview]:
+    """
+    :py:func:`read_ranges` on a file opened with :py:func:`open_input_file`.
+    """
+    coalesced = _coalesce_ranges(ranges, hole_size_limit, range_size_limit)
+    if len(coalesced) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(coalesced))) as executor:
+            buffers = list(executor.map(lambda r: f.read_at(r[1] - r[0], r[0]), coalesced))
+    else:
+        buffers = [f.read_at(end - start, start) for start, end in coalesced]
+
+    starts = [start for start, _ in coalesced]
+    results = []
+    for offset, length in ranges:
+        # index of the last coalesced read starting at or before offset
+        i = bisect.bisect_right(starts, offset) - 1
+        results.append(memoryview(buffers[i])[offset - starts[i] : offset - starts[i] + length])
+    return results
+
+
+def read_line_blocks(
+    uri: str, start: int, end: int, block_size: int = DEFAULT_READ_AHEAD_SIZE
+) -> Iterator[bytes]:
+    """
+    Read the lines of a text file which start in the byte range [start, end) sequentially, as
+    blocks of whole lines of about block_size bytes. A line which crosses end is read to its
+    end, so the blocks of consecutive ranges contain every line of the file once.
+    :param uri: URI or local path of the file.
+    :param start: Start of the byte range.
+    :param end: End of the byte range.
+    :param block_size: Size of the reads.
+    """
+    with open_input_file(uri) as infile:
+        buf_start = max(start - 1, 0)
+        infile.seek(buf_start)
+        buf = b""
+        # the byte before start tells whether a line starts at start
+        while start > 0:
+            chunk = infile.read(block_size)
+            if not chunk:
+                return
+            newline = chunk.find(b"\n")
+            if newline != -1:
+                buf = chunk[newline + 1 :]
+                buf_start += newline + 1
+                break
+            buf_start += len(chunk)
+        while buf_start < end:
+            chunk = infile.read(block_size)
+            buf += chunk
+            # the line which contains the last byte of the range is the last line to read
+            newline = buf.find(b"\n", max(end - 1 - buf_start, 0))
+            if newline != -1:
+                yield buf[: newline + 1]
+                return
+            if not chunk:
+                if buf:
+                    yield buf
+                return
+            cut = buf.rfind(b"\n") + 1
+            if cut:
+                yield buf[:cut]
+                buf, buf_start = buf[cut:], buf_start + cut
+
+
 def open_output_stream(uri: str):
     filesystem, path = _parse_uri(uri)
     return filesystem.open_output_stream(path)
@@ -60,8 +225,85 @@ def file_info(uri: str) -> fs.FileInfo:
     return info
 
 
+def _has_magic(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def glob(uri: str) -> List[str]:
+    """
+    Expand the glob pattern of a URI, or a local path, into the sorted URIs of the matching
+    files, e.g. hdfs://namenode:8020/data/part-*.libsvm. "*", "?" and "[...]" match within a
+    single path component. A URI without a pattern is returned as is.
+    """
+    filesystem, path = _parse_uri(uri)
+    if not _has_magic(path):
+        return [uri]
+    parsed = urlparse(uri)
+    # the matching paths are turned back into URIs of the same filesystem
+    if not parsed.scheme:
+        prefix = ""
+    elif path.startswith("/"):
+        prefix = f"{parsed.scheme}://{parsed.netloc}"
+    else:
+        prefix = f"{parsed.scheme}://"
+    parts = path.split("/")
+    num_fixed = next(i for i, part in enumerate(parts) if _has_magic(part))
+    selector = fs.FileSelector(
+        "/".join(parts[:num_fixed]) or "/", recursive=num_fixed < len(parts) - 1, allow_not_found=True
+    )
+    return sorted(
+        prefix + info.path
+        for info in filesystem.get_file_info(selector)
+        if info.type == fs.FileType.File
+        and len(info.path.split("/")) == len(parts)
+        and all(fnmatch.fnmatchcase(a, b) for a, b in zip(info.path.split("/"), parts))
+    )
+
+
+def list_splits(uris: Union[str, Sequence[str]], split_size: int) -> List[Tuple[str, int, int]]:
+    """
+    Cut files into byte ranges, e.g. to distribute them over readers which read them with
+    read_line_blocks.
+    :param uris: URIs or glob patterns of the files.
+    :param split_size: Size of the byte ranges.
+    :return: (uri, start, end) of byte ranges of split_size which cover the files, in file order.
+    """
+    if isinstance(uris, str):
+        uris = [uris]
+    files = sorted(set(itertools.chain.from_iterable(glob(uri) for uri in uris)))
+    return [
+        (uri, start, min(start + split_size, size))
+        for uri, size in ((uri, file_info(uri).size) for uri in files)
+        for start in range(0, size, split_size)
+    ]
+
+
+def get_filesystem(uri: str) -> Tuple[fs.FileSystem, str]:
+    """
+    Resolve a URI, or a local path, into a pyarrow filesystem and the path on that filesystem.
+    """
+    return _parse_uri(uri)
+
+
 def _parse_uri(uri: str) -> Tuple[fs.FileSystem, str]:
+    if not urlparse(uri).scheme:
+        # local paths are used verbatim, they may contain "%", "?" or "#"
+        with _filesystem_cache_lock:
+            filesystem, _ = _filesystem_cache.setdefault(("", "", ""), (fs.LocalFileSystem(), False))
+        return filesystem, str(Path(uri).expanduser().absolute())
+
     parsed = urlparse(uri)
-    uri = uri if parsed.scheme else str(Path(parsed.path).expanduser().absolute())
-    filesystem, path = fs.FileSystem.from_uri(uri)
-    return filesystem, path
+    key = (parsed.scheme, parsed.netloc, parsed.query)
+    path = unquote(parsed.path)
+    with _filesystem_cache_lock:
+        cached = _filesystem_cache.get(key)
+    if cached is not None:
+        filesystem, authority_in_path = cached
+        return filesystem, f"{parsed.netloc}{path}" if authority_in_path else path
+
+    filesystem, fs_path = fs.FileSystem.from_uri(uri)
+    # only cache filesystems of URIs whose path can be derived without pyarrow
+    if fs_path in (path, f"{parsed.netloc}{path}"):
+        with _filesystem_cache_lock:
+            _filesystem_cache.setdefault(key, (filesystem, fs_path != path))
+    return filesystem, fs_path
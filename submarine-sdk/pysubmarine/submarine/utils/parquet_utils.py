@@ -0,0 +1,89 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Reading Parquet training data by row groups, shared by the input functions of all frameworks.
+"""
+
+import itertools
+from typing import Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from submarine.exceptions import SubmarineException
+from submarine.utils.fileio import get_filesystem, glob
+
+_PARQUET_FORMAT = ds.ParquetFileFormat()
+
+
+def list_row_groups(uris: Union[str, Sequence[str]]) -> List[Tuple[str, int]]:
+    """
+    :param uris: URIs or glob patterns of Parquet files.
+    :return: (uri, row group index) of every row group of the files, in file order.
+    """
+    if isinstance(uris, str):
+        uris = [uris]
+    row_groups = []
+    for uri in sorted(set(itertools.chain.from_iterable(glob(uri) for uri in uris))):
+        filesystem, path = get_filesystem(uri)
+        fragment = _PARQUET_FORMAT.make_fragment(path, filesystem)
+        row_groups.extend((uri, i) for i in range(fragment.num_row_groups))
+    return row_groups
+
+
+def read_row_groups(
+    row_groups: Sequence[Tuple[str, int]], columns: List[str], batch_size: int, use_threads: bool = True
+) -> Iterator[pa.RecordBatch]:
+    """
+    Scan row groups with the multi-threaded dataset scanner of pyarrow, reading only the given
+    columns. Batches do not span row groups, so the last batch of a row group may be smaller.
+    :param row_groups: (uri, row group index) pairs from list_row_groups.
+    :param columns: Names of the columns to read.
+    :param batch_size: Maximum number of rows of a batch.
+    :param use_threads: Whether row groups are read and decoded concurrently.
+    """
+    fragments = []
+    for uri, group in itertools.groupby(row_groups, key=lambda row_group: row_group[0]):
+        filesystem, path = get_filesystem(uri)
+        fragments.append(_PARQUET_FORMAT.make_fragment(path, filesystem, row_groups=[i for _, i in group]))
+    if not fragments:
+        return
+    dataset = ds.FileSystemDataset(
+        fragments,
+        schema=fragments[0].physical_schema,
+        format=_PARQUET_FORMAT,
+        filesystem=fragments[0].filesystem,
+    )
+    yield from dataset.to_batches(columns=columns, batch_size=batch_size, use_threads=use_threads)
+
+
+def list_to_numpy(array: pa.Array) -> np.ndarray:
+    """
+    View a list array, whose lists all have the same length and no nulls, as a 2-D array
+    without copying its values.
+    """
+    if pa.types.is_fixed_size_list(array.type):
+        width = array.type.list_size
+    elif pa.types.is_list(array.type) or pa.types.is_large_list(array.type):
+        lengths = np.diff(array.offsets.to_numpy())
+        if len(lengths) and lengths.min() != lengths.max():
+            raise SubmarineException("All lists of a Parquet feature column must have the same length")
+        width = int(lengths[0]) if len(lengths) else 0
+    else:
+        raise SubmarineException(f"Expected a list column, got {array.type}")
+    if array.null_count:
+        raise SubmarineException("Parquet feature columns must not contain nulls")
+    return array.flatten().to_numpy(zero_copy_only=True).reshape(len(array), width)
@@ -13,7 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Iterable, Iterator, TypeVar
+
 import torch
+from torch import distributed
+
+T = TypeVar("T")
 
 
 def get_device(params):
@@ -21,3 +26,27 @@ def get_device(params):
         return torch.device("cuda:0")
     else:
         return torch.device("cpu")
+
+
+def iter_in_lockstep(batches: Iterable[T]) -> Iterator[T]:
+    """
+    Iterate batches until the batches of any rank run out. Every rank of DistributedDataParallel
+    must run the same number of training steps, or the ranks with more batches wait forever for
+    the others, so before every step the ranks all-reduce whether they still have a batch.
+    Without a process group of several ranks, all batches are yielded.
+    """
+    if not (distributed.is_available() and distributed.is_initialized()) or distributed.get_world_size() == 1:
+        yield from batches
+        return
+    if distributed.get_backend() == distributed.Backend.NCCL:
+        device = torch.device("cuda", torch.cuda.current_device())
+    else:
+        device = torch.device("cpu")
+    iterator = iter(batches)
+    while True:
+        batch = next(iterator, None)
+        has_batch = torch.tensor([batch is not None], dtype=torch.int32, device=device)
+        distributed.all_reduce(has_batch, op=distributed.ReduceOp.MIN)
+        if not has_batch.item():
+            return
+        yield batch
@@ -0,0 +1,158 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Raw Criteo-style training data: tab-separated lines of a label, dense integer columns and
+categorical columns, turned into feature indices and values by vectorized feature hashing.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv
+
+from submarine.exceptions import SubmarineException
+
+LOG = "log"
+BUCKET = "bucket"
+
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def hash_strings(array: pa.Array, seed: int) -> np.ndarray:
+    """
+    64-bit FNV-1a hashes of the UTF-8 bytes of a string array, computed for all strings at once
+    with one vectorized step per character position. Nulls hash like empty strings.
+    :param array: String array.
+    :param seed: Seed which is hashed before the strings, e.g. the index of their column.
+    """
+    if pa.types.is_large_string(array.type):
+        offset_type = np.int64
+    elif pa.types.is_string(array.type):
+        offset_type = np.int32
+    else:
+        raise SubmarineException(f"Expected a string column, got {array.type}")
+    _, offsets_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=offset_type)[array.offset : array.offset + len(array) + 1]
+    data = np.frombuffer(data_buffer, dtype=np.uint8) if data_buffer is not None else np.zeros(0, np.uint8)
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    prime = np.uint64(_FNV_PRIME)
+    hashes = np.full(len(array), ((_FNV_OFFSET ^ seed) * _FNV_PRIME) & _UINT64_MASK, dtype=np.uint64)
+    for pos in range(int(lengths.max()) if len(array) else 0):
+        rows = np.flatnonzero(lengths > pos)
+        hashes[rows] = (hashes[rows] ^ data[starts[rows] + pos]) * prime
+    return hashes
+
+
+def hash_integers(values: np.ndarray, seed: int) -> np.ndarray:
+    """
+    64-bit splitmix64 hashes of integers, mixed with a seed, e.g. the index of their column.
+    """
+    z = values.astype(np.int64).view(np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class FeatureHasher:
+    """
+    Turn lines of "label <tab> dense columns <tab> categorical columns" into one feature per
+    column. The feature indices 0 to num_dense - 1 are the dense columns in "log" mode, every
+    other feature index is a hash modulo the remaining indices of num_features:
+    - a dense column x has the feature value log(1 + max(x, 0)) in "log" mode, or the feature
+      value 1 and the hash of its bucket in "bucket" mode, where x > 2 falls into the bucket
+      floor(log(x) ** 2) and any other x into the bucket x;
+    - a categorical column has the feature value 1 and the hash of its string.
+    Missing values hash into a bucket of their own for each column.
+    """
+
+    def __init__(
+        self, num_features: int, num_dense: int = 13, num_categorical: int = 26, dense_transform: str = LOG
+    ):
+        """
+        :param num_features: Number of feature indices, i.e. the size of the embedding tables.
+        :param num_dense: Number of dense integer columns.
+        :param num_categorical: Number of categorical columns.
+        :param dense_transform: "log" or "bucket".
+        """
+        if dense_transform not in (LOG, BUCKET):
+            raise SubmarineException(
+                f"Unsupported dense transform {dense_transform}, expected one of {[LOG, BUCKET]}"
+            )
+        self.hashed_offset = num_dense if dense_transform == LOG else 0
+        if num_features <= self.hashed_offset:
+            raise SubmarineException(f"num_features must be larger than {self.hashed_offset}")
+        self.num_features = num_features
+        self.num_dense = num_dense
+        self.num_categorical = num_categorical
+        self.dense_transform = dense_transform
+        dense_columns = [f"I{i}" for i in range(1, num_dense + 1)]
+        categorical_columns = [f"C{i}" for i in range(1, num_categorical + 1)]
+        self._read_options = csv.ReadOptions(column_names=["label"] + dense_columns + categorical_columns)
+        self._parse_options = csv.ParseOptions(delimiter="\t", quote_char=False)
+        column_types = {"label": pa.int64()}
+        column_types.update({column: pa.int64() for column in dense_columns})
+        column_types.update({column: pa.string() for column in categorical_columns})
+        self._convert_options = csv.ConvertOptions(
+            column_types=column_types, strings_can_be_null=True, quoted_strings_can_be_null=True
+        )
+
+    @property
+    def num_fields(self) -> int:
+        return self.num_dense + self.num_categorical
+
+    def _bucket_index(self, hashes: np.ndarray) -> np.ndarray:
+        num_buckets = np.uint64(self.num_features - self.hashed_offset)
+        return (hashes % num_buckets).astype(np.int64) + self.hashed_offset
+
+    def parse(self, block: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Parse a block of lines with the multi-threaded CSV reader of pyarrow and hash them.
+        :param block: Contiguous newline separated lines.
+        :return: feature_idx (int64) and feature_value (float32) of shape
+                 (num_lines, num_fields), and label (int64) of shape (num_lines,).
+        """
+        table = csv.read_csv(
+            pa.BufferReader(block),
+            read_options=self._read_options,
+            parse_options=self._parse_options,
+            convert_options=self._convert_options,
+        )
+        num_rows = table.num_rows
+        feature_idx = np.empty((num_rows, self.num_fields), dtype=np.int64)
+        feature_value = np.ones((num_rows, self.num_fields), dtype=np.float32)
+        for i in range(self.num_dense):
+            column = table.column(1 + i).combine_chunks()
+            values = column.to_numpy(zero_copy_only=False)
+            missing = column.is_null().to_numpy(zero_copy_only=False)
+            if self.dense_transform == LOG:
+                feature_idx[:, i] = i
+                feature_value[:, i] = np.where(missing, 0, np.log1p(np.maximum(np.nan_to_num(values), 0)))
+            else:
+                values = np.nan_to_num(values).astype(np.int64)
+                with np.errstate(divide="ignore"):
+                    buckets = np.where(values > 2, np.floor(np.log(np.maximum(values, 1)) ** 2), values)
+                # missing values get a bucket below every value
+                buckets = np.where(missing, np.iinfo(np.int64).min, buckets).astype(np.int64)
+                feature_idx[:, i] = self._bucket_index(hash_integers(buckets, seed=i))
+        for i in range(self.num_categorical):
+            column = table.column(1 + self.num_dense + i).combine_chunks()
+            feature_idx[:, self.num_dense + i] = self._bucket_index(
+                hash_strings(column, seed=self.num_dense + i)
+            )
+        label = table.column(0).to_numpy()
+        return feature_idx, feature_value, label.astype(np.int64, copy=False)
@@ -0,0 +1,99 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from submarine.artifacts import ArtifactCache
+from submarine.exceptions import SubmarineException
+
+
+def _write(size: int):
+    def populate(local_dir):
+        pathlib.Path(local_dir, "model.pt").write_bytes(b"x" * size)
+
+    return populate
+
+
+def test_get(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    populate = mock.Mock(side_effect=_write(10))
+    model_dir = cache.get("model_id_1", populate)
+    assert model_dir == str(tmp_path / "model_id_1")
+    assert cache.get("model_id_1", populate) == model_dir
+    assert populate.call_count == 1
+    assert (pathlib.Path(model_dir) / "model.pt").read_bytes() == b"x" * 10
+
+
+def test_get_failed_populate(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        cache.get("model_id_1", mock.Mock(side_effect=RuntimeError("connection reset")))
+    assert sorted(os.listdir(tmp_path)) == [".locks"]
+    with pytest.raises(ValueError):
+        cache.get("../model_id_1", _write(10))
+
+
+def test_get_concurrently(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    populate = mock.Mock(side_effect=_write(10))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        model_dirs = set(executor.map(lambda _: cache.get("model_id_1", populate), range(16)))
+    assert model_dirs == {str(tmp_path / "model_id_1")}
+    assert populate.call_count == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=25)
+    cache.get("model_id_1", _write(10))
+    cache.get("model_id_2", _write(10))
+    os.utime(tmp_path / "model_id_1", (0, 0))
+    os.utime(tmp_path / "model_id_2", (1, 1))
+    # a hit makes model_id_1 the most recently used entry
+    cache.get("model_id_1", _write(10))
+    cache.get("model_id_3", _write(10))
+    assert sorted(p for p in os.listdir(tmp_path) if not p.startswith(".")) == ["model_id_1", "model_id_3"]
+
+
+def test_open_keeps_entry(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=15)
+    with cache.open("model_id_1", _write(10)) as model_dir:
+        os.utime(model_dir, (0, 0))
+        # the least recently used entry is in use, so it is not evicted
+        cache.get("model_id_2", _write(10))
+        assert (pathlib.Path(model_dir) / "model.pt").exists()
+    cache.get("model_id_3", _write(10))
+    assert sorted(p for p in os.listdir(tmp_path) if not p.startswith(".")) == ["model_id_3"]
+
+
+def test_evict_stale_tmp_dirs(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    # left behind by a process which crashed while populating model_id_1
+    (tmp_path / ".tmp-model_id_1@abc123").mkdir()
+    (tmp_path / ".tmp-model_id_1@abc123" / "model.pt").write_bytes(b"x")
+    cache.get("model_id_2", _write(10))
+    assert sorted(os.listdir(tmp_path)) == [".locks", "model_id_2"]
+
+
+def test_no_file_locks(tmp_path):
+    with mock.patch("submarine.artifacts.cache.fcntl", None):
+        with pytest.raises(SubmarineException, match="fcntl"):
+            ArtifactCache(str(tmp_path))
@@ -0,0 +1,73 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from submarine.artifacts import FileSystemRepository
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return FileSystemRepository(f"file://{tmp_path / 'artifacts'}")
+
+
+def test_log_artifacts(repo, tmp_path):
+    local_dir = tmp_path / "model"
+    (local_dir / "variables").mkdir(parents=True)
+    (local_dir / "saved_model.pb").write_bytes(b"graph")
+    (local_dir / "variables" / "variables.index").write_bytes(b"index")
+
+    uri = repo.log_artifacts("experiment/1", str(local_dir))
+    assert uri == f"file://{tmp_path / 'artifacts'}/experiment/1"
+    repo.log_artifact("experiment/2", str(local_dir / "saved_model.pb"))
+    repo.log_artifact_fileobj("experiment/2/description.json", io.BytesIO(b"{}"))
+    assert repo.list_artifact_subfolder("experiment") == [
+        {"Prefix": "experiment/1/"},
+        {"Prefix": "experiment/2/"},
+    ]
+    assert repo.list_artifact_subfolder("missing") == []
+
+    repo.copy_folder("experiment/1", "registry/model-1")
+    download_dir = tmp_path / "download"
+    repo.download_artifacts("registry/model-1", str(download_dir))
+    assert (download_dir / "saved_model.pb").read_bytes() == b"graph"
+    assert (download_dir / "variables" / "variables.index").read_bytes() == b"index"
+    assert (tmp_path / "artifacts" / "experiment" / "2" / "description.json").read_bytes() == b"{}"
+
+
+def test_delete_folder(repo, tmp_path):
+    for path in ("registry/model-1-a/model.pt", "registry/model-2-b/model.pt", "registry/other/model.pt"):
+        repo.log_artifact_fileobj(path, io.BytesIO(b"model"))
+    repo.delete_folder("registry/model")
+    assert repo.list_artifact_subfolder("registry") == [{"Prefix": "registry/other/"}]
+
+
+def test_allocate_folder(repo):
+    repo.log_artifact_fileobj("experiment/2/model.pt", io.BytesIO(b"model"))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        folders = list(executor.map(lambda _: repo.allocate_folder("experiment"), range(8)))
+    assert len(set(folders)) == 8
+    assert all(int(folder.split("/")[1]) > 2 for folder in folders)
+    assert sum(len(repo._list_dir(f"experiment/.claims/{f.split('/')[1]}")) for f in folders) == 8
+
+    for folder in folders:
+        repo.log_artifact_fileobj(f"{folder}/model.pt", io.BytesIO(b"model"))
+        repo.release_folder(folder)
+    assert repo.list_artifact_subfolder("experiment/.claims") == []
@@ -15,13 +15,20 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import os
 import pathlib
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 import boto3
+import pytest
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
 from moto import mock_s3
 
 from submarine.artifacts import Repository
+from submarine.artifacts.repository import MB
 
 
 @mock_s3
@@ -94,3 +101,174 @@ def test_delete_folder():
 
     common_prefixes = repo.list_artifact_subfolder("folder01")
     assert common_prefixes == [{"Prefix": "folder01/subfolder02/"}]
+
+
+@mock_s3
+def test_log_artifacts_concurrently(tmp_path):
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+
+    for i in range(20):
+        (tmp_path / f"shard-{i:02d}").write_bytes(os.urandom(1024 * (i + 1)))
+    # a file which is uploaded in multiple parts
+    (tmp_path / "variables.data").write_bytes(os.urandom(6 * 1024 * 1024))
+
+    repo = Repository(
+        transfer_config=TransferConfig(multipart_threshold=5 * MB, multipart_chunksize=5 * MB),
+        max_workers=4,
+    )
+    repo.log_artifacts(dest_path="model", local_dir=str(tmp_path))
+
+    objects = {obj.key: obj.size for obj in s3.Bucket("submarine").objects.filter(Prefix="model/")}
+    assert objects == {f"model/{f.name}": f.stat().st_size for f in tmp_path.iterdir()}
+
+
+@mock_s3
+def test_log_artifacts_retry(tmp_path):
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    (tmp_path / "text.txt").write_text("test")
+
+    repo = Repository(max_attempts=2)
+    with mock.patch.object(
+        repo.client, "upload_file", side_effect=[S3UploadFailedError("broken pipe"), None]
+    ) as mock_upload_file, mock.patch("time.sleep"):
+        repo.log_artifacts(dest_path="data", local_dir=str(tmp_path))
+    assert mock_upload_file.call_count == 2
+
+    with mock.patch.object(
+        repo.client, "upload_file", side_effect=S3UploadFailedError("broken pipe")
+    ), mock.patch("time.sleep"), pytest.raises(S3UploadFailedError):
+        repo.log_artifacts(dest_path="data", local_dir=str(tmp_path))
+
+
+@mock_s3
+def test_copy_folder():
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    s3.Object("submarine", "experiment/1/model.pt").put(Body=b"model")
+    s3.Object("submarine", "experiment/1/variables/variables.index").put(Body=b"index")
+    s3.Object("submarine", "experiment/10/model.pt").put(Body=b"other model")
+
+    repo = Repository()
+    assert repo.copy_folder("experiment/1", "registry/model-1") == "s3://submarine/registry/model-1"
+
+    objects = {
+        obj.key: obj.get()["Body"].read() for obj in s3.Bucket("submarine").objects.filter(Prefix="registry/")
+    }
+    assert objects == {
+        "registry/model-1/model.pt": b"model",
+        "registry/model-1/variables/variables.index": b"index",
+    }
+
+
+@mock_s3
+def test_log_artifacts_content_addressed(tmp_path):
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    model_dir = tmp_path / "model"
+    (model_dir / "variables").mkdir(parents=True)
+    (model_dir / "model.pt").write_bytes(b"weights")
+    (model_dir / "variables" / "variables.index").write_bytes(b"index")
+
+    repo = Repository(content_addressed=True)
+    repo.log_artifacts(dest_path="experiment/1", local_dir=str(model_dir))
+    # a second version only changes one file
+    (model_dir / "model.pt").write_bytes(b"new weights")
+    with mock.patch.object(repo.client, "upload_file", wraps=repo.client.upload_file) as mock_upload_file:
+        repo.log_artifacts(dest_path="experiment/2", local_dir=str(model_dir))
+    assert mock_upload_file.call_count == 1
+
+    keys = sorted(obj.key for obj in s3.Bucket("submarine").objects.all())
+    assert len([key for key in keys if key.startswith("blobs/")]) == 3
+    assert [key for key in keys if not key.startswith("blobs/")] == [
+        "experiment/1/artifact-manifest.json",
+        "experiment/2/artifact-manifest.json",
+    ]
+
+    local_dir = repo.download_artifacts("experiment/1", str(tmp_path / "download"))
+    assert (pathlib.Path(local_dir) / "model.pt").read_bytes() == b"weights"
+    assert (pathlib.Path(local_dir) / "variables" / "variables.index").read_bytes() == b"index"
+
+
+@mock_s3
+def test_download_artifacts(tmp_path):
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    s3.Object("submarine", "experiment/1/model.pt").put(Body=b"model")
+    s3.Object("submarine", "experiment/1/variables/variables.index").put(Body=b"index")
+    s3.Object("submarine", "experiment/10/model.pt").put(Body=b"other model")
+
+    repo = Repository()
+    local_dir = pathlib.Path(repo.download_artifacts("experiment/1", str(tmp_path)))
+    assert sorted(str(p.relative_to(local_dir)) for p in local_dir.rglob("*") if p.is_file()) == [
+        "model.pt",
+        os.path.join("variables", "variables.index"),
+    ]
+    assert (local_dir / "model.pt").read_bytes() == b"model"
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+@mock_s3
+def test_log_artifacts_bundle(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    model_dir = tmp_path / "model"
+    (model_dir / "variables").mkdir(parents=True)
+    (model_dir / "saved_model.pb").write_bytes(b"graph")
+    (model_dir / "variables" / "variables.data-00000-of-00001").write_bytes(os.urandom(MB))
+    (model_dir / "description.json").write_text('{"model_type": "tensorflow"}')
+
+    repo = Repository(bundle_compression=compression)
+    repo.log_artifacts(dest_path="experiment/1", local_dir=str(model_dir))
+
+    bundle_file = {"gzip": "artifacts.tar.gz", "zstd": "artifacts.tar.zst"}[compression]
+    keys = sorted(obj.key for obj in s3.Bucket("submarine").objects.all())
+    assert keys == ["experiment/1/" + bundle_file, "experiment/1/description.json"]
+
+    local_dir = pathlib.Path(repo.download_artifacts("experiment/1", str(tmp_path / "download")))
+    for f in model_dir.rglob("*"):
+        if f.is_file():
+            assert (local_dir / f.relative_to(model_dir)).read_bytes() == f.read_bytes()
+
+
+@mock_s3
+def test_delete_large_folder():
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    for i in range(1100):
+        s3.meta.client.put_object(Bucket="submarine", Key=f"experiment/1/shard-{i:04d}", Body=b"")
+        s3.meta.client.put_object(Bucket="submarine", Key=f"experiment/2/{i:04d}/model.pt", Body=b"")
+    s3.meta.client.put_object(Bucket="submarine", Key="experiment/10/model.pt", Body=b"")
+
+    repo = Repository()
+    assert len(repo.list_artifact_subfolder("experiment/2")) == 1100
+    repo.delete_folder("experiment/1/")
+    repo.delete_folder("experiment/2/")
+
+    assert [obj.key for obj in s3.Bucket("submarine").objects.all()] == ["experiment/10/model.pt"]
+    assert repo.list_artifact_subfolder("experiment/1") == []
+
+
+@mock_s3
+def test_allocate_folder():
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    s3.Object("submarine", "experiment/1/model.pt").put(Body=b"model")
+    s3.Object("submarine", "experiment/3/model.pt").put(Body=b"model")
+
+    repo = Repository()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        folders = list(executor.map(lambda _: repo.allocate_folder("experiment"), range(8)))
+    assert len(set(folders)) == 8
+    assert all(int(folder.split("/")[1]) > 3 for folder in folders)
+    # only the markers of the claims which won are left, until the folders hold data
+    assert len(list(s3.Bucket("submarine").objects.filter(Prefix="experiment/.claims/"))) == 8
+
+    for folder in folders:
+        s3.Object("submarine", f"{folder}/model.pt").put(Body=b"model")
+        repo.release_folder(folder)
+    assert list(s3.Bucket("submarine").objects.filter(Prefix="experiment/.claims/")) == []
+    assert int(repo.allocate_folder("experiment").split("/")[1]) > max(int(f.split("/")[1]) for f in folders)
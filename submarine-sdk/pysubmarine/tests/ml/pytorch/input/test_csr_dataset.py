@@ -0,0 +1,88 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+from unittest import mock
+
+import numpy as np
+import pytest
+import torch
+from torch.utils.data.dataloader import default_collate
+
+from submarine.ml.pytorch.input import csr_dataset
+from submarine.ml.pytorch.input.csr_dataset import LIBSVMCSRDataset
+from submarine.ml.pytorch.input.libsvm_dataset import LIBSVMDataset
+
+LIBSVM_DATA = b"""0 0:1 1:0.5 2:3
+1 0:2 1:1.5
+0 0:3 1:2.5 2:5
+1 0:4 1:3.5 2:6
+0 0:5 1:4.5 2:7"""
+
+
+def test_convert_libsvm_to_csr(tmp_path):
+    (tmp_path / "libsvm.txt").write_bytes(LIBSVM_DATA)
+    # blocks end inside lines
+    with mock.patch.object(csr_dataset, "CONVERT_BLOCK_SIZE", 10):
+        csr_dataset.convert_libsvm_to_csr(str(tmp_path / "libsvm.txt"), str(tmp_path))
+
+    assert np.load(tmp_path / "indptr.npy").tolist() == [0, 3, 5, 8, 11, 14]
+    assert np.load(tmp_path / "indices.npy").dtype == np.int32
+    assert np.load(tmp_path / "values.npy")[3:8].tolist() == [2, 1.5, 3, 2.5, 5]
+    assert np.load(tmp_path / "labels.npy").tolist() == [0, 1, 0, 1, 0]
+
+    # the arrays are written block by block, the parsed blocks are not kept
+    (tmp_path / "libsvm.txt").write_bytes(LIBSVM_DATA + b"\n")
+    with mock.patch.object(csr_dataset, "CONVERT_BLOCK_SIZE", 10), mock.patch.object(
+        LIBSVMDataset, "parse_csr", wraps=LIBSVMDataset.parse_csr
+    ) as parse_csr:
+        csr_dataset.convert_libsvm_to_csr(str(tmp_path / "libsvm.txt"), str(tmp_path))
+    assert max(len(call.args[0]) for call in parse_csr.call_args_list) < 2 * len(LIBSVM_DATA.splitlines()[0])
+    assert np.load(tmp_path / "indptr.npy").tolist() == [0, 3, 5, 8, 11, 14]
+
+    (tmp_path / "empty.txt").write_bytes(b"")
+    csr_dataset.convert_libsvm_to_csr(str(tmp_path / "empty.txt"), str(tmp_path))
+    assert np.load(tmp_path / "indptr.npy").tolist() == [0]
+    assert np.load(tmp_path / "indices.npy").shape == (0,)
+
+
+def test_csr_dataset(tmp_path):
+    (tmp_path / "libsvm.txt").write_bytes(LIBSVM_DATA)
+    data_uri, cache_dir = str(tmp_path / "libsvm.txt"), str(tmp_path / "cache")
+    dataset = LIBSVMCSRDataset.prepare_dataset(data_uri, cache_dir=cache_dir)
+    assert len(dataset) == 5
+
+    feature_idx, feature_value, label = dataset.__getitems__([4, 0, 3])
+    expected = default_collate(
+        [LIBSVMDataset.parse_sample(line) for line in np.array(LIBSVM_DATA.splitlines())[[4, 0, 3]]]
+    )
+    assert torch.equal(feature_idx, expected[0])
+    assert torch.equal(feature_value, expected[1])
+    assert torch.equal(label, expected[2])
+    assert dataset[1][1].tolist() == [2, 1.5]
+
+    restored = pickle.loads(pickle.dumps(dataset))
+    assert restored._arrays is None
+    assert restored[2][2] == 0
+
+    # later runs read the cache
+    with mock.patch.object(csr_dataset, "convert_libsvm_to_csr") as mock_convert:
+        LIBSVMCSRDataset.prepare_dataset(data_uri, cache_dir=cache_dir)
+    mock_convert.assert_not_called()
+
+
+def test_csr_input_fn_rejects_ragged(tmp_path):
+    with pytest.raises(ValueError, match="ragged"):
+        csr_dataset.libsvm_csr_input_fn(str(tmp_path / "data.libsvm"), ragged=True)
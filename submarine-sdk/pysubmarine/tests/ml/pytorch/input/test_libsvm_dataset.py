@@ -0,0 +1,148 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+from unittest import mock
+
+import numpy as np
+import pytest
+import torch
+from pyarrow import fs
+from torch.utils.data import DataLoader
+from torch.utils.data.dataloader import default_collate
+
+from submarine.exceptions import SubmarineException
+from submarine.ml.pytorch.input import libsvm_dataset
+from submarine.ml.pytorch.input.libsvm_dataset import LIBSVMDataset
+from submarine.utils import fileio
+
+LIBSVM_DATA = b"""0 0:1 1:0.5 2:3
+1 0:2 1:1.5 2:4
+0 0:3 1:2.5 2:5
+1 0:4 1:3.5 2:6
+0 0:5 1:4.5 2:7
+"""
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    data_file = tmp_path / "libsvm.txt"
+    data_file.write_bytes(LIBSVM_DATA)
+    return LIBSVMDataset.prepare_dataset(str(data_file), n_jobs=2, index_dir=str(tmp_path / "index"))
+
+
+def test_getitem(dataset):
+    assert len(dataset) == 5
+    feature_idx, feature_value, label = dataset[1]
+    assert feature_idx.tolist() == [0, 1, 2]
+    assert feature_value.tolist() == [2, 1.5, 4]
+    assert label == 1
+
+    feature_idx, feature_value, label = dataset.__getitems__([4, 0, 3])
+    assert feature_value.tolist() == [dataset[i][1].tolist() for i in (4, 0, 3)]
+    assert label.tolist() == [0, 0, 1]
+
+
+def test_pickle(dataset):
+    dataset[0]
+    assert dataset._infile is not None
+    restored = pickle.loads(pickle.dumps(dataset))
+    assert restored._infile is None
+    assert restored[2][0].tolist() == [0, 1, 2]
+
+
+def test_data_loader(dataset):
+    loader = DataLoader(dataset, batch_size=2, num_workers=2, collate_fn=LIBSVMDataset.collate_batch)
+    labels = torch.cat([label for _, _, label in loader])
+    assert labels.tolist() == [0, 1, 0, 1, 0]
+
+
+def test_parse_batch():
+    feature_idx, feature_value, label = LIBSVMDataset.parse_batch(LIBSVM_DATA)
+    expected = default_collate([LIBSVMDataset.parse_sample(line) for line in LIBSVM_DATA.splitlines()])
+    assert torch.equal(feature_idx, expected[0])
+    assert torch.equal(feature_value, expected[1])
+    assert torch.equal(label, expected[2])
+
+    with pytest.raises(SubmarineException):
+        LIBSVMDataset.parse_batch(b"0 0:1 1:2\n1 0:1\n")
+
+
+def test_ragged(tmp_path):
+    data = b"0 0:1 1:0.5 2:3\n1 3:2\n0 1:3 4:5\n"
+    (tmp_path / "libsvm.txt").write_bytes(data)
+    dataset = LIBSVMDataset.prepare_dataset(
+        str(tmp_path / "libsvm.txt"), n_jobs=1, index_dir=str(tmp_path / "index"), ragged=True
+    )
+    feature_idx, feature_value, offsets, label = dataset.__getitems__([0, 1, 2])
+    assert feature_idx.tolist() == [0, 1, 2, 3, 1, 4]
+    assert feature_value.dtype == torch.float32 and feature_value.tolist() == [1, 0.5, 3, 2, 3, 5]
+    assert offsets.tolist() == [0, 3, 4]
+    assert label.tolist() == [0, 1, 0]
+
+    # collated lists of samples are the same as parsed batches
+    collated = LIBSVMDataset.collate_ragged([dataset[i] for i in (0, 1, 2)])
+    assert all(torch.equal(a, b) for a, b in zip(collated, (feature_idx, feature_value, offsets, label)))
+    loader = DataLoader(dataset, batch_size=2, collate_fn=LIBSVMDataset.collate_ragged)
+    assert [batch[2].tolist() for batch in loader] == [[0, 3], [0]]
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_locate_sample_offsets(tmp_path, trailing_newline):
+    data = LIBSVM_DATA if trailing_newline else LIBSVM_DATA.rstrip(b"\n")
+    (tmp_path / "libsvm.txt").write_bytes(data)
+    expected = [0] + [i + 1 for i, c in enumerate(data[:-1]) if c == ord("\n")]
+
+    # chunk boundaries fall inside and right behind lines
+    with mock.patch.object(libsvm_dataset, "_INDEX_CHUNK_SIZE", 16):
+        offsets = LIBSVMDataset._locate_sample_offsets(str(tmp_path / "libsvm.txt"), n_jobs=3)
+        assert offsets.tolist() == expected
+
+        remote = fs.SubTreeFileSystem(str(tmp_path), fs.LocalFileSystem())
+        with mock.patch.object(fileio, "_parse_uri", return_value=(remote, "libsvm.txt")):
+            offsets = LIBSVMDataset._locate_sample_offsets("hdfs://namenode:8020/libsvm.txt", n_jobs=3)
+        assert offsets.tolist() == expected
+
+
+def test_persisted_index(tmp_path, dataset):
+    index_dir = tmp_path / "index"
+    assert len(list(index_dir.glob("*.offsets.npy"))) == 1
+
+    with mock.patch.object(LIBSVMDataset, "_locate_sample_offsets") as mock_locate:
+        warm = LIBSVMDataset.prepare_dataset(dataset.data_uri, index_dir=str(index_dir))
+    mock_locate.assert_not_called()
+    np.testing.assert_array_equal(warm.sample_offset, dataset.sample_offset)
+
+    # a modified file is indexed again
+    with open(dataset.data_uri, "ab") as f:
+        f.write(b"1 0:6 1:5.5 2:8\n")
+    os.utime(dataset.data_uri, ns=(0, 0))
+    modified = LIBSVMDataset.prepare_dataset(dataset.data_uri, index_dir=str(index_dir))
+    assert len(modified) == 6
+    assert len(list(index_dir.glob("*.offsets.npy"))) == 2
+
+
+def test_get_data_loader_kwargs():
+    assert libsvm_dataset.get_data_loader_kwargs(prefetch_factor=4, persistent_workers=True) == {
+        "num_workers": 0,
+        "pin_memory": False,
+    }
+    assert libsvm_dataset.get_data_loader_kwargs(2, True, 4, True) == {
+        "num_workers": 2,
+        "pin_memory": True,
+        "prefetch_factor": 4,
+        "persistent_workers": True,
+    }
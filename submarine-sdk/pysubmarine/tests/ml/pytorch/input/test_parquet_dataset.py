@@ -0,0 +1,84 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import torch
+from torch.utils.data import DataLoader
+
+from submarine.ml.pytorch.input.parquet_dataset import ParquetDataset, parquet_input_fn
+
+
+def _write_parquet(path, num_rows):
+    table = pa.table(
+        {
+            "feat_ids": pa.array([[i, i + 1] for i in range(num_rows)], type=pa.list_(pa.int32())),
+            "feat_vals": pa.array([[float(i), 1.0] for i in range(num_rows)], type=pa.list_(pa.float32())),
+            "label": [i % 2 for i in range(num_rows)],
+        }
+    )
+    pq.write_table(table, path, row_group_size=2)
+
+
+def test_parquet_dataset(tmp_path, monkeypatch):
+    _write_parquet(tmp_path / "data.parquet", 20)
+
+    dataset = ParquetDataset(str(tmp_path / "data.parquet"), batch_size=4)
+    batches = list(DataLoader(dataset, batch_size=None, num_workers=2))
+    feat_ids = torch.cat([batch[0] for batch in batches])
+    assert feat_ids.dtype == torch.int64 and feat_ids.shape == (20, 2)
+    assert sorted(feat_ids[:, 0].tolist()) == list(range(20))
+    assert all(batch[1].dtype == torch.float32 and batch[2].dtype == torch.int64 for batch in batches)
+
+    # the ranks read distinct row groups, in an order which changes with the epoch
+    monkeypatch.setenv("WORLD", "2")
+    epochs = []
+    for epoch in range(2):
+        sample_ids = []
+        for rank in range(2):
+            monkeypatch.setenv("RANK", str(rank))
+            dataset = ParquetDataset(str(tmp_path / "data.parquet"), batch_size=5, shuffle=True, seed=3)
+            dataset.set_epoch(epoch)
+            sample_ids.append([int(i) for batch in dataset for i in batch[0][:, 0]])
+        assert sorted(sample_ids[0] + sample_ids[1]) == list(range(20))
+        epochs.append(sample_ids)
+    assert epochs[0] != epochs[1]
+
+
+def test_parquet_dataset_ranks_read_every_row(tmp_path, monkeypatch):
+    # 11 row groups, which are dealt to the ranks unevenly
+    _write_parquet(tmp_path / "data.parquet", 22)
+    monkeypatch.setenv("WORLD", "2")
+    for num_workers in (0, 2):
+        rows = []
+        for rank in range(2):
+            monkeypatch.setenv("RANK", str(rank))
+            loader = parquet_input_fn(
+                str(tmp_path / "data.parquet"), batch_size=4, num_workers=num_workers, shuffle=False
+            )()
+            rows += [int(i) for batch in loader for i in batch[0][:, 0]]
+        assert sorted(rows) == list(range(22))
+
+
+def test_parquet_input_fn_no_shuffle(tmp_path):
+    _write_parquet(tmp_path / "data.parquet", 20)
+    loader = parquet_input_fn(str(tmp_path / "data.parquet"), batch_size=4, shuffle=False)()
+    assert torch.cat([batch[0][:, 0] for batch in loader]).tolist() == list(range(20))
+
+
+def test_parquet_input_fn_rejects_ragged(tmp_path):
+    with pytest.raises(ValueError, match="ragged"):
+        parquet_input_fn(str(tmp_path / "data.parquet"), ragged=True)
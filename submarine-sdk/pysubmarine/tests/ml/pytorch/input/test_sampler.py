@@ -0,0 +1,87 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+
+import numpy as np
+import pytest
+from torch import distributed
+
+from submarine.exceptions import SubmarineException
+from submarine.ml.pytorch.input.sampler import (
+    BLOCK_SHUFFLE,
+    DISTRIBUTED,
+    BlockShuffleSampler,
+    get_sampler,
+)
+
+
+def test_block_shuffle_sampler():
+    dataset = list(range(1001))
+    # samples of 10 bytes in blocks of 100 bytes
+    sample_offset = np.arange(len(dataset)) * 10
+    samplers = [
+        BlockShuffleSampler(
+            dataset, sample_offset=sample_offset, block_size=100, window_size=2, num_replicas=3, rank=rank
+        )
+        for rank in range(3)
+    ]
+    epoch0 = [list(sampler) for sampler in samplers]
+    assert [len(indices) for indices in epoch0] == [334, 334, 334]
+    # a permutation of the dataset, padded to divide evenly
+    assert sorted(set(sum(epoch0, []))) == dataset
+    # the first window of a rank holds the samples of two blocks
+    assert len({i // 10 for i in epoch0[0][:20]}) == 2
+    assert epoch0[0][:20] != sorted(epoch0[0][:20])
+
+    for sampler in samplers:
+        sampler.set_epoch(1)
+    assert [list(sampler) for sampler in samplers] != epoch0
+    for sampler in samplers:
+        sampler.set_epoch(0)
+    assert [list(sampler) for sampler in samplers] == epoch0
+
+
+def test_block_shuffle_sampler_without_offsets():
+    dataset = list(range(100))
+    sampler = BlockShuffleSampler(
+        dataset, block_samples=10, window_size=1, num_replicas=2, rank=1, drop_last=True, seed=7
+    )
+    indices = list(sampler)
+    assert len(indices) == 50
+    assert all(
+        sorted(indices[i : i + 10]) == list(range(indices[i] // 10 * 10, indices[i] // 10 * 10 + 10))
+        for i in range(0, 50, 10)
+    )
+
+    with pytest.raises(SubmarineException):
+        get_sampler("random", dataset)
+
+
+@pytest.fixture
+def process_group():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        init_method = f"tcp://127.0.0.1:{s.getsockname()[1]}"
+    distributed.init_process_group("gloo", init_method=init_method, world_size=1, rank=0)
+    yield
+    distributed.destroy_process_group()
+
+
+@pytest.mark.parametrize("name", [DISTRIBUTED, BLOCK_SHUFFLE])
+def test_get_sampler_without_shuffle(process_group, name):
+    dataset = list(range(100))
+    assert list(get_sampler(name, dataset, shuffle=False)) == dataset
+    assert sorted(get_sampler(name, dataset)) == dataset
@@ -0,0 +1,92 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+
+import pytest
+import torch
+from torch.utils.data import DataLoader
+
+from submarine.ml.pytorch.input.streaming_dataset import (
+    LIBSVMStreamingDataset,
+    _read_lines,
+)
+
+
+@pytest.fixture
+def data_files(tmp_path):
+    # 3 files of 20 samples whose feature values are their sample ids
+    for i in range(3):
+        lines = [f"{j % 2} 0:{j} 1:{j}" for j in range(i * 20, i * 20 + 20)]
+        (tmp_path / f"part-{i}.libsvm").write_text("\n".join(lines) + ("\n" if i else ""))
+    return tmp_path
+
+
+def _sample_ids(batches):
+    return [int(v) for _, feature_value, _ in batches for v in feature_value[:, 0].tolist()]
+
+
+@pytest.mark.parametrize("split_size", [1, 7, 8, 1000])
+def test_read_lines(data_files, split_size):
+    uri = str(data_files / "part-0.libsvm")
+    size = (data_files / "part-0.libsvm").stat().st_size
+    lines = list(
+        itertools.chain.from_iterable(
+            _read_lines(uri, start, min(start + split_size, size), block_size=5)
+            for start in range(0, size, split_size)
+        )
+    )
+    assert lines == (data_files / "part-0.libsvm").read_bytes().splitlines()
+
+
+def test_streaming_dataset(data_files, monkeypatch):
+    pattern = str(data_files / "part-*.libsvm")
+    dataset = LIBSVMStreamingDataset(pattern, batch_size=8, split_size=100)
+    assert _sample_ids(dataset) == list(range(60))
+
+    # the readers of all ranks read every sample once, though the ranges of the ranks have 41
+    # and 19 samples
+    monkeypatch.setenv("WORLD", "2")
+    for num_workers in (0, 2):
+        sample_ids = []
+        for rank in range(2):
+            monkeypatch.setenv("RANK", str(rank))
+            dataset = LIBSVMStreamingDataset(pattern, batch_size=8, split_size=150)
+            sample_ids += _sample_ids(DataLoader(dataset, batch_size=None, num_workers=num_workers))
+        assert sorted(sample_ids) == list(range(60))
+
+
+def test_streaming_dataset_shuffle(data_files):
+    dataset = LIBSVMStreamingDataset(
+        str(data_files / "part-*.libsvm"), batch_size=8, shuffle_buffer_size=16, seed=42, split_size=100
+    )
+    epoch0 = _sample_ids(dataset)
+    epoch1 = _sample_ids(dataset)
+    assert sorted(epoch0) == sorted(epoch1) == list(range(60))
+    assert epoch0 != epoch1
+    dataset.set_epoch(0)
+    assert _sample_ids(dataset) == epoch0
+
+
+def test_streaming_data_loader(data_files):
+    dataset = LIBSVMStreamingDataset(
+        [str(data_files / "part-0.libsvm"), str(data_files / "part-[12].libsvm")],
+        batch_size=8,
+        split_size=100,
+    )
+    loader = DataLoader(dataset, batch_size=None, num_workers=2)
+    batches = list(loader)
+    assert all(isinstance(label, torch.Tensor) for _, _, label in batches)
+    assert sorted(_sample_ids(batches)) == list(range(60))
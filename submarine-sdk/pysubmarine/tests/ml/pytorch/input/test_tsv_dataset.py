@@ -0,0 +1,109 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+from torch.utils.data import DataLoader
+
+from submarine.ml.pytorch.input.tsv_dataset import TSVDataset, tsv_input_fn
+
+
+def _write_tsv(path, num_samples):
+    lines = [f"{i % 2}\t{i}\tc{i}\n" for i in range(num_samples)]
+    path.write_text("".join(lines))
+
+
+def test_tsv_dataset(tmp_path, monkeypatch):
+    _write_tsv(tmp_path / "data.tsv", 50)
+
+    dataset = TSVDataset(
+        str(tmp_path / "data.tsv"),
+        batch_size=8,
+        num_features=1000,
+        num_dense=1,
+        num_categorical=1,
+        split_size=100,
+        block_size=32,
+    )
+    batches = list(DataLoader(dataset, batch_size=None, num_workers=2))
+    feature_value = torch.cat([batch[1] for batch in batches])
+    assert feature_value.shape == (50, 2) and batches[0][0].dtype == torch.int64
+    assert sorted(torch.expm1(feature_value[:, 0]).round().int().tolist()) == list(range(50))
+    # every worker fills its batches across blocks
+    assert sum(len(batch[2]) != 8 for batch in batches) <= 2
+
+    # the ranks read distinct ranges, in an order which changes with the epoch
+    monkeypatch.setenv("WORLD", "2")
+    epochs = []
+    for epoch in range(2):
+        samples = []
+        for rank in range(2):
+            monkeypatch.setenv("RANK", str(rank))
+            dataset = TSVDataset(
+                str(tmp_path / "data.tsv"),
+                batch_size=8,
+                num_features=1000,
+                num_dense=1,
+                num_categorical=1,
+                shuffle=True,
+                seed=3,
+                split_size=100,
+                block_size=32,
+            )
+            dataset.set_epoch(epoch)
+            samples.append([int(x) for batch in dataset for x in torch.expm1(batch[1][:, 0]).round()])
+        assert sorted(samples[0] + samples[1]) == list(range(50))
+        epochs.append(samples)
+    assert epochs[0] != epochs[1]
+
+
+def test_tsv_input_fn_ranks_read_every_sample(tmp_path, monkeypatch):
+    # the byte ranges of the ranks have different numbers of samples
+    _write_tsv(tmp_path / "data.tsv", 50)
+    monkeypatch.setenv("WORLD", "2")
+    for num_workers in (0, 2):
+        samples = []
+        for rank in range(2):
+            monkeypatch.setenv("RANK", str(rank))
+            loader = tsv_input_fn(
+                str(tmp_path / "data.tsv"),
+                batch_size=4,
+                num_workers=num_workers,
+                num_features=1000,
+                num_dense=1,
+                num_categorical=1,
+                shuffle=False,
+            )()
+            samples += [int(x) for batch in loader for x in torch.expm1(batch[1][:, 0]).round()]
+        assert sorted(samples) == list(range(50))
+
+
+def test_tsv_input_fn_no_shuffle(tmp_path):
+    _write_tsv(tmp_path / "data.tsv", 50)
+    loader = tsv_input_fn(
+        str(tmp_path / "data.tsv"),
+        batch_size=8,
+        num_features=1000,
+        num_dense=1,
+        num_categorical=1,
+        shuffle=False,
+    )()
+    feature_value = torch.cat([batch[1] for batch in loader])
+    assert torch.expm1(feature_value[:, 0]).round().int().tolist() == list(range(50))
+
+
+def test_tsv_input_fn_rejects_ragged(tmp_path):
+    with pytest.raises(ValueError, match="ragged"):
+        tsv_input_fn(str(tmp_path / "data.tsv"), num_features=1000, ragged=True)
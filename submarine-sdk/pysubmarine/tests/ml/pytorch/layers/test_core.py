@@ -0,0 +1,70 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from submarine.ml.pytorch.layers.core import (
+    FeatureBagEmbedding,
+    FeatureBagLinear,
+    FeatureEmbedding,
+    FeatureLinear,
+    FusedFeatureEmbedding,
+)
+
+
+def test_feature_bag_layers():
+    torch.manual_seed(0)
+    feature_idx = torch.tensor([[1, 4, 7], [2, 4, 9]])
+    feature_value = torch.rand(2, 3)
+    offsets = torch.tensor([0, 3])
+
+    linear, bag_linear = FeatureLinear(10, 2), FeatureBagLinear(10, 2)
+    bag_linear.weight.weight.data.copy_(linear.weight.weight.data)
+    torch.testing.assert_close(
+        bag_linear(feature_idx.flatten(), feature_value.flatten(), offsets),
+        linear(feature_idx, feature_value),
+    )
+
+    embedding, bag_embedding = FeatureEmbedding(10, 4), FeatureBagEmbedding(10, 4)
+    bag_embedding.weight.weight.data.copy_(embedding.weight.weight.data)
+    torch.testing.assert_close(
+        bag_embedding(feature_idx.flatten(), feature_value.flatten(), offsets),
+        embedding(feature_idx, feature_value).sum(dim=1),
+    )
+
+    # samples with different numbers of features need no padding
+    output = bag_linear(torch.tensor([1, 4, 7, 2]), torch.ones(4), torch.tensor([0, 3]))
+    torch.testing.assert_close(output[1], linear.weight.weight[2] + linear.bias)
+
+
+@pytest.mark.parametrize("dedup", [False, True])
+def test_fused_feature_embedding(dedup):
+    torch.manual_seed(0)
+    feature_idx = torch.tensor([[1, 4, 7], [1, 4, 9]])
+    feature_value = torch.rand(2, 3)
+    linear, embedding = FeatureLinear(10, 2), FeatureEmbedding(10, 4)
+    fused = FusedFeatureEmbedding(10, embedding_dim=4, out_features=2, sparse=True, dedup=dedup)
+    fused.weight.weight.data.copy_(torch.cat([embedding.weight.weight, linear.weight.weight], dim=1))
+
+    linear_output, embedding_output = fused(feature_idx, feature_value)
+    torch.testing.assert_close(linear_output, linear(feature_idx, feature_value))
+    torch.testing.assert_close(embedding_output, embedding(feature_idx, feature_value))
+
+    (linear_output.sum() + embedding_output.sum()).backward()
+    grad = fused.weight.weight.grad
+    assert grad.coalesce().indices()[0].tolist() == [1, 4, 7, 9]
+    # the features repeated in the batch have one gradient row each with deduplication
+    assert grad._nnz() == (4 if dedup else 6)
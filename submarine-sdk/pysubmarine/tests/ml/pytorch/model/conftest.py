@@ -30,7 +30,8 @@ LIBSVM_DATA = """0 0:0 1:0 2:0 3:0 4:0 5:0 6:0 7:0 8:0 9:0 10:0 11:0 12:0 13:0 1
 
 
 @pytest.fixture
-def get_model_param(tmp_path):
+def get_model_param(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUBMARINE_DATASET_INDEX_DIR", str(tmp_path / "index"))
     data_file = tmp_path / "libsvm.txt"
     save_model_dir = tmp_path / "experiment"
     save_model_dir.mkdir()
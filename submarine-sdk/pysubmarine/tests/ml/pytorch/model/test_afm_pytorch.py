@@ -23,3 +23,25 @@ def test_run_afm(get_model_param):
     trainer.fit()
     trainer.evaluate()
     trainer.predict()
+
+
+def test_run_afm_sparse(get_model_param):
+    param = get_model_param
+    param["model"]["kwargs"]["sparse"] = True
+    param["optimizer"]["sparse"] = {"name": "rowwise_adagrad", "kwargs": {"lr": 1e-2}}
+
+    trainer = AFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_afm_fused_embedding(get_model_param):
+    param = get_model_param
+    param["model"]["kwargs"].update({"fused_embedding": True, "dedup_features": True, "sparse": True})
+    param["optimizer"]["sparse"] = {"name": "sparse_adam", "kwargs": {"lr": 1e-3}}
+
+    trainer = AFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
@@ -13,6 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from submarine.ml.pytorch.input.libsvm_dataset import LIBSVMDataset
 from submarine.ml.pytorch.model.ctr import DeepFM
 
 
@@ -23,3 +28,129 @@ def test_run_deepfm(get_model_param):
     trainer.fit()
     trainer.evaluate()
     trainer.predict()
+
+
+def test_run_deepfm_csr(get_model_param):
+    param = get_model_param
+    param["input"]["type"] = "libsvm_csr"
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_deepfm_with_workers(get_model_param):
+    param = get_model_param
+    param["training"].update(
+        {"num_workers": 2, "pin_memory": False, "prefetch_factor": 2, "persistent_workers": True}
+    )
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_deepfm_streaming(get_model_param):
+    param = get_model_param
+    param["training"].update({"streaming": True, "shuffle_buffer_size": 4})
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_deepfm_block_shuffle(get_model_param):
+    param = get_model_param
+    param["training"]["sampler"] = "block_shuffle"
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_deepfm_parquet(get_model_param, tmp_path):
+    param = get_model_param
+    num_features, feat_ids, feat_vals, label = LIBSVMDataset.parse_csr(
+        open(param["input"]["train_data"], "rb").read()
+    )
+    table = pa.table(
+        {
+            "feat_ids": feat_ids.astype("int64").reshape(len(label), -1).tolist(),
+            "feat_vals": feat_vals.astype("float32").reshape(len(label), -1).tolist(),
+            "label": label.astype("int64"),
+        }
+    )
+    pq.write_table(table, tmp_path / "data.parquet", row_group_size=4)
+    param["input"].update(
+        {
+            "train_data": str(tmp_path / "data.parquet"),
+            "valid_data": str(tmp_path / "data.parquet"),
+            "test_data": str(tmp_path / "data.parquet"),
+            "type": "parquet",
+        }
+    )
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_deepfm_tsv(get_model_param, tmp_path):
+    param = get_model_param
+    _, _, feat_vals, label = LIBSVMDataset.parse_csr(open(param["input"]["train_data"], "rb").read())
+    # raw Criteo-style lines of 13 dense and 26 categorical columns, with missing values
+    with open(tmp_path / "data.tsv", "w") as writer:
+        for row, target in zip(
+            feat_vals.astype("int64").reshape(len(label), -1).tolist(), label.astype("int64").tolist()
+        ):
+            dense = [str(x) if x else "" for x in row[:13]]
+            categorical = [f"{x:08x}" if x else "" for x in row[13:]]
+            writer.write("\t".join([str(target)] + dense + categorical) + "\n")
+    param["input"].update(
+        {
+            "train_data": str(tmp_path / "data.tsv"),
+            "valid_data": str(tmp_path / "data.tsv"),
+            "test_data": str(tmp_path / "data.tsv"),
+            "type": "tsv",
+        }
+    )
+    param["model"]["kwargs"]["num_features"] = 1000
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_deepfm_sparse(get_model_param):
+    param = get_model_param
+    param["model"]["kwargs"]["sparse"] = True
+    param["optimizer"]["sparse"] = {"name": "sparse_adam", "kwargs": {"lr": 1e-3}}
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_run_deepfm_fused_embedding(get_model_param):
+    param = get_model_param
+    param["model"]["kwargs"].update({"fused_embedding": True, "dedup_features": True})
+
+    trainer = DeepFM(param)
+    trainer.fit()
+    trainer.evaluate()
+    trainer.predict()
+
+
+def test_deepfm_rejects_ragged(get_model_param):
+    param = get_model_param
+    param["training"]["ragged"] = True
+
+    with pytest.raises(AssertionError, match="ragged"):
+        DeepFM(param)
@@ -14,12 +14,20 @@
 # limitations under the License.
 
 import pytest
+import torch
+from torch import nn, optim
 
-from submarine.ml.pytorch.optimizer import get_optimizer
+from submarine.ml.pytorch.optimizer import (
+    RowWiseAdagrad,
+    SplitOptimizer,
+    create_optimizer,
+    get_optimizer,
+    split_parameters,
+)
 
 
 def test_get_optimizer():
-    optimizer_keys = ["adam", "adagrad", "sgd"]
+    optimizer_keys = ["adam", "adagrad", "sgd", "sparse_adam", "rowwise_adagrad"]
     invalid_optimizer_keys = ["adddam"]
 
     for key in optimizer_keys:
@@ -28,3 +36,46 @@ def test_get_optimizer():
     for key_invalid in invalid_optimizer_keys:
         with pytest.raises(ValueError, match="Invalid optimizer_key:"):
             get_optimizer(key_invalid)
+
+
+def _sparse_model():
+    torch.manual_seed(0)
+    return nn.Sequential(nn.Embedding(100, 4, sparse=True), nn.Linear(4, 1))
+
+
+def test_create_optimizer():
+    model = _sparse_model()
+    optimizer = create_optimizer(model, {"name": "sgd", "kwargs": {"lr": 0.1}})
+    assert isinstance(optimizer, optim.SGD)
+
+    optimizer = create_optimizer(
+        model,
+        {"name": "adam", "kwargs": {"lr": 0.1}, "sparse": {"name": "sparse_adam", "kwargs": {"lr": 0.1}}},
+    )
+    assert isinstance(optimizer, SplitOptimizer)
+    assert [type(o) for o in optimizer.optimizers] == [optim.Adam, optim.SparseAdam]
+    assert optimizer.optimizers[1].param_groups[0]["params"] == [model[0].weight]
+
+    before = model[0].weight.detach().clone()
+    model(torch.tensor([3, 7])).sum().backward()
+    optimizer.step()
+    optimizer.zero_grad()
+    changed = (model[0].weight != before).any(dim=1)
+    assert changed.nonzero().flatten().tolist() == [3, 7]
+
+    restored = create_optimizer(
+        _sparse_model(), {"name": "adam", "kwargs": {}, "sparse": {"name": "sparse_adam", "kwargs": {}}}
+    )
+    restored.load_state_dict(optimizer.state_dict())
+    assert restored.optimizers[1].state_dict()["state"].keys() == {0}
+
+
+def test_rowwise_adagrad():
+    model = _sparse_model()
+    optimizer = RowWiseAdagrad(split_parameters(model)[1], lr=0.5)
+    before = model[0].weight.detach().clone()
+    model(torch.tensor([3, 3, 9])).sum().backward()
+    optimizer.step()
+    assert optimizer.state[model[0].weight]["sum"].nonzero().flatten().tolist() == [3, 9]
+    changed = (model[0].weight != before).any(dim=1)
+    assert changed.nonzero().flatten().tolist() == [3, 9]
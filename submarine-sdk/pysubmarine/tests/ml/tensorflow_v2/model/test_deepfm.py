@@ -27,3 +27,37 @@ def test_run_deepfm(get_model_param):
     model.train()
     model.evaluate()
     model.predict()
+
+
+@pytest.mark.skipif(tf.__version__ < "2.0.0", reason="requires tf2")
+def test_run_deepfm_parquet(get_model_param, tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from submarine.ml.tensorflow_v2.model import DeepFM
+
+    params = get_model_param
+    label, *entries = open(params["input"]["train_data"]).readline().split()
+    table = pa.table(
+        {
+            "feat_ids": [[int(entry.split(":")[0]) for entry in entries]],
+            "feat_vals": pa.array(
+                [[float(entry.split(":")[1]) for entry in entries]], type=pa.list_(pa.float32())
+            ),
+            "label": pa.array([float(label)], type=pa.float32()),
+        }
+    )
+    pq.write_table(table, tmp_path / "data.parquet")
+    params["input"].update(
+        {
+            "train_data": str(tmp_path / "data.parquet"),
+            "valid_data": str(tmp_path / "data.parquet"),
+            "test_data": str(tmp_path / "data.parquet"),
+            "type": "parquet",
+        }
+    )
+
+    model = DeepFM(model_params=params)
+    model.train()
+    model.evaluate()
+    model.predict()
@@ -0,0 +1,105 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from submarine.entities.model_registry.model_stages import STAGE_PRODUCTION
+from submarine.exceptions import SubmarineException
+from submarine.utils import get_async_db_uri
+
+pytest.importorskip("aiosqlite")
+
+from submarine.store.model_registry.async_sqlalchemy_store import (  # noqa: E402
+    AsyncSqlAlchemyStore,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AsyncSqlAlchemyStore(f"sqlite:///{tmp_path / 'submarine.db'}")
+    yield store
+    asyncio.run(store.close())
+
+
+def test_get_async_db_uri():
+    assert (
+        get_async_db_uri("mysql+pymysql://u:p@localhost:3306/db") == "mysql+asyncmy://u:p@localhost:3306/db"
+    )
+    assert get_async_db_uri("sqlite:////tmp/submarine.db") == "sqlite+aiosqlite:////tmp/submarine.db"
+    assert get_async_db_uri("sqlite+aiosqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
+    with pytest.raises(SubmarineException):
+        get_async_db_uri("mssql://u:p@localhost/db")
+
+
+def test_registered_model(store):
+    async def run():
+        rm = await store.create_registered_model("test_RM", "description", ["tag1", "tag2"])
+        assert rm.name == "test_RM"
+        assert rm.tags == ["tag1", "tag2"]
+        with pytest.raises(SubmarineException):
+            await store.create_registered_model("test_RM")
+
+        await store.add_registered_model_tag("test_RM", "tag3")
+        await store.delete_registered_model_tag("test_RM", "tag1")
+        rmd = await store.get_registered_model("test_RM")
+        assert sorted(rmd.tags) == ["tag2", "tag3"]
+
+        rmd = await store.update_registered_model_description("test_RM", "new description")
+        assert rmd.description == "new description"
+        assert [m.name for m in await store.list_registered_model(filter_tags=["tag3"])] == ["test_RM"]
+
+        await store.delete_registered_model("test_RM")
+        with pytest.raises(SubmarineException):
+            await store.get_registered_model("test_RM")
+
+    asyncio.run(run())
+
+
+def test_model_version(store):
+    async def run():
+        await store.create_registered_model("test_MV")
+        mv1 = await store.create_model_version("test_MV", "model_id_0", "test", "application_1234", "pytorch")
+        mv2 = await store.create_model_version(
+            "test_MV", "model_id_1", "test", "application_1235", "pytorch", tags=["tag1"]
+        )
+        assert (mv1.version, mv2.version) == (1, 2)
+        assert mv2.tags == ["tag1"]
+
+        mv = await store.transition_model_version_stage("test_MV", 1, STAGE_PRODUCTION)
+        assert mv.current_stage == STAGE_PRODUCTION
+        await store.add_model_version_tag("test_MV", 1, "best")
+        mv = await store.get_model_version("test_MV", 1)
+        assert mv.tags == ["best"]
+        await store.delete_model_version_tag("test_MV", 1, "best")
+        assert (await store.get_model_version("test_MV", 1)).tags == []
+        assert (
+            await store.get_model_version_uri("test_MV", 2) == "s3://submarine/registry/model_id_1/test_MV/2"
+        )
+
+        await store.delete_model_version("test_MV", 1)
+        assert [m.version for m in await store.list_model_versions("test_MV")] == [2]
+
+    asyncio.run(run())
+
+
+def test_concurrent_requests(store):
+    async def run():
+        await asyncio.gather(*(store.create_registered_model(f"test_RM_{i}") for i in range(100)))
+        models = await asyncio.gather(*(store.get_registered_model(f"test_RM_{i}") for i in range(100)))
+        assert [m.name for m in models] == [f"test_RM_{i}" for i in range(100)]
+
+    asyncio.run(run())
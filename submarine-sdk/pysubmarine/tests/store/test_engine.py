@@ -0,0 +1,44 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from sqlalchemy.pool import StaticPool
+
+from submarine.store import DEFAULT_SUBMARINE_JDBC_URL
+from submarine.store.database.engine import create_engine
+
+
+def test_create_sqlite_file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'submarine.db'}")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+
+def test_create_sqlite_memory_engine():
+    engine = create_engine("sqlite://")
+    assert isinstance(engine.pool, StaticPool)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (id INTEGER)")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM t").scalar() == 0
+
+
+def test_create_mysql_engine():
+    with mock.patch("sqlalchemy.create_engine") as mock_create_engine:
+        create_engine(DEFAULT_SUBMARINE_JDBC_URL)
+    mock_create_engine.assert_called_once_with(DEFAULT_SUBMARINE_JDBC_URL, pool_pre_ping=True)
@@ -0,0 +1,56 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from submarine.entities import Metric, Param
+from submarine.store.database.models import SqlExperiment, SqlMetric, SqlParam
+
+pytest.importorskip("aiosqlite")
+
+from submarine.store.tracking.async_sqlalchemy_store import (  # noqa: E402
+    AsyncSqlAlchemyStore,
+)
+
+JOB_ID = "application_123456789"
+
+
+def test_log_metric_and_param(tmp_path):
+    store = AsyncSqlAlchemyStore(f"sqlite:///{tmp_path / 'submarine.db'}")
+
+    async def run():
+        async with store.ManagedSessionMaker() as session:
+            session.add(SqlExperiment(id=JOB_ID, experiment_spec='{"value": 1}', create_by="test"))
+
+        await asyncio.gather(
+            store.log_metric(JOB_ID, Metric("name_1", 5, "worker-1", datetime.now(), 0)),
+            store.log_metric(JOB_ID, Metric("name_1", float("nan"), "worker-2", datetime.now(), 0)),
+            store.log_param(JOB_ID, Param("name_1", "a", "worker-1")),
+        )
+
+        async with store.ManagedSessionMaker() as session:
+            metrics = (
+                (await session.execute(select(SqlMetric).order_by(SqlMetric.worker_index))).scalars().all()
+            )
+            params = (await session.execute(select(SqlParam))).scalars().all()
+        assert [(m.key, m.value, m.is_nan) for m in metrics] == [("name_1", 5, False), ("name_1", 0, True)]
+        assert [(p.key, p.value, p.worker_index) for p in params] == [("name_1", "a", "worker-1")]
+        await store.close()
+
+    asyncio.run(run())
@@ -0,0 +1,134 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import json
+import pathlib
+from unittest import mock
+
+import boto3
+import pytest
+import torch
+from moto import mock_s3
+
+from submarine.artifacts import ArtifactCache
+from submarine.exceptions import SubmarineException
+from submarine.tracking.client import SubmarineClient, wait_for_uploads
+
+
+@pytest.fixture(autouse=True)
+def s3_env(monkeypatch):
+    monkeypatch.setenv("MLFLOW_S3_ENDPOINT_URL", "https://s3.amazonaws.com")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+@mock_s3
+def test_download_model(tmp_path):
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    s3.Object("submarine", "registry/test-1-model_id_1/test/1/model.pt").put(Body=b"model")
+    s3.Object("submarine", "registry/test-1-model_id_1/test/1/description.json").put(Body=b"{}")
+
+    client = SubmarineClient(db_uri=f"sqlite:///{tmp_path / 'submarine.db'}")
+    client._artifact_cache = ArtifactCache(str(tmp_path / "cache"))
+    client.model_registry.create_registered_model("test")
+    client.model_registry.create_model_version("test", "model_id_1", "", "application_1234", "pytorch")
+
+    model_dir = client.download_model("test", 1)
+    assert model_dir == str(tmp_path / "cache" / "model_id_1")
+    assert (pathlib.Path(model_dir) / "model.pt").read_bytes() == b"model"
+
+    # later downloads are served from the cache
+    s3.Object("submarine", "registry/test-1-model_id_1/test/1/model.pt").delete()
+    assert client.download_model("test", 1) == model_dir
+
+
+@mock_s3
+def test_save_and_load_pytorch_model(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_ID", "application_1234")
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    client = SubmarineClient(db_uri=f"sqlite:///{tmp_path / 'submarine.db'}")
+    client._artifact_cache = ArtifactCache(str(tmp_path / "cache"))
+
+    model = torch.nn.Linear(2, 1)
+    client.save_model(model, "pytorch", "test", input_dim=[1, 2], output_dim=[1, 1])
+
+    keys = sorted(
+        obj.key for obj in s3.Bucket("submarine").objects.filter(Prefix="experiment/application_1234/1/")
+    )
+    assert keys == [
+        "experiment/application_1234/1/description.json",
+        "experiment/application_1234/1/model.pt",
+    ]
+    # the claim of the run folder is released once it holds the model
+    assert list(s3.Bucket("submarine").objects.filter(Prefix="experiment/application_1234/.claims/")) == []
+    description = json.loads(s3.Object("submarine", keys[0]).get()["Body"].read())
+    assert description["model_type"] == "pytorch"
+    assert description["input"] == [{"dims": [1, 2]}]
+
+    loaded_model = client.load_model("test", 1)
+    x = torch.rand(1, 2)
+    assert torch.allclose(loaded_model(x), model(x))
+
+
+@mock_s3
+def test_save_model_async_upload(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_ID", "application_1234")
+    s3 = boto3.resource("s3")
+    s3.create_bucket(Bucket="submarine")
+    client = SubmarineClient(db_uri=f"sqlite:///{tmp_path / 'submarine.db'}")
+
+    model = torch.nn.Linear(2, 1)
+    futures = [
+        client.save_model(model, "pytorch", "test", input_dim=[1, 2], output_dim=[1, 1], async_upload=True)
+        for _ in range(3)
+    ]
+    wait_for_uploads()
+    assert [future.result().version for future in futures] == [1, 2, 3]
+    assert client.artifact_repo.list_artifact_subfolder("registry") == [
+        {"Prefix": f"registry/test-{mv.version}-{mv.id}/"} for mv in (future.result() for future in futures)
+    ]
+
+    with mock.patch.object(
+        client.model_registry, "create_model_version", side_effect=SubmarineException("down")
+    ):
+        future = client.save_model(
+            model, "pytorch", "test", input_dim=[1, 2], output_dim=[1, 1], async_upload=True
+        )
+        with pytest.raises(SubmarineException):
+            wait_for_uploads()
+    with pytest.raises(SubmarineException):
+        future.result()
+    # failures are only reported once
+    wait_for_uploads()
+
+
+def test_save_and_load_model_on_filesystem(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_ID", "application_1234")
+    client = SubmarineClient(
+        db_uri=f"sqlite:///{tmp_path / 'submarine.db'}", artifact_uri=f"file://{tmp_path / 'artifacts'}"
+    )
+    client._artifact_cache = ArtifactCache(str(tmp_path / "cache"))
+
+    model = torch.nn.Linear(2, 1)
+    mv = client.save_model(model, "pytorch", "test", input_dim=[1, 2], output_dim=[1, 1])
+    model_dir = tmp_path / "artifacts" / "registry" / f"test-1-{mv.id}" / "test" / "1"
+    assert sorted(p.name for p in model_dir.iterdir()) == ["description.json", "model.pt"]
+
+    x = torch.rand(1, 2)
+    assert torch.allclose(client.load_model("test", 1)(x), model(x))
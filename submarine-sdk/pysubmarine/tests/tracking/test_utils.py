@@ -16,11 +16,17 @@
 import os
 from unittest import mock
 
+import pytest
+
+from submarine.artifacts import FileSystemRepository, Repository
+from submarine.exceptions import SubmarineException
 from submarine.store import DEFAULT_SUBMARINE_JDBC_URL
 from submarine.store.tracking.sqlalchemy_store import SqlAlchemyStore
 from submarine.tracking.utils import (
+    _ARTIFACT_URI_ENV_VAR,
     _JOB_ID_ENV_VAR,
     _TRACKING_URI_ENV_VAR,
+    get_artifact_repository,
     get_job_id,
     get_tracking_sqlalchemy_store,
 )
@@ -45,3 +51,16 @@ def test_get_tracking_sqlalchemy_store():
         assert isinstance(store, SqlAlchemyStore)
         assert store.db_uri == uri
     mock_create_engine.assert_called_once_with(uri, pool_pre_ping=True)
+
+
+def test_get_artifact_repository(tmp_path):
+    repo = get_artifact_repository("s3://models")
+    assert isinstance(repo, Repository)
+    assert repo.bucket == "models"
+    with pytest.raises(SubmarineException):
+        get_artifact_repository("s3://models/path")
+
+    with mock.patch.dict(os.environ, {_ARTIFACT_URI_ENV_VAR: f"file://{tmp_path}"}):
+        repo = get_artifact_repository()
+    assert isinstance(repo, FileSystemRepository)
+    assert repo.root == str(tmp_path)
@@ -0,0 +1,123 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from unittest import mock
+
+import numpy as np
+from pyarrow import fs
+
+from submarine.utils import fileio
+
+
+def test_filesystem_cache(tmp_path):
+    fileio._clear_filesystem_cache()
+    filesystem, path = fileio.get_filesystem(f"file://{tmp_path}/a")
+    assert path == f"{tmp_path}/a"
+    assert fileio.get_filesystem(f"file://{tmp_path}/b%20c") == (filesystem, f"{tmp_path}/b c")
+    local_filesystem, path = fileio.get_filesystem(str(tmp_path / "d"))
+    assert path == str(tmp_path / "d")
+    assert fileio.get_filesystem(str(tmp_path / "e"))[0] is local_filesystem
+
+    fileio._clear_filesystem_cache()
+    assert fileio.get_filesystem(f"file://{tmp_path}/a")[0] is not filesystem
+
+
+def test_local_path_verbatim(tmp_path):
+    # percent signs of local paths are part of the file name, not escapes
+    (tmp_path / "a%20b.txt").write_bytes(b"abc")
+    fileio._clear_filesystem_cache()
+    # the filesystem of local paths is cached by resolving any of them
+    fileio.get_filesystem(str(tmp_path / "c.txt"))
+    for _ in range(2):
+        assert fileio.file_info(str(tmp_path / "a%20b.txt")).size == 3
+    assert fileio.get_filesystem(str(tmp_path / "a%20b.txt"))[1] == str(tmp_path / "a%20b.txt")
+
+
+def test_open_input_stream(tmp_path):
+    data = os.urandom(3 * 1024 * 1024)
+    (tmp_path / "data").write_bytes(data)
+    with fileio.open_input_stream(str(tmp_path / "data")) as f:
+        assert f.read() == data
+
+
+def test_read_ranges(tmp_path):
+    data = os.urandom(1024 * 1024)
+    (tmp_path / "data").write_bytes(data)
+    ranges = [(500_000, 100), (10, 20), (0, 5), (40, 1000), (1_000_000, 48_576), (41, 10)]
+    assert fileio._coalesce_ranges(ranges, hole_size_limit=8192, range_size_limit=1024 * 1024) == [
+        (0, 1040),
+        (500_000, 500_100),
+        (1_000_000, 1_048_576),
+    ]
+    buffers = fileio.read_ranges(str(tmp_path / "data"), ranges)
+    assert [bytes(buf) for buf in buffers] == [data[offset : offset + length] for offset, length in ranges]
+
+
+def test_open_mapped(tmp_path):
+    data = b"1 1:0.5 2:1\n0 3:1\n"
+    (tmp_path / "data").write_bytes(data)
+    mapped = fileio.open_mapped(str(tmp_path / "data"))
+    assert mapped.dtype == np.uint8
+    assert not mapped.flags.writeable
+    assert mapped.tobytes() == data
+    assert mapped[12:].tobytes() == b"0 3:1\n"
+
+    (tmp_path / "empty").write_bytes(b"")
+    assert len(fileio.open_mapped(f"file://{tmp_path / 'empty'}")) == 0
+
+
+def test_open_mapped_remote(tmp_path):
+    (tmp_path / "data").write_bytes(b"1 1:0.5\n")
+    # a filesystem which is not local is read through an input stream
+    remote = fs.SubTreeFileSystem(str(tmp_path), fs.LocalFileSystem())
+    with mock.patch.object(fileio, "_parse_uri", return_value=(remote, "data")):
+        assert fileio.open_mapped("hdfs://namenode:8020/data").tobytes() == b"1 1:0.5\n"
+
+
+def test_glob(tmp_path):
+    for name in [
+        "a/part-0.libsvm",
+        "a/part-1.libsvm",
+        "a/part-1.txt",
+        "b/part-2.libsvm",
+        "b/c/part-3.libsvm",
+    ]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("0 0:1\n")
+
+    assert fileio.glob(str(tmp_path / "a" / "part-*.libsvm")) == [
+        str(tmp_path / "a" / "part-0.libsvm"),
+        str(tmp_path / "a" / "part-1.libsvm"),
+    ]
+    assert fileio.glob(f"file://{tmp_path}/*/part-[23].libsvm") == [f"file://{tmp_path}/b/part-2.libsvm"]
+    assert fileio.glob(str(tmp_path / "a" / "part-0.libsvm")) == [str(tmp_path / "a" / "part-0.libsvm")]
+    assert fileio.glob(str(tmp_path / "missing" / "*")) == []
+
+
+def test_read_line_blocks(tmp_path):
+    lines = [b"line%d" % i * (i % 4 + 1) for i in range(30)]
+    path = tmp_path / "data.txt"
+    path.write_bytes(b"\n".join(lines) + b"\n")
+
+    splits = fileio.list_splits(str(path), split_size=17)
+    assert splits[0] == (str(path), 0, 17) and splits[-1][2] == path.stat().st_size
+    blocks = [
+        block
+        for uri, start, end in splits
+        for block in fileio.read_line_blocks(uri, start, end, block_size=8)
+    ]
+    assert all(block.endswith(b"\n") for block in blocks)
+    assert b"".join(blocks).split(b"\n")[:-1] == lines
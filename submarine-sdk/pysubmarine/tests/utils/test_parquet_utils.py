@@ -0,0 +1,65 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from submarine.exceptions import SubmarineException
+from submarine.utils.parquet_utils import (
+    list_row_groups,
+    list_to_numpy,
+    read_row_groups,
+)
+
+
+def test_read_row_groups(tmp_path):
+    for i in range(2):
+        table = pa.table(
+            {
+                "feat_ids": [[j, j + 1] for j in range(i * 10, i * 10 + 10)],
+                "feat_vals": [[0.5, 1.5]] * 10,
+                "label": [j % 2 for j in range(10)],
+                "unused": ["x"] * 10,
+            }
+        )
+        pq.write_table(table, tmp_path / f"part-{i}.parquet", row_group_size=4)
+
+    row_groups = list_row_groups(str(tmp_path / "part-*.parquet"))
+    assert row_groups == [(str(tmp_path / f"part-{i}.parquet"), j) for i in range(2) for j in range(3)]
+
+    batches = list(read_row_groups(row_groups[1::2], ["feat_ids", "label"], batch_size=3))
+    assert all(batch.schema.names == ["feat_ids", "label"] for batch in batches)
+    # the row group 1 of the first file and the row groups 0 and 2 of the second file
+    first_ids = [ids[0] for batch in batches for ids in batch.column(0).to_pylist()]
+    assert first_ids == [4, 5, 6, 7, 10, 11, 12, 13, 18, 19]
+
+    (batch,) = read_row_groups(row_groups[:1], ["feat_ids"], batch_size=4)
+    feat_ids = list_to_numpy(batch.column(0))
+    assert feat_ids.tolist() == [[0, 1], [1, 2], [2, 3], [3, 4]]
+    assert np.shares_memory(feat_ids, batch.column(0).flatten().to_numpy())
+
+
+def test_list_to_numpy():
+    array = pa.array([[1, 2], [3, 4], [5, 6]])
+    assert list_to_numpy(array.slice(1)).tolist() == [[3, 4], [5, 6]]
+    fixed = pa.FixedSizeListArray.from_arrays(pa.array([1.0, 2.0, 3.0, 4.0]), 2)
+    assert list_to_numpy(fixed).tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+    with pytest.raises(SubmarineException):
+        list_to_numpy(pa.array([[1, 2], [3]]))
+    with pytest.raises(SubmarineException):
+        list_to_numpy(pa.array([1, 2]))
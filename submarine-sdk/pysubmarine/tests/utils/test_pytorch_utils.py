@@ -0,0 +1,50 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import socket
+
+from torch import distributed
+
+from submarine.utils.pytorch_utils import iter_in_lockstep
+
+
+def _run_rank(rank, init_method, num_batches, results):
+    distributed.init_process_group("gloo", init_method=init_method, world_size=2, rank=rank)
+    try:
+        results.put((rank, list(iter_in_lockstep(range(num_batches)))))
+    finally:
+        distributed.destroy_process_group()
+
+
+def test_iter_in_lockstep():
+    assert list(iter_in_lockstep(range(3))) == [0, 1, 2]
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        init_method = f"tcp://127.0.0.1:{s.getsockname()[1]}"
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    # the ranks have 5 and 3 batches
+    processes = [
+        context.Process(target=_run_rank, args=(rank, init_method, num_batches, results))
+        for rank, num_batches in enumerate([5, 3])
+    ]
+    for process in processes:
+        process.start()
+    batches = dict(results.get(timeout=60) for _ in processes)
+    for process in processes:
+        process.join(timeout=60)
+    assert batches == {0: [0, 1, 2], 1: [0, 1, 2]}
@@ -0,0 +1,72 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from submarine.exceptions import SubmarineException
+from submarine.utils.tsv_utils import FeatureHasher, hash_integers, hash_strings
+
+BLOCK = b"1\t5\t\ta\tb\n0\t\t100\ta\t\n1\t-1\t3\t\tb\n"
+
+
+def test_hash_strings():
+    array = pa.array(["", "a", "abc", None, "abc"]).slice(1)
+    hashes = hash_strings(array, seed=0)
+    assert hashes.dtype == np.uint64
+    # FNV-1a of "a" after the seed byte 0
+    expected = 0xCBF29CE484222325 * 0x100000001B3 % 2**64
+    expected = (expected ^ ord("a")) * 0x100000001B3 % 2**64
+    assert int(hashes[0]) == expected
+    assert hashes[1] == hashes[3] and hashes[0] != hashes[1]
+    assert hashes[2] != hash_strings(array, seed=1)[2]
+
+
+def test_hash_integers():
+    values = np.array([0, 1, -1, 1])
+    hashes = hash_integers(values, seed=0)
+    assert len(set(hashes.tolist())) == 3 and hashes[1] == hashes[3]
+    assert (hashes != hash_integers(values, seed=1)).all()
+
+
+def test_feature_hasher_log():
+    hasher = FeatureHasher(num_features=20, num_dense=2, num_categorical=2)
+    feature_idx, feature_value, label = hasher.parse(BLOCK)
+    assert feature_idx.shape == (3, 4) and feature_value.dtype == np.float32
+    assert label.tolist() == [1, 0, 1]
+    assert (feature_idx[:, :2] == [0, 1]).all()
+    np.testing.assert_allclose(feature_value[:, :2], np.log1p([[5, 0], [0, 100], [0, 3]]), rtol=1e-6)
+    assert ((feature_idx[:, 2:] >= 2) & (feature_idx[:, 2:] < 20)).all()
+    assert (feature_value[:, 2:] == 1).all()
+    # equal strings of a column share a feature
+    assert feature_idx[0, 2] == feature_idx[1, 2] and feature_idx[0, 3] == feature_idx[2, 3]
+
+
+def test_feature_hasher_bucket():
+    hasher = FeatureHasher(num_features=1000, num_dense=2, num_categorical=2, dense_transform="bucket")
+    feature_idx, feature_value, _ = hasher.parse(BLOCK + b"0\t6\t101\ta\tb\n")
+    assert (feature_value == 1).all() and ((feature_idx >= 0) & (feature_idx < 1000)).all()
+    # 5 and 6 fall into the bucket floor(log(x) ** 2) = 2 and 3, 100 and 101 both into 21
+    assert feature_idx[0, 0] != feature_idx[3, 0] and feature_idx[1, 1] == feature_idx[3, 1]
+    # missing values have a bucket of their own
+    assert feature_idx[1, 0] != feature_idx[2, 0]
+
+
+def test_feature_hasher_invalid():
+    with pytest.raises(SubmarineException, match="dense transform"):
+        FeatureHasher(num_features=100, dense_transform="quantile")
+    with pytest.raises(SubmarineException, match="num_features"):
+        FeatureHasher(num_features=13)